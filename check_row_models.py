@@ -0,0 +1,124 @@
+# check_row_models.py
+# SELECT * + dict 변환(기존 방식)과 컬럼 지정 + 슬롯 모델(현재 방식)의 메모리/속도를 비교합니다.
+#
+# 사용법:
+#   python check_row_models.py                  # 10만 페이지 (1,000권 x 100페이지)
+#   python check_row_models.py --stories 5000 --pages-per-story 20
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+import storybook.database.db as db
+from storybook.repositories.story_repo_sqlite import StorySQLiteRepository
+
+
+# --- 기존 방식 (SELECT * → dict) ---
+
+def legacy_story_detail(story_id: int):
+    conn = db.get_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT * FROM stories WHERE id = ?", (story_id,))
+    story = cur.fetchone()
+    cur.execute("SELECT * FROM pages WHERE story_id = ? ORDER BY page_index", (story_id,))
+    pages = cur.fetchall()
+    conn.close()
+    return {
+        "id": story["id"],
+        "title": story["title"],
+        "genre": story["genre"],
+        "theme": story["theme"],
+        "hero": story["hero"],
+        "created_at": story["created_at"],
+        "pages": [dict(p) for p in pages]
+    }
+
+
+def legacy_dashboard():
+    # 기존 routes/ui.py 의 dashboard(): 목록 조회 후 스토리마다 본문 전체를 다시 조회
+    conn = db.get_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT * FROM stories ORDER BY created_at DESC")
+    raw_stories = [dict(row) for row in cur.fetchall()]
+    conn.close()
+    stories = []
+    for s in raw_stories:
+        detail = legacy_story_detail(s['id'])
+        thumb = None
+        for p in detail['pages']:
+            if p.get('image_url'):
+                thumb = p['image_url']
+                break
+        stories.append({"id": s['id'], "title": s['title'], "genre": s['genre'],
+                        "created_at": s['created_at'], "thumb_url": thumb})
+    return stories
+
+
+def legacy_all_details(story_ids):
+    return [legacy_story_detail(sid) for sid in story_ids]
+
+
+def current_all_details(repo, story_ids):
+    return [repo._load_story_detail(sid, True) for sid in story_ids]
+
+
+def measure(label: str, fn, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f" - {label:<34} {elapsed * 1000:9.1f} ms   결과 유지 {current / 1024 / 1024:7.2f} MB   최대 {peak / 1024 / 1024:7.2f} MB")
+    return result
+
+
+def build_database(stories: int, pages_per_story: int):
+    conn = sqlite3.connect(db.DB_PATH)
+    cur = conn.cursor()
+    text = "옛날 어느 숲속 마을에 호기심 많은 아기 토끼가 살고 있었어요. " * 4
+    for s in range(stories):
+        cur.execute("INSERT INTO stories (title, genre, theme, hero) VALUES (?, ?, ?, ?)",
+                    (f"동화 {s}", "동화", "모험", "토끼"))
+        sid = cur.lastrowid
+        cur.executemany(
+            "INSERT INTO pages (story_id, page_index, text, image_url) VALUES (?, ?, ?, ?)",
+            [(sid, i + 1, text, f"https://image.pollinations.ai/prompt/scene-{sid}-{i}?seed={i}")
+             for i in range(pages_per_story)],
+        )
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="행 모델 메모리/속도 비교")
+    parser.add_argument("--stories", type=int, default=1000)
+    parser.add_argument("--pages-per-story", type=int, default=100)
+    parser.add_argument("--detail-sample", type=int, default=200, help="본문 전체 조회를 비교할 스토리 수")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    db.DATA_DIR = tmp
+    db.DB_PATH = os.path.join(tmp, "storybook.db")
+    repo = StorySQLiteRepository(db.DB_PATH)
+    repo.init()
+
+    total_pages = args.stories * args.pages_per_story
+    print(f"📦 테스트 DB 생성: 스토리 {args.stories:,}권 / 페이지 {total_pages:,}장")
+    build_database(args.stories, args.pages_per_story)
+    print(f"   파일 크기: {os.path.getsize(db.DB_PATH) / 1024 / 1024:.1f} MB\n")
+
+    print("📋 대시보드 목록")
+    measure("기존 (SELECT * + 스토리별 상세)", legacy_dashboard)
+    measure("현재 (컬럼 지정 + 썸네일 서브쿼리)", repo.get_all_stories)
+
+    sample = list(range(1, min(args.stories, args.detail_sample) + 1))
+    print(f"\n📖 상세 조회 ({len(sample)}권, 본문 포함)")
+    measure("기존 (dict)", legacy_all_details, sample)
+    measure("현재 (슬롯 모델)", current_all_details, repo, sample)
+
+
+if __name__ == "__main__":
+    main()
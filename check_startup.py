@@ -0,0 +1,73 @@
+# check_startup.py
+# 앱 시작(콜드 스타트) 시간을 `python -X importtime` 으로 측정합니다.
+#
+# 사용법:
+#   python check_startup.py                 # 측정 결과 출력
+#   python check_startup.py --budget-ms 300 # 예산 초과 시 종료코드 1
+import argparse
+import os
+import subprocess
+import sys
+
+# create_app() 시점에 불러오면 안 되는 무거운 모듈들 (첫 요청 때 지연 로드)
+HEAVY_MODULES = ("google.generativeai", "grpc", "google.protobuf", "googleapiclient")
+
+STARTUP_CODE = "from storybook import create_app; create_app()"
+
+
+def measure(code: str = STARTUP_CODE):
+    """importtime 출력을 파싱하여 [(모듈명, self_us, cumulative_us)] 목록을 반환합니다."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=root,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        # 들여쓰기는 import 깊이를 뜻하므로 앞 공백은 유지합니다.
+        rows.append((name.rstrip()[1:], int(self_us), int(cum_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storybook 앱 시작 시간 측정")
+    parser.add_argument("--budget-ms", type=float, default=None, help="허용할 최대 import 시간(ms)")
+    parser.add_argument("--top", type=int, default=10, help="출력할 상위 모듈 개수")
+    args = parser.parse_args()
+
+    rows = measure()
+    # 최상위(들여쓰기 없는) 모듈의 누적 시간 합계가 전체 import 시간입니다.
+    total_ms = sum(cum for name, _, cum in rows if not name.startswith(" ")) / 1000
+
+    print(f"⏱️  create_app() import 시간: {total_ms:.1f} ms ({len(rows)} modules)")
+    print(f"\n📋 누적 시간 상위 {args.top}개 모듈:")
+    for name, _, cum in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f" - {name.strip():<40} {cum / 1000:8.1f} ms")
+
+    names = [name.strip() for name, _, _ in rows]
+    loaded_heavy = sorted({n for n in names
+                           if any(n == m or n.startswith(m + ".") for m in HEAVY_MODULES)})
+    ok = True
+    if loaded_heavy:
+        ok = False
+        print(f"\n⚠️ 시작 시점에 무거운 모듈이 로드되었습니다: {', '.join(loaded_heavy[:5])}")
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        ok = False
+        print(f"\n❌ 예산 초과: {total_ms:.1f} ms > {args.budget_ms:.1f} ms")
+
+    if ok:
+        print("\n✅ 시작 시간 점검 통과")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# rebalance_shards.py
+# 샤딩 저장소(STORAGE_BACKEND=sharded)에서 주인 샤드가 아닌 곳에 있는 스토리를 옮깁니다.
+# 샤드를 추가/제거한 뒤, 또는 단일 파일 DB에서 샤드로 이전할 때 실행합니다. (서비스 중에도 실행 가능)
+#
+# 사용법:
+#   python rebalance_shards.py --dry-run                        # 옮길 목록만 출력
+#   python rebalance_shards.py                                  # STORAGE_SHARDS 기준으로 재배치
+#   python rebalance_shards.py --shards "a=d1/a.db,b=d2/b.db,c=d3/c.db"
+#   python rebalance_shards.py --source storybook/data/storybook.db   # 단일 파일 DB를 샤드로 이전
+#   python rebalance_shards.py --source old_shard.db            # 빼낸 샤드 파일 비우기
+# 보관함 파일(<이름>_archive.db)의 스토리도 주인 샤드의 보관함으로 함께 옮깁니다.
+import argparse
+import os
+from collections import Counter
+
+from storybook.repositories.story_repo_sharded import StoryShardedRepository, parse_shards
+from storybook.repositories.story_repo_sqlite import StorySQLiteRepository
+
+
+def main():
+    parser = argparse.ArgumentParser(description="샤드 재배치")
+    parser.add_argument("--shards", default=os.environ.get("STORAGE_SHARDS", ""),
+                        help="샤드 목록 (기본: 환경변수 STORAGE_SHARDS)")
+    parser.add_argument("--source", action="append", default=[],
+                        help="샤드 밖에서 옮겨 올 SQLite 파일 (여러 번 지정 가능)")
+    parser.add_argument("--dry-run", action="store_true", help="옮기지 않고 계획만 출력")
+    parser.add_argument("--verbose", "-v", action="store_true", help="스토리마다 출력")
+    args = parser.parse_args()
+
+    repo = StoryShardedRepository(parse_shards(args.shards))
+    repo.init()
+    sources = []
+    for path in args.source:
+        if not os.path.exists(path):
+            parser.error(f"파일이 없습니다: {path}")
+        sources.append(StorySQLiteRepository(os.path.abspath(path)))
+
+    print(f"🧩 샤드 {len(repo.shards)}개")
+    for name, shard in repo.shards.items():
+        print(f" - {name:<12} {shard.db_path}")
+
+    routes = Counter()
+
+    def progress(move):
+        routes[(move["from"], move["to"])] += 1
+        if args.verbose:
+            print(f"   #{move['story_id']}: {move['from']} → {move['to']}{' (보관함)' if move['archived'] else ''}")
+
+    result = repo.rebalance(sources, dry_run=args.dry_run, progress=progress)
+
+    print(f"\n📦 {'옮길' if args.dry_run else '옮긴'} 스토리: {result['planned'] if args.dry_run else result['moved']}권")
+    for (src, dst), count in sorted(routes.items()):
+        print(f" - {src} → {dst}: {count}권")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# run_maintenance.py
+# DB 정리(오래된 스토리 보관 + incremental_vacuum + ANALYZE)를 한 번 실행합니다.
+# 서버 안에서 주기적으로 돌리려면 MAINTENANCE_INTERVAL_SEC 를 설정하세요. (cron 으로 이 스크립트를 돌려도 됩니다)
+#
+# 사용법:
+#   python run_maintenance.py --dry-run                 # 보관 대상 수 / 반환 가능한 빈 공간만 출력
+#   python run_maintenance.py                           # ARCHIVE_AFTER_DAYS 기준으로 실행
+#   python run_maintenance.py --archive-after-days 180
+#   python run_maintenance.py --convert                 # 예전 DB 파일을 incremental 모드로 전환 (전체 VACUUM, 쓰기 잠김)
+import argparse
+import json
+
+from storybook.maintenance import run_maintenance
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DB 정리")
+    parser.add_argument("--archive-after-days", type=int, default=None,
+                        help="마지막 저장 후 이 일수가 지난 스토리를 보관 (기본: ARCHIVE_AFTER_DAYS, 0 이면 보관 안 함)")
+    parser.add_argument("--dry-run", action="store_true", help="변경 없이 현황만 출력")
+    parser.add_argument("--convert", action="store_true",
+                        help="auto_vacuum 이 꺼진 파일을 전체 VACUUM 으로 incremental 모드로 전환")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    args = parser.parse_args()
+
+    report = run_maintenance(archive_after_days=args.archive_after_days, convert=args.convert, dry_run=args.dry_run)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    label = "보관 대상" if args.dry_run else "보관"
+    count = report["archive_candidates"] if args.dry_run else report["archived"]
+    print(f"🗄️  {label}: {count}권 (기준 {report['archive_after_days']}일)")
+    for f in report["files"]:
+        line = f" - {f['path']}: {f['bytes_before']:,} bytes (빈 공간 {f['free_bytes_before']:,})"
+        if "reclaimed_bytes" in f:
+            line += f" → {f['bytes_after']:,} bytes, 반환 {f['reclaimed_bytes']:,}"
+        if not f["incremental"] and not f.get("converted"):
+            line += "  ⚠️ auto_vacuum 꺼짐 (--convert 필요)"
+        print(line)
+    if not args.dry_run:
+        print(f"🧹 총 반환: {report['reclaimed_bytes']:,} bytes ({report['elapsed_sec']} s)")
+        if report["needs_convert"]:
+            print(f"⚠️ {len(report['needs_convert'])}개 파일은 빈 공간을 반환하지 못했습니다. "
+                  f"점검 시간에 --convert 로 한 번 전환하세요.")
+
+
+if __name__ == "__main__":
+    main()
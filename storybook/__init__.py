@@ -2,6 +2,8 @@
 from flask import Flask, redirect
 from storybook.routes.api import api_bp
 from storybook.routes.ui import ui_bp
+from storybook.profiling import init_profiling
+from storybook.maintenance import init_maintenance
 
 def create_app():
     # 템플릿/정적 경로는 기본값으로도 잘 잡히지만, 명시해도 무방합니다.
@@ -21,6 +23,12 @@ def create_app():
     app.register_blueprint(api_bp)    # <- api_bp 쪽에서 url_prefix='/api'
     app.register_blueprint(ui_bp)     # UI 라우트 (대시보드/에디터/이미지 페이지 등)
 
+    # 요청 단위 프로파일링 (PROFILE_SECRET / PROFILE_SAMPLE_RATE 설정 시에만 활성화)
+    init_profiling(app)
+
+    # DB 정리(보관/빈 페이지 반환/ANALYZE) 주기 실행 (MAINTENANCE_INTERVAL_SEC 설정 시에만)
+    init_maintenance(app)
+
     @app.route("/")
     def home():
         return redirect("/dashboard")
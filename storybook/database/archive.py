@@ -0,0 +1,80 @@
+# storybook/database/archive.py
+from __future__ import annotations
+import json
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from storybook.database import revisions
+
+# 오래된 스토리 보관함 (별도 SQLite 파일)
+# - 스토리/페이지/표지는 한 행에 zlib(JSON)으로 묶어 저장합니다.
+# - 저장 이력(리비전) 행은 이미 압축되어 있으므로 같은 형식의 story_revisions 테이블에 그대로 옮깁니다.
+#   (그래서 revisions.py 의 조회 함수를 보관함 커서에도 그대로 쓸 수 있습니다)
+# 이 모듈은 커서만 받아 동작하고, 연결/트랜잭션은 저장소(story_repo_sqlite.py)가 관리합니다.
+
+
+def ensure_schema(cur):
+    cur.execute('''
+                CREATE TABLE IF NOT EXISTS archived_stories
+                (
+                    id          INTEGER PRIMARY KEY,
+                    title       TEXT,
+                    genre       TEXT,
+                    created_at  DATETIME,
+                    thumb_url   TEXT,
+                    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    payload     BLOB NOT NULL -- zlib(JSON): story / pages / covers
+                )
+                ''')
+    revisions.ensure_schema(cur)
+
+
+def put(cur, rows: Dict[str, list]):
+    """export_rows() 로 꺼낸 스토리 한 권을 보관합니다. (같은 ID가 있으면 덮어씀)"""
+    story = rows["story"]
+    story_id = story[0]
+    thumb = next((url for _, _, url in rows["pages"] if url), None)
+    payload = {"story": list(story), "pages": [list(p) for p in rows["pages"]],
+               "covers": [list(c) for c in rows["covers"]]}
+    blob = zlib.compress(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 9)
+    cur.execute("INSERT OR REPLACE INTO archived_stories (id, title, genre, created_at, thumb_url, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (story_id, story[1], story[2], story[5], thumb, blob))
+    revisions.delete_all(cur, story_id)
+    cur.executemany("INSERT INTO story_revisions (story_id, rev_no, kind, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                    [(story_id, *r) for r in rows["revisions"]])
+
+
+def load(cur, story_id: int, with_revisions: bool = False) -> Optional[Dict[str, list]]:
+    """보관한 스토리를 export_rows() 와 같은 모양으로 돌려줍니다. (없으면 None)"""
+    cur.execute("SELECT payload FROM archived_stories WHERE id = ?", (story_id,))
+    row = cur.fetchone()
+    if row is None:
+        return None
+    data = json.loads(zlib.decompress(row[0]).decode("utf-8"))
+    rows = {
+        "story": tuple(data["story"]),
+        "pages": [tuple(p) for p in data["pages"]],
+        "covers": [tuple(c) for c in data["covers"]],
+        "revisions": [],
+    }
+    if with_revisions:
+        cur.execute("SELECT rev_no, kind, payload, created_at FROM story_revisions WHERE story_id = ? ORDER BY rev_no",
+                    (story_id,))
+        rows["revisions"] = [tuple(r) for r in cur.fetchall()]
+    return rows
+
+
+def contains(cur, story_id: int) -> bool:
+    cur.execute("SELECT 1 FROM archived_stories WHERE id = ?", (story_id,))
+    return cur.fetchone() is not None
+
+
+def summaries(cur) -> List[Tuple[Any, ...]]:
+    """대시보드 목록용 (id, title, genre, created_at, thumb_url)"""
+    cur.execute("SELECT id, title, genre, created_at, thumb_url FROM archived_stories")
+    return [tuple(r) for r in cur.fetchall()]
+
+
+def delete(cur, story_id: int):
+    cur.execute("DELETE FROM archived_stories WHERE id = ?", (story_id,))
+    revisions.delete_all(cur, story_id)
@@ -0,0 +1,117 @@
+# storybook/database/cache.py
+from __future__ import annotations
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class ReadCache:
+    """
+    조회 결과를 보관하는 LRU 캐시 (항목 수 + 대략적인 바이트 수 제한 + 유효 시간).
+
+    - 값은 복사하지 않고 그대로 공유하므로 불변 객체(models.py)만 저장해야 합니다.
+    - 조회 도중 쓰기(invalidate)가 일어나면 그 조회 결과는 저장하지 않습니다.
+      (오래된 값이 다시 캐시에 들어가는 것을 막기 위함)
+    - 무효화는 같은 프로세스 안에서만 전달되므로, 다른 프로세스(다른 gunicorn 워커, 작업 워커,
+      run_maintenance.py 등)가 쓴 내용은 ttl 초가 지나야 보입니다. (ttl=0 이면 만료 없음: 단일 프로세스 전용)
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 8 * 1024 * 1024, ttl: float = 5.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        # 조회 시작 시각 대신 쓰는 세대 번호. 키별로 마지막 무효화 세대를 기억해 두고,
+        # 그보다 먼저 시작한 조회의 put 은 버립니다.
+        self._generation = 0
+        self._invalidated: Dict[Hashable, int] = {}
+        # 이 세대보다 먼저 시작한 조회는 모두 버립니다. (_invalidated 를 비울 때 올림)
+        self._floor = 0
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any, int]:
+        """(적중 여부, 값, 버전)을 반환합니다. 버전은 put 할 때 그대로 넘겨주세요."""
+        with self._lock:
+            version = self._generation
+            item = self._data.get(key)
+            if item is not None and item[2] < time.monotonic():
+                self._pop(key)
+                item = None
+            if item is None:
+                self.misses += 1
+                return False, None, version
+            self._data.move_to_end(key)
+            self.hits += 1
+            value = item[0]
+        return True, value, version
+
+    def put(self, key: Hashable, value: Any, version: int):
+        if not self.enabled or value is None:
+            return
+        size = _approx_size(value)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else float("inf")
+        with self._lock:
+            # 조회하는 사이에 쓰기가 있었다면 저장하지 않습니다.
+            if version < self._floor or self._invalidated.get(key, -1) > version:
+                return
+            self._pop(key)
+            self._data[key] = (value, size, expires_at)
+            self._bytes += size
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._data))
+                self._pop(oldest)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            self._invalidated[key] = self._generation
+            self._pop(key)
+            if len(self._invalidated) > max(1024, self.max_entries * 4):
+                # 무효화 기록이 끝없이 늘지 않도록 비우고, 대신 진행 중인 조회는 모두 저장하지 않게 합니다.
+                self._invalidated.clear()
+                self._floor = self._generation
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._invalidated.clear()
+            self._floor = self._generation
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def _pop(self, key: Hashable):
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= item[1]
+
+
+def _approx_size(value: Any) -> int:
+    # 정확한 메모리 크기 대신 직렬화 길이로 대략 계산합니다.
+    return len(json.dumps(value, ensure_ascii=False, default=_jsonable).encode("utf-8"))
+
+
+def _jsonable(obj: Any):
+    return asdict(obj) if is_dataclass(obj) else str(obj)
@@ -1,7 +1,8 @@
 # storybook/database/db.py
 import sqlite3
 import os
-from typing import List, Dict, Any
+
+from storybook.database import revisions
 
 # 현재 파일(db.py)의 위치를 기준으로 data 폴더 경로를 찾습니다.
 # 예: .../storybook/database/db.py -> .../storybook/data/storybook.db
@@ -9,83 +10,29 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # storyb
 DATA_DIR = os.path.join(BASE_DIR, "data")
 DB_PATH = os.path.join(DATA_DIR, "storybook.db")
 
+# 스토리 저장/조회는 storybook.repositories 의 저장소(StoryRepository)가 담당합니다.
+# 이 파일에는 SQLite 연결과 테이블 정의만 남겨 두고, 저장소 구현들이 함께 사용합니다.
+
 
-def get_connection():
+def get_connection(path: str = None):
+    path = path or DB_PATH
     # 데이터 폴더가 없으면 생성 (에러 방지)
-    if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR)
+    folder = os.path.dirname(os.path.abspath(path))
+    if not os.path.exists(folder):
+        os.makedirs(folder)
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(path)
     conn.row_factory = sqlite3.Row  # 컬럼명으로 접근 가능하게 설정
     return conn
 
-# [추가] 동화 삭제 함수
-def delete_story(story_id: int):
-    conn = get_connection()
-    cur = conn.cursor()
-    # 1. 딸린 페이지들 먼저 삭제 (외래키 등 고려)
-    cur.execute("DELETE FROM pages WHERE story_id = ?", (story_id,))
-    # 2. 본문(스토리) 삭제
-    cur.execute("DELETE FROM stories WHERE id = ?", (story_id,))
-    conn.commit()
-    conn.close()
-
-
-# [추가] 표지 정보 저장/업데이트
-def save_cover(story_id: int, image_url: str, title: str, author: str, position: str, color: str):
-    conn = get_connection()
-    cur = conn.cursor()
-    # 기존 표지 있는지 확인
-    cur.execute("SELECT id FROM covers WHERE story_id = ?", (story_id,))
-    row = cur.fetchone()
-
-    if row:
-        # 업데이트
-        cur.execute('''
-                    UPDATE covers
-                    SET front_image_url=?,
-                        title_position=?,
-                        author_name=?,
-                        back_color=?
-                    WHERE story_id = ?
-                    ''', (image_url, position, author, color, story_id))
-    else:
-        # 신규 생성
-        cur.execute('''
-                    INSERT INTO covers (story_id, front_image_url, title_position, author_name, back_color)
-                    VALUES (?, ?, ?, ?, ?)
-                    ''', (story_id, image_url, position, author, color))
-
-    conn.commit()
-    conn.close()
 
-
-# [추가] 표지 정보 조회
-def get_cover(story_id: int):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM covers WHERE story_id = ?", (story_id,))
-    row = cur.fetchone()
-    conn.close()
-    if row:
-        return dict(row)
-    return None
-
-# [추가] 스토리 제목 업데이트 함수
-def update_story_title(story_id: int, new_title: str):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("UPDATE stories SET title = ? WHERE id = ?", (new_title, story_id))
-    conn.commit()
-    conn.close()
-
-def init_db():
-    """데이터베이스 테이블 초기화"""
-    conn = get_connection()
-    cursor = conn.cursor()
+def create_schema(cur):
+    """테이블/인덱스 생성 (이미 있으면 그대로 둡니다)"""
+    # 0. 빈 페이지를 조금씩 반환할 수 있도록 (새 파일에만 적용, storybook/maintenance.py 참고)
+    cur.execute("PRAGMA auto_vacuum = INCREMENTAL")
 
     # 1. 스토리 테이블 (동화책 기본 정보)
-    cursor.execute('''
+    cur.execute('''
                    CREATE TABLE IF NOT EXISTS stories
                    (
                        id
@@ -115,7 +62,7 @@ def init_db():
                    ''')
 
     # 2. 페이지 테이블 (각 페이지의 글과 그림)
-    cursor.execute('''
+    cur.execute('''
                    CREATE TABLE IF NOT EXISTS pages
                    (
                        id
@@ -143,7 +90,7 @@ def init_db():
                    ''')
 
     # 3. 표지 테이블 (표지 정보)
-    cursor.execute('''
+    cur.execute('''
                    CREATE TABLE IF NOT EXISTS covers
                    (
                        id
@@ -176,82 +123,32 @@ def init_db():
                        )
                    ''')
 
-    conn.commit()
-    conn.close()
-    print(f"✅ 데이터베이스 초기화 완료: {DB_PATH}")
-
+    ensure_cover_columns(cur)
 
-# --- 헬퍼 함수들 (데이터 저장/조회용) ---
+    # 4. 저장 이력(리비전) 테이블
+    revisions.ensure_schema(cur)
 
-def create_story(title: str, genre: str, theme: str, hero: str = "") -> int:
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("INSERT INTO stories (title, genre, theme, hero) VALUES (?, ?, ?, ?)",
-                (title, genre, theme, hero))
-    story_id = cur.lastrowid
-    conn.commit()
-    conn.close()
-    return story_id
+    # 5. 조회용 인덱스 (스토리별 페이지/표지 조회가 전체 테이블을 훑지 않도록)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_pages_story ON pages (story_id, page_index)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_covers_story ON covers (story_id)")
 
 
-def save_pages(story_id: int, pages: List[Dict[str, Any]]):
-    conn = get_connection()
-    cur = conn.cursor()
-    # 기존 페이지 삭제 후 다시 저장 (덮어쓰기)
-    cur.execute("DELETE FROM pages WHERE story_id = ?", (story_id,))
+def ensure_cover_columns(cur):
+    """예전 파일의 covers 테이블에 나중에 추가한 컬럼을 붙입니다. (이미 있으면 그대로)"""
+    columns = {row[1] for row in cur.execute("PRAGMA table_info(covers)").fetchall()}
+    if columns and "updated_at" not in columns:
+        # 마지막 표지 수정 시각 (보관 대상 판단용, storybook/maintenance.py)
+        cur.execute("ALTER TABLE covers ADD COLUMN updated_at DATETIME")
 
-    for p in pages:
-        # 인덱스, 텍스트, 이미지 URL 저장
-        idx = int(p.get('index', 0))
-        txt = p.get('text', '')
-        url = p.get('url', '')  # 이미지 URL이 있으면 저장
 
-        cur.execute("INSERT INTO pages (story_id, page_index, text, image_url) VALUES (?, ?, ?, ?)",
-                    (story_id, idx, txt, url))
-
-    conn.commit()
-    conn.close()
-
-
-def get_all_stories():
-    conn = get_connection()
-    cur = conn.cursor()
-    # 최신순 정렬
-    cur.execute("SELECT * FROM stories ORDER BY created_at DESC")
-    rows = cur.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
-
-
-def get_story_detail(story_id: int):
-    conn = get_connection()
-    cur = conn.cursor()
-
-    # 스토리 정보
-    cur.execute("SELECT * FROM stories WHERE id = ?", (story_id,))
-    story = cur.fetchone()
-
-    if not story:
-        conn.close()
-        return None
-
-    # 페이지 정보
-    cur.execute("SELECT * FROM pages WHERE story_id = ? ORDER BY page_index", (story_id,))
-    pages = cur.fetchall()
-
-    conn.close()
-
-    return {
-        "id": story["id"],
-        "title": story["title"],
-        "genre": story["genre"],
-        "theme": story["theme"],
-        "hero": story["hero"],
-        "created_at": story["created_at"],
-        "pages": [dict(p) for p in pages]
-    }
+def init_db():
+    """데이터베이스 테이블 초기화 (STORAGE_BACKEND 설정에 따라 샤드 파일들까지 모두)"""
+    from storybook.repositories import get_story_repository
+    repo = get_story_repository()
+    repo.init()
+    print(f"✅ 데이터베이스 초기화 완료: {repo}")
 
 
 # 이 파일을 직접 실행할 때만 초기화 진행
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    init_db()
@@ -0,0 +1,51 @@
+# storybook/database/models.py
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# 조회 결과를 dict 대신 __slots__ 기반의 불변 객체로 돌려줍니다.
+# - 행마다 dict(__dict__)를 만들지 않아 메모리가 적게 들고,
+# - 불변이므로 읽기 캐시에서 복사 없이 그대로 공유할 수 있습니다.
+# - dataclass 이므로 Jinja 의 tojson 필터로도 그대로 직렬화됩니다.
+
+
+@dataclass(frozen=True)
+class Page:
+    __slots__ = ("index", "text", "url")
+    index: int
+    text: str
+    url: str
+
+
+@dataclass(frozen=True)
+class StorySummary:
+    """대시보드 목록용 (본문 텍스트 없이 썸네일 URL만)"""
+    __slots__ = ("id", "title", "genre", "created_at", "thumb_url")
+    id: int
+    title: str
+    genre: Optional[str]
+    created_at: str
+    thumb_url: Optional[str]
+
+
+@dataclass(frozen=True)
+class Story:
+    """스토리 정보. pages 는 본문이 필요한 화면에서만 채워집니다. (그 외에는 빈 튜플)"""
+    __slots__ = ("id", "title", "genre", "theme", "hero", "created_at", "pages")
+    id: int
+    title: str
+    genre: Optional[str]
+    theme: Optional[str]
+    hero: Optional[str]
+    created_at: str
+    pages: Tuple[Page, ...]
+
+
+@dataclass(frozen=True)
+class Cover:
+    __slots__ = ("story_id", "front_image_url", "title_position", "author_name", "back_color")
+    story_id: int
+    front_image_url: Optional[str]
+    title_position: Optional[str]
+    author_name: Optional[str]
+    back_color: Optional[str]
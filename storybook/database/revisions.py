@@ -0,0 +1,164 @@
+# storybook/database/revisions.py
+from __future__ import annotations
+import json
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+# 스토리 저장 이력 (리비전)
+# - 저장할 때마다 직전 리비전과 비교해 "바뀐 페이지만" 압축해서 기록합니다. (delta)
+# - SNAPSHOT_EVERY 번마다, 또는 delta 가 전체보다 커지면 전체 스냅샷(full)을 남겨
+#   어떤 리비전이든 스냅샷 1개 + delta 몇 개만 읽으면 복원할 수 있습니다.
+# 이 모듈은 커서만 받아 동작하고, 연결/트랜잭션은 db.py 가 관리합니다.
+
+SNAPSHOT_EVERY = 20
+
+# 리비전 상태: {"title": str, "pages": {page_index: [text, url]}}
+State = Dict[str, Any]
+
+
+def ensure_schema(cur):
+    cur.execute('''
+                CREATE TABLE IF NOT EXISTS story_revisions
+                (
+                    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+                    story_id   INTEGER NOT NULL,
+                    rev_no     INTEGER NOT NULL,
+                    kind       TEXT    NOT NULL, -- 'full' | 'delta'
+                    payload    BLOB    NOT NULL, -- zlib(JSON)
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE (story_id, rev_no)
+                )
+                ''')
+
+
+def make_state(title: str, pages: List[Tuple[int, str, str]]) -> State:
+    return {"title": title, "pages": {int(idx): [text or "", url or ""] for idx, text, url in pages}}
+
+
+def _pack(data: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def _unpack(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def _diff(old: State, new: State) -> Dict[str, Any]:
+    delta: Dict[str, Any] = {}
+    if old["title"] != new["title"]:
+        delta["title"] = new["title"]
+    changed = {str(idx): page for idx, page in new["pages"].items() if old["pages"].get(idx) != page}
+    if changed:
+        delta["set"] = changed
+    removed = [idx for idx in old["pages"] if idx not in new["pages"]]
+    if removed:
+        delta["del"] = removed
+    return delta
+
+
+def _apply(state: State, delta: Dict[str, Any]) -> State:
+    pages = dict(state["pages"])
+    for idx in delta.get("del", []):
+        pages.pop(int(idx), None)
+    for idx, page in delta.get("set", {}).items():
+        pages[int(idx)] = page
+    return {"title": delta.get("title", state["title"]), "pages": pages}
+
+
+def _full_state(data: Dict[str, Any]) -> State:
+    return {"title": data["title"], "pages": {int(idx): page for idx, page in data["pages"].items()}}
+
+
+def latest_rev_no(cur, story_id: int) -> int:
+    cur.execute("SELECT MAX(rev_no) FROM story_revisions WHERE story_id = ?", (story_id,))
+    row = cur.fetchone()
+    return row[0] or 0
+
+
+def load_state(cur, story_id: int, rev_no: int) -> Optional[State]:
+    """rev_no 시점의 상태를 (가장 가까운 스냅샷 + 이후 delta)로 복원합니다. 없는 리비전이면 None"""
+    cur.execute("SELECT 1 FROM story_revisions WHERE story_id = ? AND rev_no = ?", (story_id, rev_no))
+    if cur.fetchone() is None:
+        return None
+
+    cur.execute("""
+                SELECT MAX(rev_no)
+                FROM story_revisions
+                WHERE story_id = ?
+                  AND rev_no <= ?
+                  AND kind = 'full'
+                """, (story_id, rev_no))
+    base = cur.fetchone()[0]
+    if base is None:
+        return None
+
+    cur.execute("""
+                SELECT kind, payload
+                FROM story_revisions
+                WHERE story_id = ?
+                  AND rev_no BETWEEN ? AND ?
+                ORDER BY rev_no
+                """, (story_id, base, rev_no))
+    state: Optional[State] = None
+    for kind, payload in cur.fetchall():
+        data = _unpack(payload)
+        state = _full_state(data) if kind == "full" else _apply(state, data)
+    return state
+
+
+def record(cur, story_id: int, new_state: State, prev_state: Optional[State] = None) -> Optional[int]:
+    """
+    새 상태를 리비전으로 기록하고 리비전 번호를 반환합니다. (바뀐 것이 없으면 None)
+    prev_state 는 이력이 없던 기존 스토리의 현재 내용으로, 첫 리비전(스냅샷)으로 보존합니다.
+    """
+    ensure_schema(cur)
+    last = latest_rev_no(cur, story_id)
+
+    if last == 0 and prev_state is not None and prev_state["pages"]:
+        cur.execute("INSERT INTO story_revisions (story_id, rev_no, kind, payload) VALUES (?, 1, 'full', ?)",
+                    (story_id, _pack(_snapshot(prev_state))))
+        last = 1
+
+    full_blob = _pack(_snapshot(new_state))
+    kind, blob = "full", full_blob
+    if last:
+        prev = load_state(cur, story_id, last)
+        delta = _diff(prev, new_state)
+        if not delta:
+            return None
+        cur.execute("""
+                    SELECT MAX(rev_no)
+                    FROM story_revisions
+                    WHERE story_id = ?
+                      AND kind = 'full'
+                    """, (story_id,))
+        since_full = last - (cur.fetchone()[0] or 0)
+        delta_blob = _pack(delta)
+        if since_full + 1 < SNAPSHOT_EVERY and len(delta_blob) < len(full_blob):
+            kind, blob = "delta", delta_blob
+
+    rev_no = last + 1
+    cur.execute("INSERT INTO story_revisions (story_id, rev_no, kind, payload) VALUES (?, ?, ?, ?)",
+                (story_id, rev_no, kind, blob))
+    return rev_no
+
+
+def _snapshot(state: State) -> Dict[str, Any]:
+    return {"title": state["title"], "pages": {str(idx): page for idx, page in state["pages"].items()}}
+
+
+def list_revisions(cur, story_id: int) -> List[Dict[str, Any]]:
+    ensure_schema(cur)
+    cur.execute("""
+                SELECT rev_no, kind, LENGTH(payload), created_at
+                FROM story_revisions
+                WHERE story_id = ?
+                ORDER BY rev_no DESC
+                """, (story_id,))
+    return [{"rev": rev, "kind": kind, "bytes": size, "created_at": created_at}
+            for rev, kind, size, created_at in cur.fetchall()]
+
+
+def delete_all(cur, story_id: int):
+    ensure_schema(cur)
+    cur.execute("DELETE FROM story_revisions WHERE story_id = ?", (story_id,))
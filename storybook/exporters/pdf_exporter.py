@@ -0,0 +1,320 @@
+# storybook/exporters/pdf_exporter.py
+from __future__ import annotations
+import io
+import os
+import json
+import glob
+import hashlib
+import logging
+import tempfile
+from dataclasses import asdict, is_dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from storybook.database.models import Cover, Story
+from storybook.providers.image_provider import fetch_image
+
+# A4 (pt)
+PAGE_W, PAGE_H = 595, 842
+MARGIN = 48
+
+# Adobe 표준 한글 CID 폰트 (PDF 뷰어에 내장되어 있어 폰트 파일을 포함하지 않아도 됩니다)
+FONT_NAME = "HYSMyeongJo-Medium"
+
+
+def content_hash(story: Story, cover: Optional[Cover]) -> str:
+    """스토리/표지 내용이 같으면 같은 값 → 캐시 키로 사용합니다."""
+    raw = json.dumps({"story": asdict(story), "cover": asdict(cover) if is_dataclass(cover) else None},
+                     sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PdfExportCache:
+    """
+    렌더링한 PDF를 story_<id>_<hash>.pdf 로 저장해 두었다가 다시 내려줍니다.
+    스트리밍하면서 임시 파일에 함께 기록하고, 끝까지 성공했을 때만 캐시로 확정합니다.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def path_for(self, story_id: int, key: str) -> str:
+        return os.path.join(self.cache_dir, f"story_{story_id}_{key[:16]}.pdf")
+
+    def get(self, story_id: int, key: str) -> Optional[str]:
+        path = self.path_for(story_id, key)
+        return path if os.path.exists(path) else None
+
+    def stream_and_store(self, story_id: int, key: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        final_path = self.path_for(story_id, key)
+        # 같은 프로세스의 여러 스레드가 같은 PDF를 동시에 만들 수 있으므로 임시 파일 이름은 매번 새로 정합니다.
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=os.path.basename(final_path) + ".", suffix=".tmp")
+        done = False
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    yield chunk
+            os.replace(tmp_path, final_path)
+            done = True
+            # 내용이 바뀌기 전의 예전 PDF는 지웁니다.
+            for old in glob.glob(os.path.join(self.cache_dir, f"story_{story_id}_*.pdf")):
+                if old != final_path:
+                    os.remove(old)
+        finally:
+            if not done and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def invalidate(self, story_id: int):
+        for path in glob.glob(os.path.join(self.cache_dir, f"story_{story_id}_*.pdf")):
+            os.remove(path)
+
+
+# --- 최소 PDF 작성기 ---
+
+class _PdfWriter:
+    """객체를 순서대로 바이트로 만들어 내보내고 xref 용 오프셋만 기억합니다."""
+
+    def __init__(self):
+        self.pos = 0
+        self.offsets: Dict[int, int] = {}
+        self._next = 1
+
+    def reserve(self) -> int:
+        num = self._next
+        self._next += 1
+        return num
+
+    def emit(self, data: bytes) -> bytes:
+        self.pos += len(data)
+        return data
+
+    def obj(self, num: int, body: str) -> bytes:
+        self.offsets[num] = self.pos
+        return self.emit(f"{num} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+
+    def stream(self, num: int, head: str, data: bytes) -> bytes:
+        self.offsets[num] = self.pos
+        return self.emit(
+            f"{num} 0 obj\n<< {head} /Length {len(data)} >>\nstream\n".encode("latin-1")
+            + data + b"\nendstream\nendobj\n"
+        )
+
+    def trailer(self, root: int, info: int) -> bytes:
+        xref_at = self.pos
+        size = self._next
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        for num in range(1, size):
+            lines.append(f"{self.offsets.get(num, 0):010d} 00000 n \n")
+        lines.append(f"trailer\n<< /Size {size} /Root {root} 0 R /Info {info} 0 R >>\nstartxref\n{xref_at}\n%%EOF\n")
+        return self.emit("".join(lines).encode("latin-1"))
+
+
+def _jpeg_info(data: bytes) -> Optional[Tuple[int, int, int]]:
+    """JPEG SOF 마커에서 (너비, 높이, 채널 수)를 읽습니다. JPEG가 아니면 None"""
+    if not data or data[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        seg_len = int.from_bytes(data[i + 2:i + 4], "big")
+        if marker in (0xC0, 0xC1, 0xC2):
+            height = int.from_bytes(data[i + 5:i + 7], "big")
+            width = int.from_bytes(data[i + 7:i + 9], "big")
+            return width, height, data[i + 9]
+        i += 2 + seg_len
+    return None
+
+
+def _as_jpeg(data: Optional[bytes]) -> Optional[bytes]:
+    """PDF에 그대로 넣을 수 있는 JPEG 바이트를 반환합니다. PNG 등은 Pillow 가 있으면 JPEG로 변환합니다."""
+    if not data:
+        return None
+    if _jpeg_info(data):
+        return data
+
+    from storybook.providers.image_candidates import _load_pil
+    pil = _load_pil()
+    if pil is None:
+        logging.warning("Pillow 패키지가 없어 JPEG가 아닌 이미지를 PDF에서 뺍니다.")
+        return None
+    Image, _ = pil
+    try:
+        img = Image.open(io.BytesIO(data))
+        if img.mode in ("RGBA", "LA", "P"):
+            # 투명한 부분은 흰 배경으로 채웁니다.
+            img = img.convert("RGBA")
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[-1])
+            img = background
+        elif img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        out = io.BytesIO()
+        img.save(out, format="JPEG", quality=90)
+        return out.getvalue()
+    except Exception as e:
+        logging.warning(f"PDF에 넣을 수 없는 이미지를 건너뜁니다: {e}")
+        return None
+
+
+def _text_hex(text: str) -> str:
+    # UniKS-UCS2-H 인코딩: UTF-16BE (BMP 밖의 문자는 제외)
+    text = "".join(ch for ch in text if ord(ch) < 0x10000)
+    return text.encode("utf-16-be").hex().upper()
+
+
+def _char_width(ch: str) -> float:
+    return 0.5 if ord(ch) < 0x80 else 1.0
+
+
+def _wrap(text: str, size: float, max_width: float) -> List[str]:
+    lines = []
+    for para in (text or "").split("\n"):
+        line, width = "", 0.0
+        for ch in para:
+            w = _char_width(ch) * size
+            if width + w > max_width and line:
+                lines.append(line)
+                line, width = "", 0.0
+                if ch == " ":
+                    continue
+            line += ch
+            width += w
+        lines.append(line)
+    return lines
+
+
+def _text_width(text: str, size: float) -> float:
+    return sum(_char_width(ch) for ch in text) * size
+
+
+def _rgb(color: str) -> Tuple[float, float, float]:
+    color = (color or "#ffffff").lstrip("#")
+    try:
+        return tuple(int(color[i:i + 2], 16) / 255 for i in (0, 2, 4))
+    except ValueError:
+        return 1.0, 1.0, 1.0
+
+
+def _text_ops(lines: List[str], x: float, y: float, size: float, leading: float, center: bool = False) -> str:
+    ops = []
+    for line in lines:
+        lx = (PAGE_W - _text_width(line, size)) / 2 if center else x
+        ops.append(f"BT /F1 {size} Tf {lx:.2f} {y:.2f} Td <{_text_hex(line)}> Tj ET")
+        y -= leading
+    return "\n".join(ops)
+
+
+def render_story_pdf(
+        story: Story,
+        cover: Optional[Cover],
+        fetch: Callable[[str], Optional[bytes]] = fetch_image,
+        prefetch: int = 2,
+) -> Iterator[bytes]:
+    """
+    스토리를 PDF로 만들어 페이지 단위로 바이트 조각을 내보냅니다.
+    문서 전체를 메모리에 올리지 않고, 다음 몇 페이지의 이미지만 미리 받아 둡니다.
+    """
+    w = _PdfWriter()
+    catalog, pages_root, font, cid_font, descriptor, info = (w.reserve() for _ in range(6))
+    page_ids: List[int] = []
+
+    yield w.emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    yield w.obj(catalog, f"<< /Type /Catalog /Pages {pages_root} 0 R >>")
+    yield w.obj(font, f"<< /Type /Font /Subtype /Type0 /BaseFont /{FONT_NAME} /Encoding /UniKS-UCS2-H "
+                      f"/DescendantFonts [{cid_font} 0 R] >>")
+    yield w.obj(cid_font, f"<< /Type /Font /Subtype /CIDFontType0 /BaseFont /{FONT_NAME} "
+                          f"/CIDSystemInfo << /Registry (Adobe) /Ordering (Korea1) /Supplement 1 >> "
+                          f"/FontDescriptor {descriptor} 0 R /DW 1000 /W [1 95 500] >>")
+    yield w.obj(descriptor, f"<< /Type /FontDescriptor /FontName /{FONT_NAME} /Flags 6 "
+                            f"/FontBBox [0 -148 1001 880] /ItalicAngle 0 /Ascent 880 /Descent -148 "
+                            f"/CapHeight 880 /StemV 91 >>")
+
+    def page(content: str, image: Optional[bytes] = None) -> Iterator[bytes]:
+        xobjects = ""
+        if image is not None:
+            iw, ih, comps = _jpeg_info(image)
+            space = {1: "/DeviceGray", 4: "/DeviceCMYK"}.get(comps, "/DeviceRGB")
+            img_id = w.reserve()
+            yield w.stream(img_id, f"/Type /XObject /Subtype /Image /Width {iw} /Height {ih} "
+                                   f"/ColorSpace {space} /BitsPerComponent 8 /Filter /DCTDecode", image)
+            xobjects = f"/XObject << /Im1 {img_id} 0 R >>"
+        content_id, page_id = w.reserve(), w.reserve()
+        yield w.stream(content_id, "", content.encode("latin-1"))
+        yield w.obj(page_id, f"<< /Type /Page /Parent {pages_root} 0 R /MediaBox [0 0 {PAGE_W} {PAGE_H}] "
+                             f"/Resources << /Font << /F1 {font} 0 R >> {xobjects} >> /Contents {content_id} 0 R >>")
+        page_ids.append(page_id)
+
+    title = story.title or ""
+    pages = story.pages
+
+    with ThreadPoolExecutor(max_workers=max(1, prefetch)) as pool:
+        # 표지 + 본문 이미지 URL 목록 (앞에서부터 prefetch 개만 미리 받아 둡니다)
+        urls = [cover.front_image_url if cover else ""] + [p.url for p in pages]
+
+        def load(url: str) -> Optional[bytes]:
+            # 변환(PNG → JPEG)도 미리 받는 스레드에서 함께 처리합니다.
+            return _as_jpeg(fetch(url))
+
+        futures = [pool.submit(load, u) for u in urls[:prefetch]]
+
+        def next_image(i: int) -> Optional[bytes]:
+            if i + prefetch < len(urls):
+                futures.append(pool.submit(load, urls[i + prefetch]))
+            data = futures[i].result()
+            futures[i] = None  # 다 쓴 이미지는 바로 놓아줍니다.
+            return data
+
+        # 1. 앞표지
+        img = next_image(0)
+        ops = []
+        if img:
+            ops.append(f"q {PAGE_W} 0 0 {PAGE_H} 0 0 cm /Im1 Do Q")
+        pos = (cover.title_position if cover else None) or "middle"
+        ty = {"top": PAGE_H - 140, "bottom": 160}.get(pos, PAGE_H / 2)
+        ops.append(_text_ops(_wrap(title, 32, PAGE_W - 2 * MARGIN), MARGIN, ty, 32, 42, center=True))
+        if cover and cover.author_name:
+            ops.append(_text_ops([cover.author_name], MARGIN, 72, 16, 20, center=True))
+        yield from page("\n".join(ops), img)
+
+        # 2. 본문 (이미지 위, 글 아래 / 글이 넘치면 다음 쪽에 이어서)
+        text_size, leading = 14, 24
+        max_text_w = PAGE_W - 2 * MARGIN
+        img_size = PAGE_W - 2 * MARGIN
+        for i, p in enumerate(pages, start=1):
+            img = next_image(i)
+            lines = _wrap(p.text or "", text_size, max_text_w)
+            y = PAGE_H - MARGIN
+            ops = []
+            if img:
+                y -= img_size
+                ops.append(f"q {img_size} 0 0 {img_size} {MARGIN} {y} cm /Im1 Do Q")
+                y -= 36
+            else:
+                y -= 24
+            while True:
+                fit = max(1, int((y - MARGIN) // leading))
+                ops.append(_text_ops(lines[:fit], MARGIN, y, text_size, leading))
+                lines = lines[fit:]
+                if not lines:
+                    break
+                yield from page("\n".join(ops), img)
+                img, ops, y = None, [], PAGE_H - MARGIN - 24
+            ops.append(_text_ops([str(p.index)], MARGIN, 28, 10, 12, center=True))
+            yield from page("\n".join(ops), img)
+
+        # 3. 뒤표지 (배경색)
+        r, g, b = _rgb(cover.back_color if cover else None)
+        yield from page(f"{r:.3f} {g:.3f} {b:.3f} rg 0 0 {PAGE_W} {PAGE_H} re f")
+
+    kids = " ".join(f"{n} 0 R" for n in page_ids)
+    yield w.obj(pages_root, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>")
+    yield w.obj(info, f"<< /Title <FEFF{_text_hex(title)}> /Producer (Storybook AI) >>")
+    yield w.trailer(catalog, info)
@@ -0,0 +1,24 @@
+# storybook/jobs/__init__.py
+import os
+import threading
+
+from storybook.jobs.job_queue import JobQueue
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def jobs_enabled() -> bool:
+    """JOBS_MODE=queue 이면 생성 요청을 작업 큐에 넣고 바로 응답합니다. (기본 inline: 요청 안에서 실행)"""
+    return os.environ.get("JOBS_MODE", "inline").lower() == "queue"
+
+
+def get_job_queue() -> JobQueue:
+    """웹 서버와 워커가 함께 쓰는 작업 큐 (JOBS_DB_PATH, 기본 data/jobs.db)"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                from storybook.database.db import DATA_DIR
+                _queue = JobQueue(os.environ.get("JOBS_DB_PATH") or os.path.join(DATA_DIR, "jobs.db"))
+    return _queue
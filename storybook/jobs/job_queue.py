@@ -0,0 +1,273 @@
+# storybook/jobs/job_queue.py
+from __future__ import annotations
+import json
+import os
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+# SQLite 기반 작업 큐
+# - 상태: queued → running → succeeded | failed  (queued 상태에서만 cancelled 가능)
+# - 워커는 작업을 꺼낼 때 "임대(lease)"를 받습니다. visibility_timeout 안에 끝내거나 연장(heartbeat)하지 않으면
+#   워커가 죽은 것으로 보고 다른 워커가 다시 가져갑니다. (max_attempts 를 넘으면 실패 처리)
+# - 실패하면 지수 백오프 후 다시 시도합니다. (retry=False 로 실패시키면 바로 failed)
+# - 같은 클라이언트가 같은 idempotency_key 로 다시 넣으면 새 작업을 만들지 않고 기존 작업을 돌려줍니다.
+#   (기존 작업이 failed/cancelled 이면 그 작업에서 키를 떼고 새 작업을 만들어, 같은 키로 다시 시도할 수 있습니다)
+# - 우선순위(priority)가 큰 작업부터, 같으면 먼저 들어온 작업부터 꺼냅니다.
+
+FINISHED = ("succeeded", "failed", "cancelled")
+
+
+class JobQueue:
+
+    def __init__(self, path: str, busy_timeout: float = 10.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute('''
+                         CREATE TABLE IF NOT EXISTS jobs
+                         (
+                             id               TEXT PRIMARY KEY,
+                             kind             TEXT    NOT NULL,
+                             payload          TEXT    NOT NULL,
+                             priority         INTEGER NOT NULL DEFAULT 0,
+                             status           TEXT    NOT NULL DEFAULT 'queued',
+                             owner            TEXT,
+                             idempotency_key  TEXT,
+                             attempts         INTEGER NOT NULL DEFAULT 0,
+                             max_attempts     INTEGER NOT NULL DEFAULT 3,
+                             available_at     REAL    NOT NULL, -- 이 시각 이후에 꺼낼 수 있음 (재시도 대기)
+                             lease_owner      TEXT,
+                             lease_expires_at REAL,
+                             result           TEXT,
+                             error            TEXT,
+                             created_at       REAL    NOT NULL,
+                             started_at       REAL,
+                             finished_at      REAL,
+                             UNIQUE (owner, idempotency_key)
+                         )
+                         ''')
+            # 꺼낼 작업 찾기 / 만료된 임대 찾기 / 오래된 완료 작업 정리
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, priority DESC, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_expires_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at)")
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # --- 작업 넣기 / 조회 ---
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], priority: int = 0, owner: str = None,
+                idempotency_key: str = None, max_attempts: int = 3, delay: float = 0) -> Dict[str, Any]:
+        """
+        작업을 넣고 작업 정보를 반환합니다.
+        같은 owner + idempotency_key 의 작업이 대기/실행 중이거나 성공했으면 그 작업을 반환합니다.
+        """
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if idempotency_key:
+                row = conn.execute("SELECT * FROM jobs WHERE owner IS ? AND idempotency_key = ?",
+                                   (owner, idempotency_key)).fetchone()
+                if row is not None and row["status"] not in ("failed", "cancelled"):
+                    conn.execute("ROLLBACK")
+                    return _job(row)
+                if row is not None:
+                    # 실패/취소된 작업은 기록으로만 남기고 키를 넘겨줍니다.
+                    conn.execute("UPDATE jobs SET idempotency_key = NULL WHERE id = ?", (row["id"],))
+            conn.execute('''
+                         INSERT INTO jobs (id, kind, payload, priority, owner, idempotency_key, max_attempts,
+                                           available_at, created_at)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                         ''', (job_id, kind, json.dumps(payload, ensure_ascii=False), int(priority), owner,
+                               idempotency_key, max(1, int(max_attempts)), now + delay, now))
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            conn.execute("COMMIT")
+            return _job(row)
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            conn.close()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return _job(row) if row else None
+
+    def cancel(self, job_id: str) -> bool:
+        """아직 시작하지 않은 작업만 취소할 수 있습니다."""
+        conn = self._connect()
+        try:
+            cur = conn.execute("UPDATE jobs SET status = 'cancelled', finished_at = ? "
+                               "WHERE id = ? AND status = 'queued'", (time.time(), job_id))
+            return cur.rowcount == 1
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """{종류: {상태: 개수}}"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT kind, status, COUNT(*) FROM jobs GROUP BY kind, status").fetchall()
+        finally:
+            conn.close()
+        result: Dict[str, Dict[str, int]] = {}
+        for kind, status, count in rows:
+            result.setdefault(kind, {})[status] = count
+        return result
+
+    # --- 워커용 ---
+
+    def claim(self, worker_id: str, visibility_timeout: float, kinds: Iterable[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        꺼낼 수 있는 작업 하나를 임대합니다. (없으면 None)
+        임대가 만료된 running 작업(워커가 죽은 경우)도 다시 꺼냅니다.
+        """
+        kinds = list(kinds or [])
+        kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})" if kinds else ""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            # 재시도 횟수를 다 쓴 채 임대가 만료된 작업은 실패로 정리합니다.
+            conn.execute("UPDATE jobs SET status = 'failed', error = COALESCE(error, '임대 만료 (워커 중단)'), "
+                         "finished_at = ?, lease_owner = NULL "
+                         "WHERE status = 'running' AND lease_expires_at <= ? AND attempts >= max_attempts",
+                         (now, now))
+            row = conn.execute(f'''
+                               SELECT id FROM jobs
+                               WHERE ((status = 'queued' AND available_at <= ?)
+                                   OR (status = 'running' AND lease_expires_at <= ?)){kind_filter}
+                               ORDER BY priority DESC, created_at
+                               LIMIT 1
+                               ''', (now, now, *kinds)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute('''
+                         UPDATE jobs
+                         SET status = 'running',
+                             attempts = attempts + 1,
+                             lease_owner = ?,
+                             lease_expires_at = ?,
+                             started_at = ?
+                         WHERE id = ?
+                         ''', (worker_id, now + visibility_timeout, now, row["id"]))
+            job = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+            conn.execute("COMMIT")
+            return _job(job)
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            conn.close()
+
+    def heartbeat(self, job_ids: List[str], worker_id: str, visibility_timeout: float) -> List[str]:
+        """임대를 연장합니다. 이미 다른 워커에게 넘어간 작업은 빼고 연장된 ID만 반환합니다."""
+        if not job_ids:
+            return []
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            renewed = []
+            for job_id in job_ids:
+                cur = conn.execute("UPDATE jobs SET lease_expires_at = ? "
+                                   "WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                                   (time.time() + visibility_timeout, job_id, worker_id))
+                if cur.rowcount == 1:
+                    renewed.append(job_id)
+            conn.execute("COMMIT")
+            return renewed
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            conn.close()
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """결과를 기록합니다. 임대가 이미 다른 워커에게 넘어갔다면 기록하지 않고 False"""
+        conn = self._connect()
+        try:
+            cur = conn.execute('''
+                               UPDATE jobs
+                               SET status = 'succeeded', result = ?, error = NULL, finished_at = ?,
+                                   lease_owner = NULL, lease_expires_at = NULL
+                               WHERE id = ? AND status = 'running' AND lease_owner = ?
+                               ''', (json.dumps(result, ensure_ascii=False), time.time(), job_id, worker_id))
+            return cur.rowcount == 1
+        finally:
+            conn.close()
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True, backoff: float = 2.0) -> Optional[str]:
+        """
+        실패를 기록하고 바뀐 상태('queued' 또는 'failed')를 반환합니다.
+        재시도 횟수가 남아 있으면 backoff ** attempts 초 뒤에 다시 꺼낼 수 있게 됩니다.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT attempts, max_attempts FROM jobs "
+                               "WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                               (job_id, worker_id)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            now = time.time()
+            if retry and row["attempts"] < row["max_attempts"]:
+                conn.execute("UPDATE jobs SET status = 'queued', error = ?, available_at = ?, "
+                             "lease_owner = NULL, lease_expires_at = NULL WHERE id = ?",
+                             (error, now + backoff ** row["attempts"], job_id))
+                status = "queued"
+            else:
+                conn.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, "
+                             "lease_owner = NULL, lease_expires_at = NULL WHERE id = ?",
+                             (error, now, job_id))
+                status = "failed"
+            conn.execute("COMMIT")
+            return status
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            conn.close()
+
+    def release(self, job_id: str, worker_id: str, delay: float = 0) -> bool:
+        """
+        실행하지 못한 작업을 대기열로 돌려놓습니다. (업스트림 한도 등으로 시작하지 못한 경우)
+        시도 횟수는 되돌리므로 재시도 횟수를 쓰지 않습니다.
+        """
+        conn = self._connect()
+        try:
+            cur = conn.execute("UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), available_at = ?, "
+                               "lease_owner = NULL, lease_expires_at = NULL "
+                               "WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                               (time.time() + delay, job_id, worker_id))
+            return cur.rowcount == 1
+        finally:
+            conn.close()
+
+    def purge(self, older_than: float) -> int:
+        """끝난 지 older_than 초가 지난 작업을 지우고 개수를 반환합니다."""
+        conn = self._connect()
+        try:
+            cur = conn.execute(f"DELETE FROM jobs WHERE finished_at < ? AND status IN {FINISHED}",
+                               (time.time() - older_than,))
+            return cur.rowcount
+        finally:
+            conn.close()
+
+
+def _job(row) -> Dict[str, Any]:
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
@@ -0,0 +1,128 @@
+# storybook/jobs/tasks.py
+from __future__ import annotations
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# 업스트림(Gemini / 이미지 서비스)을 호출하는 생성 작업들.
+# 요청 안에서 바로 실행(JOBS_MODE=inline)할 때와 작업 큐 워커에서 실행할 때 같은 함수를 씁니다.
+# Flask 요청/세션에 의존하지 않고, 입력(payload)과 결과(응답 JSON)는 모두 JSON 으로 직렬화할 수 있어야 합니다.
+
+
+class PermanentJobError(Exception):
+    """다시 시도해도 소용없는 실패 (예: API 키 없음). 워커는 재시도하지 않고 바로 실패 처리합니다."""
+
+
+def page_texts(pages_in: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """본문 이미지 생성 대상 페이지 [{"index", "original_text"}] (index 가 잘못된 페이지는 제외)"""
+    valid_pages = []
+    for p in pages_in:
+        try:
+            idx = int(p.get("index"))
+            txt = (p.get("text") or "").strip()
+            valid_pages.append({"index": idx, "original_text": txt})
+        except (TypeError, ValueError, AttributeError):
+            continue
+    return valid_pages
+
+
+def generate_plot(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from storybook.providers.gemini_provider import GeminiProvider
+
+    provider = GeminiProvider()
+    if not provider.is_available():
+        raise PermanentJobError("API 키를 찾을 수 없습니다.")
+    print("✨ Gemini API를 이용한 플롯 생성 시작...")
+    return {"pages": provider.generate_story(payload.get("meta") or {}, payload.get("pages") or [])}
+
+
+def generate_images(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    payload: {"pages", "style", "candidates", "prompts"}
+    prompts 는 미리 번역해 둔 영어 프롬프트(페이지 순서, 없으면 None)로, 빠진 것만 일괄 번역합니다.
+    """
+    from storybook.providers.gemini_provider import GeminiProvider
+    from storybook.providers.image_candidates import CandidateGenerator, candidate_count, get_image_service
+
+    valid_pages = page_texts(payload.get("pages") or [])
+    style = (payload.get("style") or "동화 일러스트").strip()
+    k = candidate_count(payload.get("candidates"))
+    korean_texts = [p["original_text"] for p in valid_pages]
+
+    english_prompts: List[Optional[str]] = list(payload.get("prompts") or [])
+    english_prompts += [None] * (len(korean_texts) - len(english_prompts))
+
+    # 선번역이 없는 문장만 일괄 번역 실행 (한글 -> 영어 프롬프트)
+    missing = [i for i, prompt in enumerate(english_prompts) if prompt is None]
+    if missing:
+        translated = GeminiProvider().translate_prompts_bulk([korean_texts[i] for i in missing])
+        for i, prompt in zip(missing, translated):
+            english_prompts[i] = prompt
+
+    full_prompts = [f"({style}), {english_prompts[i] or 'storybook scene'}" for i in range(len(valid_pages))]
+
+    out = []
+    if k > 1:
+        candidates = CandidateGenerator().generate(full_prompts, k)
+        for page_data, cands in zip(valid_pages, candidates):
+            out.append({"index": page_data["index"], "url": cands[0]["url"], "candidates": cands})
+    else:
+        img_provider = get_image_service()[0]
+        for page_data, full_prompt in zip(valid_pages, full_prompts):
+            url = img_provider.build_image_url(full_prompt)
+            out.append({"index": page_data["index"], "url": url})
+
+            time.sleep(0.1)
+    return {"images": out}
+
+
+def generate_cover_image(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from storybook.providers.gemini_provider import DEFAULT_IMAGE_PROMPT
+    from storybook.providers.image_candidates import CandidateGenerator, candidate_count, get_image_service
+    from storybook.providers.translation_batcher import get_translation_batcher
+
+    custom_prompt = (payload.get("prompt") or "").strip()
+    title = payload.get("title", "")
+
+    # 여러 사용자의 번역 요청을 모아 한 번에 처리하는 배처를 사용합니다.
+    batcher = get_translation_batcher()
+
+    def translate(text: str) -> str:
+        # 번역이 실패하거나 시간 안에 끝나지 않으면 (개별 번역과 같은) 기본 프롬프트로 그립니다.
+        try:
+            return batcher.translate(text)
+        except Exception as e:
+            print(f"⚠️ 번역 실패, 기본 프롬프트 사용: {e!r}")
+            return DEFAULT_IMAGE_PROMPT
+
+    # 프롬프트 번역 및 생성
+    if custom_prompt:
+        print(f" 프롬프트 번역 시도: {custom_prompt}")
+        translated_text = translate(custom_prompt)
+        prompt = f"(cover art style), {translated_text}, flat 2d illustration, full page design, no text, vivid colors"
+    else:
+        print(f" 제목 번역 시도: {title}")
+        translated_title = translate(title)
+        prompt = f"(cover art style), flat 2d illustration for a story titled '{translated_title}', full page design, no text, vivid colors"
+
+    k = candidate_count(payload.get("candidates"))
+    if k > 1:
+        cands = CandidateGenerator().generate([prompt], k)[0]
+        return {"url": cands[0]["url"], "candidates": cands, "ok": True}
+
+    url = get_image_service()[0].build_image_url(prompt)
+    return {"url": url, "ok": True}
+
+
+# 작업 종류 → (실행 함수, 기본 우선순위)
+# 화면에서 바로 기다리는 짧은 작업(플롯/표지)을 여러 장짜리 본문 이미지보다 먼저 처리합니다.
+HANDLERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "plot": generate_plot,
+    "cover_image": generate_cover_image,
+    "images": generate_images,
+}
+
+PRIORITIES: Dict[str, int] = {
+    "plot": 20,
+    "cover_image": 10,
+    "images": 0,
+}
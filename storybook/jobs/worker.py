@@ -0,0 +1,188 @@
+# storybook/jobs/worker.py
+from __future__ import annotations
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from typing import Dict, Iterable, Optional
+
+from storybook.jobs.job_queue import JobQueue
+from storybook.jobs.tasks import HANDLERS, PermanentJobError
+from storybook.ratelimit import RateLimited, get_limiter
+
+
+class Worker:
+    """
+    작업 큐에서 작업을 꺼내 실행하는 워커 (스레드 concurrency 개).
+    업스트림 호출은 대부분 네트워크 대기라서 스레드로 충분히 병렬 처리됩니다.
+    실행 중인 작업의 임대는 별도 스레드가 visibility_timeout 의 1/3 마다 연장합니다.
+
+    업스트림 한도: 작업 실행은 웹 라우트와 같은 동시 호출 예산(FairScheduler, 작업을 넣은 클라이언트별 공정 순서)
+    안에서 하고, kind_limits 로 종류별 동시 실행 수도 제한할 수 있습니다. (예: {"images": 2})
+    """
+
+    def __init__(self, queue: JobQueue, concurrency: int = 4, visibility_timeout: float = 60,
+                 poll_interval: float = 1.0, kinds: Iterable[str] = None, retention: float = 86400,
+                 kind_limits: Dict[str, int] = None, limiter=None):
+        kinds = list(kinds or HANDLERS)
+        kind_limits = dict(kind_limits or {})
+        unknown = sorted(set(kinds) - set(HANDLERS)) + sorted(set(kind_limits) - set(HANDLERS))
+        if unknown:
+            # 오타를 그냥 빼면 처리할 종류가 비어 "전부 처리"가 되어 버리므로 시작하지 않습니다.
+            raise ValueError(f"알 수 없는 작업 종류입니다: {', '.join(unknown)} (가능: {', '.join(HANDLERS)})")
+
+        self.queue = queue
+        self.concurrency = max(1, concurrency)
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.kinds = kinds
+        self.kind_limits = kind_limits
+        self.retention = retention
+        self.limiter = limiter
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._claim_lock = threading.Lock()
+        self._running: Dict[str, str] = {}  # job_id -> 실행 중인 스레드 이름
+        self._running_kinds: Dict[str, int] = {}
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        limits = "".join(f", {k} 최대 {n}개" for k, n in self.kind_limits.items())
+        print(f"👷 작업 워커 시작: {self.worker_id} (동시 {self.concurrency}개{limits}, 종류 {', '.join(self.kinds)})")
+        threads = [threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+                   for i in range(self.concurrency)]
+        threads.append(threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True))
+        for t in threads:
+            t.start()
+        try:
+            while not self._stop.wait(60):
+                purged = self.queue.purge(self.retention)
+                if purged:
+                    print(f"🧹 끝난 작업 {purged}개 정리")
+        finally:
+            # 새 작업은 더 꺼내지 않고, 실행 중인 작업이 끝날 때까지 기다립니다.
+            for t in threads:
+                t.join()
+            print("👷 작업 워커 종료")
+
+    def run_once(self) -> Optional[str]:
+        """작업 하나를 꺼내 실행하고 결과 상태를 반환합니다. (꺼낼 작업이 없으면 None)"""
+        # 종류별 한도를 넘지 않도록, 자리가 남은 종류만 꺼내고 바로 자리를 잡습니다.
+        with self._claim_lock:
+            with self._lock:
+                kinds = [k for k in self.kinds
+                         if self._running_kinds.get(k, 0) < self.kind_limits.get(k, self.concurrency)]
+            if not kinds:
+                return None
+            job = self.queue.claim(self.worker_id, self.visibility_timeout, kinds)
+            if job is None:
+                return None
+            with self._lock:
+                self._running[job["id"]] = threading.current_thread().name
+                self._running_kinds[job["kind"]] = self._running_kinds.get(job["kind"], 0) + 1
+        try:
+            return self._execute(job)
+        finally:
+            with self._lock:
+                self._running.pop(job["id"], None)
+                self._running_kinds[job["kind"]] -= 1
+
+    def _execute(self, job) -> str:
+        started = time.monotonic()
+        limiter = self.limiter or get_limiter()
+        try:
+            # 토큰(요청 수 한도)은 작업을 넣을 때 이미 썼으므로, 여기서는 동시 호출 예산만 나눠 씁니다.
+            with limiter.scheduler.slot(job["owner"] or "worker"):
+                result = HANDLERS[job["kind"]](job["payload"])
+        except RateLimited as e:
+            # 업스트림이 바쁘면 재시도 횟수를 쓰지 않고 잠시 뒤로 미룹니다.
+            self.queue.release(job["id"], self.worker_id, delay=max(1.0, e.retry_after))
+            return "deferred"
+        except PermanentJobError as e:
+            return self.queue.fail(job["id"], self.worker_id, str(e), retry=False) or "lost"
+        except Exception as e:
+            traceback.print_exc()
+            status = self.queue.fail(job["id"], self.worker_id, str(e)) or "lost"
+            print(f"⚠️ 작업 실패 {job['kind']} {job['id']} ({job['attempts']}회째): {e} → {status}")
+            return status
+        if not self.queue.complete(job["id"], self.worker_id, result):
+            # 임대가 만료되어 다른 워커가 가져간 경우 (그쪽 결과를 사용)
+            print(f"⚠️ 임대 만료로 결과를 버립니다: {job['id']}")
+            return "lost"
+        print(f"✅ 작업 완료 {job['kind']} {job['id']} ({time.monotonic() - started:.1f}s)")
+        return "succeeded"
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                if self.run_once() is None:
+                    self._stop.wait(self.poll_interval)
+            except Exception as e:
+                print(f"⚠️ 작업 큐 오류: {e}")
+                self._stop.wait(self.poll_interval)
+
+    def _heartbeat_loop(self):
+        # 종료 요청 후에도 실행 중인 작업이 남아 있는 동안은 계속 연장합니다.
+        interval = self.visibility_timeout / 3
+        next_beat = time.monotonic() + interval
+        while True:
+            with self._lock:
+                job_ids = list(self._running)
+            if self._stop.is_set() and not job_ids:
+                return
+            if job_ids and time.monotonic() >= next_beat:
+                try:
+                    self.queue.heartbeat(job_ids, self.worker_id, self.visibility_timeout)
+                except Exception as e:
+                    print(f"⚠️ 임대 연장 실패: {e}")
+                next_beat = time.monotonic() + interval
+            elif not job_ids:
+                next_beat = time.monotonic() + interval
+            time.sleep(min(interval, 1.0))
+
+
+def main(argv=None):
+    import argparse
+    from storybook.jobs import get_job_queue
+
+    parser = argparse.ArgumentParser(description="생성 작업 워커")
+    parser.add_argument("--concurrency", type=int, default=int(os.environ.get("JOBS_WORKER_CONCURRENCY", "4")),
+                        help="동시에 실행할 작업 수 (기본: JOBS_WORKER_CONCURRENCY)")
+    parser.add_argument("--kinds", default=os.environ.get("JOBS_WORKER_KINDS", ""),
+                        help=f"처리할 작업 종류 (쉼표 구분, 기본: 전부 = {','.join(HANDLERS)})")
+    parser.add_argument("--visibility-timeout", type=float,
+                        default=float(os.environ.get("JOBS_VISIBILITY_TIMEOUT", "60")),
+                        help="임대 시간(초). 이 시간 안에 연장되지 않으면 다른 워커가 다시 가져갑니다.")
+    parser.add_argument("--kind-concurrency", default=os.environ.get("JOBS_KIND_CONCURRENCY", ""),
+                        help="종류별 최대 동시 실행 수 (예: images=2,plot=4, 기본: JOBS_KIND_CONCURRENCY)")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    kinds = [k.strip() for k in args.kinds.split(",") if k.strip()] or None
+    try:
+        kind_limits = _parse_kind_limits(args.kind_concurrency)
+        worker = Worker(get_job_queue(), concurrency=args.concurrency, visibility_timeout=args.visibility_timeout,
+                        poll_interval=args.poll_interval, kinds=kinds, kind_limits=kind_limits,
+                        retention=float(os.environ.get("JOBS_RETENTION_SEC", "86400")))
+    except ValueError as e:
+        parser.error(str(e))
+
+    # SIGTERM/SIGINT: 새 작업은 받지 않고 실행 중인 작업만 마친 뒤 종료합니다.
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+    worker.run()
+
+
+def _parse_kind_limits(raw: str) -> Dict[str, int]:
+    # 예: "images=2,plot=4"
+    limits = {}
+    for item in raw.split(","):
+        if "=" in item:
+            name, value = item.rsplit("=", 1)
+            limits[name.strip()] = max(1, int(value))
+    return limits
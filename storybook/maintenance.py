@@ -0,0 +1,215 @@
+# storybook/maintenance.py
+from __future__ import annotations
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from flask import Flask
+
+# DB 정리 작업 (보관 + 빈 페이지 반환 + 통계 갱신)
+# 1. 마지막 저장 후 ARCHIVE_AFTER_DAYS 일이 지난 스토리를 압축 보관함(<이름>_archive.db)으로 옮깁니다.
+#    보관한 스토리도 get_story_detail / 대시보드에서 그대로 보이고, 수정하면 자동으로 되돌아옵니다.
+# 2. PRAGMA incremental_vacuum 으로 삭제/덮어쓰기로 생긴 빈 페이지를 조금씩 파일에서 잘라냅니다.
+# 3. ANALYZE 로 쿼리 플래너 통계를 갱신합니다. (analysis_limit 로 표본만 읽음)
+#
+# 요청 처리를 막지 않도록 스토리 한 권 / 빈 페이지 몇백 개 단위의 짧은 트랜잭션으로 나눠 실행하고,
+# 단계 사이에 잠깐씩 쉬어 대기 중인 요청이 먼저 쓰기 잠금을 잡을 수 있게 합니다.
+
+VACUUM_STEP_PAGES = 256
+STEP_PAUSE_SEC = 0.05
+ANALYSIS_LIMIT = 1000
+
+
+def _file_bytes(path: str) -> int:
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def compact(path: str, step_pages: int = VACUUM_STEP_PAGES, pause: float = STEP_PAUSE_SEC,
+            convert: bool = False, dry_run: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    SQLite 파일 하나의 빈 페이지를 반환하고 통계를 갱신합니다. (파일이 없으면 None)
+
+    auto_vacuum 이 꺼진 채 만들어진 예전 파일은 incremental_vacuum 이 동작하지 않습니다. (report["vacuum_skipped"])
+    convert=True 면 한 번 전체 VACUUM 으로 전환하는데, 그동안 쓰기가 막히므로 점검 시간에만 쓰세요.
+    """
+    if not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        incremental = conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        report = {
+            "path": path,
+            "bytes_before": _file_bytes(path),
+            "free_bytes_before": free_before * page_size,
+            "incremental": incremental,
+        }
+        if dry_run:
+            return report
+
+        if not incremental and convert:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            report["converted"] = True
+        elif incremental:
+            while conn.execute("PRAGMA freelist_count").fetchone()[0] > 0:
+                # 한 번에 step_pages 개씩 (fetchall 까지 해야 끝까지 실행됩니다)
+                conn.execute(f"PRAGMA incremental_vacuum({int(step_pages)})").fetchall()
+                conn.commit()
+                time.sleep(pause)
+        else:
+            report["vacuum_skipped"] = True
+
+        conn.execute(f"PRAGMA analysis_limit = {int(ANALYSIS_LIMIT)}")
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+    report["bytes_after"] = _file_bytes(path)
+    report["reclaimed_bytes"] = report["bytes_before"] - report["bytes_after"]
+    return report
+
+
+def run_maintenance(repo=None, archive_after_days: int = None, convert: bool = False,
+                    dry_run: bool = False, pause: float = STEP_PAUSE_SEC) -> Dict[str, Any]:
+    """
+    저장소의 SQLite 파일(샤드별)마다 보관 → 빈 페이지 반환 → ANALYZE 를 실행하고 결과를 반환합니다.
+    archive_after_days 가 0 이하면 보관은 하지 않습니다. (기본: ARCHIVE_AFTER_DAYS)
+    """
+    if repo is None:
+        from storybook.repositories import get_story_repository
+        repo = get_story_repository()
+    if archive_after_days is None:
+        archive_after_days = int(os.environ.get("ARCHIVE_AFTER_DAYS", "0"))
+
+    started = time.time()
+    files: List[Dict[str, Any]] = []
+    archived = candidates = 0
+    for target in repo.maintenance_targets():
+        ids = target.archive_candidates(archive_after_days) if archive_after_days > 0 else []
+        candidates += len(ids)
+        for story_id in ids:
+            if dry_run:
+                continue
+            if target.archive_story(story_id, older_than_days=archive_after_days):
+                archived += 1
+            time.sleep(pause)
+        for path in (target.db_path, target.archive_path):
+            result = compact(path, pause=pause, convert=convert, dry_run=dry_run)
+            if result:
+                files.append(result)
+
+    return {
+        "started_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(started)),
+        "elapsed_sec": round(time.time() - started, 3),
+        "dry_run": dry_run,
+        "archive_after_days": archive_after_days,
+        "archive_candidates": candidates,
+        "archived": archived,
+        "reclaimed_bytes": sum(f.get("reclaimed_bytes", 0) for f in files),
+        # auto_vacuum 이 꺼져 있어 빈 공간을 반환하지 못한 파일 (run_maintenance.py --convert 로 한 번 전환 필요)
+        "needs_convert": [f["path"] for f in files if f.get("vacuum_skipped")],
+        "files": files,
+    }
+
+
+# --- 주기 실행 ---
+# 워커 프로세스가 여러 개여도 maintenance.db 의 실행 기록으로 주기마다 한 곳에서만 실행합니다.
+
+def _runs_db_path() -> str:
+    from storybook.database.db import DATA_DIR
+    return os.environ.get("MAINTENANCE_DB_PATH") or os.path.join(DATA_DIR, "maintenance.db")
+
+
+def _runs_connect():
+    path = _runs_db_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10, isolation_level=None)
+    conn.execute('''
+                 CREATE TABLE IF NOT EXISTS maintenance_runs
+                 (
+                     id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                     started_at  REAL NOT NULL,
+                     finished_at REAL,
+                     report      TEXT
+                 )
+                 ''')
+    return conn
+
+
+def _claim_run(interval: float) -> Optional[int]:
+    """마지막 실행 후 interval 초가 지났으면 실행 기록을 남기고 ID를 반환합니다. (아니면 None)"""
+    conn = _runs_connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        last = conn.execute("SELECT MAX(started_at) FROM maintenance_runs").fetchone()[0]
+        now = time.time()
+        if last is not None and now - last < interval:
+            conn.execute("ROLLBACK")
+            return None
+        run_id = conn.execute("INSERT INTO maintenance_runs (started_at) VALUES (?)", (now,)).lastrowid
+        conn.execute("COMMIT")
+        return run_id
+    finally:
+        conn.close()
+
+
+def _finish_run(run_id: int, report: Dict[str, Any]):
+    conn = _runs_connect()
+    try:
+        conn.execute("UPDATE maintenance_runs SET finished_at = ?, report = ? WHERE id = ?",
+                     (time.time(), json.dumps(report, ensure_ascii=False), run_id))
+    finally:
+        conn.close()
+
+
+def recent_reports(limit: int = 5) -> List[Dict[str, Any]]:
+    """최근 실행 결과 (최신순, 실행 중이면 report 가 None)"""
+    if not os.path.exists(_runs_db_path()):
+        return []
+    conn = _runs_connect()
+    try:
+        rows = conn.execute("SELECT id, started_at, finished_at, report FROM maintenance_runs "
+                            "ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+    finally:
+        conn.close()
+    return [{"id": run_id, "started_at": started, "finished_at": finished,
+             "report": json.loads(report) if report else None}
+            for run_id, started, finished, report in rows]
+
+
+def _loop(interval: float):
+    # 시작 직후 여러 워커가 한꺼번에 깨지 않도록 조금씩 어긋나게 확인합니다.
+    check_every = min(interval, 300)
+    while True:
+        time.sleep(check_every * random.uniform(0.5, 1.0))
+        try:
+            run_id = _claim_run(interval)
+            if run_id is None:
+                continue
+            report = run_maintenance()
+            _finish_run(run_id, report)
+            print(f"🧹 DB 정리 완료: 보관 {report['archived']}권, 반환 {report['reclaimed_bytes']:,} bytes")
+            if report["needs_convert"]:
+                # 주기 실행에서는 쓰기를 막는 전체 VACUUM 을 하지 않으므로, 전환하기 전까지는 공간이 줄지 않습니다.
+                print(f"⚠️ auto_vacuum 이 꺼진 DB 파일은 빈 공간을 반환하지 못했습니다: {', '.join(report['needs_convert'])}"
+                      f" → 점검 시간에 `python run_maintenance.py --convert` 를 한 번 실행하세요.")
+        except Exception as e:
+            print(f"⚠️ DB 정리 실패: {e}")
+
+
+def init_maintenance(app: Flask):
+    """
+    MAINTENANCE_INTERVAL_SEC 주기로 DB 정리를 백그라운드 스레드에서 실행합니다. (0 이면 꺼짐)
+    보관 기준은 ARCHIVE_AFTER_DAYS (0 이면 보관하지 않고 빈 페이지 반환/ANALYZE 만)
+    """
+    interval = float(app.config.get("MAINTENANCE_INTERVAL_SEC") or os.environ.get("MAINTENANCE_INTERVAL_SEC", "0"))
+    if interval <= 0:
+        return
+    threading.Thread(target=_loop, args=(interval,), name="db-maintenance", daemon=True).start()
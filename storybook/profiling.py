@@ -0,0 +1,203 @@
+# storybook/profiling.py
+from __future__ import annotations
+import os
+import sys
+import json
+import hmac
+import time
+import random
+import hashlib
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask, g, request
+
+
+class StackSampler:
+    """
+    통계적(샘플링) 프로파일러.
+    별도 스레드가 interval 마다 대상 스레드의 콜스택을 읽어 횟수를 셉니다.
+    요청 스레드의 실행은 건드리지 않으므로 계측 코드를 넣지 않아도 됩니다.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        # GIL 경합으로 샘플 간격이 늘어날 수 있으므로 실제 경과 시간을 함께 누적합니다.
+        self.durations: Counter = Counter()
+        self.started_at = 0.0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_key(frame))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples[tuple(stack)] += 1
+            self.durations[tuple(stack)] += elapsed
+
+    def collapsed(self) -> str:
+        """flamegraph.pl / speedscope 에서 읽을 수 있는 collapsed-stack 형식"""
+        lines = [";".join(f"{name} ({path}:{line})" for name, path, line in stack) + f" {count}"
+                 for stack, count in self.samples.most_common()]
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> Dict:
+        """speedscope(https://www.speedscope.app) sampled 프로파일 형식"""
+        frames: List[Dict] = []
+        index: Dict[Tuple, int] = {}
+        samples, weights = [], []
+        for stack in self.samples:
+            ids = []
+            for key in stack:
+                if key not in index:
+                    index[key] = len(frames)
+                    frames.append({"name": key[0], "file": key[1], "line": key[2]})
+                ids.append(index[key])
+            samples.append(ids)
+            weights.append(self.durations[stack])
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": self.elapsed,
+                "samples": samples,
+                "weights": weights,
+            }],
+            "name": name,
+            "exporter": "storybook-profiler",
+        }
+
+
+def _frame_key(frame) -> Tuple[str, str, int]:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return name, os.path.basename(code.co_filename), code.co_firstlineno
+
+
+def sign_request(secret: str, method: str, path: str, expires: int) -> str:
+    """
+    X-Profile-Signature 헤더 값을 만듭니다. (운영자가 특정 요청만 프로파일링할 때 사용)
+    expires(유닉스 시각)를 X-Profile-Expires 헤더로 함께 보내야 하며, 그 시각이 지나면 서명은 무효입니다.
+    """
+    message = f"{method.upper()} {path} {int(expires)}"
+    return hmac.new(secret.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def init_profiling(app: Flask):
+    """
+    요청 단위 프로파일링 훅을 등록합니다.
+
+    - PROFILE_SECRET 이 있으면 올바른 X-Profile-Signature / X-Profile-Expires 헤더가 붙은 요청만 프로파일링합니다.
+    - PROFILE_SAMPLE_RATE(0~1) 비율만큼 무작위 요청도 프로파일링합니다.
+    - PROFILE_DIR 에는 최근 PROFILE_MAX_FILES 개만 남기고 오래된 파일부터 지웁니다.
+    - 둘 다 꺼져 있으면 훅을 등록하지 않으므로 오버헤드가 없습니다.
+    """
+    secret = app.config.get("PROFILE_SECRET") or os.environ.get("PROFILE_SECRET", "")
+    sample_rate = float(app.config.get("PROFILE_SAMPLE_RATE") or os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+    if not secret and sample_rate <= 0:
+        return
+
+    from storybook.database.db import DATA_DIR
+    out_dir = app.config.get("PROFILE_DIR") or os.environ.get("PROFILE_DIR") or os.path.join(DATA_DIR, "profiles")
+    out_format = (app.config.get("PROFILE_FORMAT") or os.environ.get("PROFILE_FORMAT", "speedscope")).lower()
+    interval = float(app.config.get("PROFILE_INTERVAL_MS") or os.environ.get("PROFILE_INTERVAL_MS", "5")) / 1000
+    max_files = int(app.config.get("PROFILE_MAX_FILES") or os.environ.get("PROFILE_MAX_FILES", "200"))
+    suffix = ".folded" if out_format == "collapsed" else ".speedscope.json"
+
+    def signature_valid() -> bool:
+        signature = request.headers.get("X-Profile-Signature")
+        if not secret or not signature:
+            return False
+        try:
+            expires = int(request.headers.get("X-Profile-Expires", ""))
+        except ValueError:
+            return False
+        if expires < time.time():
+            return False
+        expected = sign_request(secret, request.method, request.path, expires)
+        return hmac.compare_digest(signature, expected)
+
+    def should_profile() -> bool:
+        if signature_valid():
+            return True
+        return sample_rate > 0 and random.random() < sample_rate
+
+    def write(sampler: StackSampler, path: str, name: str):
+        sampler.stop()
+        os.makedirs(out_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            if out_format == "collapsed":
+                f.write(sampler.collapsed())
+            else:
+                json.dump(sampler.speedscope(name), f)
+        print(f"🔥 프로파일 저장: {path} ({sampler.elapsed * 1000:.1f} ms)")
+        prune()
+
+    def prune():
+        # 파일 이름이 시각으로 시작하므로 이름순 = 오래된 순서입니다.
+        try:
+            names = sorted(n for n in os.listdir(out_dir) if n.endswith((".folded", ".speedscope.json")))
+        except OSError:
+            return
+        for old in names[:max(0, len(names) - max_files)]:
+            try:
+                os.remove(os.path.join(out_dir, old))
+            except OSError:
+                pass
+
+    @app.before_request
+    def _start_profiler():
+        if should_profile():
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            slug = request.path.strip("/").replace("/", "_") or "root"
+            sampler = StackSampler(threading.get_ident(), interval)
+            g._profiler = (sampler, os.path.join(out_dir, f"{ts}_{slug}{suffix}"), f"{request.method} {request.path}")
+            sampler.start()
+
+    @app.after_request
+    def _stop_profiler(response):
+        profile = g.pop("_profiler", None)
+        if profile is not None:
+            # 스트리밍 응답(export.pdf 등)은 본문을 다 보낸 뒤에 닫히므로, 그때 샘플링을 멈추고 저장합니다.
+            response.headers["X-Profile-File"] = os.path.basename(profile[1])
+            response.call_on_close(lambda: write(*profile))
+        return response
+
+    @app.teardown_request
+    def _cleanup_profiler(exc):
+        # 예외로 after_request 가 실행되지 않은 경우에도 프로파일러 스레드를 정리합니다.
+        profile = g.pop("_profiler", None)
+        if profile is not None:
+            write(*profile)
@@ -5,8 +5,25 @@ import json
 import logging
 from typing import List, Dict, Any, Optional
 
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
+# google.generativeai 는 grpc/protobuf 까지 함께 불러와 무겁기 때문에
+# 모듈 로드 시점이 아니라 실제로 Gemini를 처음 호출할 때 불러옵니다.
+_genai = None
+
+# 번역에 실패했을 때 쓰는 이미지 프롬프트
+DEFAULT_IMAGE_PROMPT = "storybook illustration, fantasy style"
+
+
+def _load_genai():
+    """Gemini SDK를 지연 로드합니다. 설치되어 있지 않으면 None을 반환합니다."""
+    global _genai
+    if _genai is None:
+        try:
+            import google.generativeai as genai
+        except ImportError:
+            logging.warning("google-generativeai 패키지가 설치되어 있지 않습니다.")
+            return None
+        _genai = genai
+    return _genai
 
 
 class GeminiProvider:
@@ -18,7 +35,8 @@ class GeminiProvider:
         self.api_key = os.environ.get("GEMINI_API_KEY")
 
         self._configured = False
-        if self.api_key:
+        genai = _load_genai() if self.api_key else None
+        if genai is not None:
             genai.configure(api_key=self.api_key)
             self._configured = True
             self.model_name = "gemini-2.0-flash"
@@ -39,7 +57,9 @@ class GeminiProvider:
         prompt = self._build_prompt(meta, pages)
 
         # 2. 모델 설정
-        model = genai.GenerativeModel(self.model_name)
+        from google.generativeai.types import HarmCategory, HarmBlockThreshold
+
+        model = _genai.GenerativeModel(self.model_name)
         safety_settings = {
             HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
             HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
@@ -150,7 +170,7 @@ class GeminiProvider:
         if not self.is_available() or not korean_text:
             return korean_text
 
-        model = genai.GenerativeModel(self.model_name)
+        model = _genai.GenerativeModel(self.model_name)
         system_instruction = (
             "You are a professional prompt engineer for AI Image Generator (Flux/Midjourney). "
             "Convert the Korean story text into a highly detailed English visual prompt. "
@@ -172,13 +192,29 @@ class GeminiProvider:
                 if attempt < max_retries:
                     time.sleep(1)
                 else:
-                    return "storybook illustration, fantasy style"
+                    return DEFAULT_IMAGE_PROMPT
 
     def translate_prompts_bulk(self, korean_texts: List[str]) -> List[str]:
         if not self.is_available() or not korean_texts:
             return korean_texts
 
-        model = genai.GenerativeModel(self.model_name)
+        try:
+            parsed = self.request_bulk_translation(korean_texts)
+        except Exception as e:
+            print(f"[Gemini] Bulk Translation Error: {e}")
+            parsed = None
+        return parsed if parsed is not None else korean_texts
+
+    def request_bulk_translation(self, korean_texts: List[str]) -> Optional[List[str]]:
+        """
+        여러 문장을 한 번의 호출로 번역합니다.
+        응답 개수가 입력과 다르면 None을 반환하여 호출 측에서 개별 번역 등으로 대체할 수 있게 합니다.
+        호출 자체가 실패하면(할당량 초과 등) 예외를 그대로 올립니다. (개별 번역으로 바꿔도 같은 이유로 실패하므로)
+        """
+        if not self.is_available() or not korean_texts:
+            return None
+
+        model = _genai.GenerativeModel(self.model_name)
         input_text_block = ""
         for i, txt in enumerate(korean_texts):
             input_text_block += f"{i}. {txt}\n"
@@ -189,19 +225,18 @@ class GeminiProvider:
         )
         prompt = f"{system_instruction}\n[Inputs]\n{input_text_block}"
 
+        response = model.generate_content(
+            prompt,
+            generation_config={"response_mime_type": "application/json"}
+        )
         try:
-            response = model.generate_content(
-                prompt,
-                generation_config={"response_mime_type": "application/json"}
-            )
             parsed = json.loads(response.text)
-            if isinstance(parsed, list) and len(parsed) == len(korean_texts):
-                print(f"🔤 Bulk Translation Success: {len(parsed)} items")
-                return parsed
-            else:
-                return korean_texts
-        except Exception:
-            return korean_texts
+        except ValueError:
+            return None
+        if isinstance(parsed, list) and len(parsed) == len(korean_texts):
+            print(f"🔤 Bulk Translation Success: {len(parsed)} items")
+            return [str(item) for item in parsed]
+        return None
 
     def _parse_response(self, text: str, expected_count: int) -> List[Dict[str, str]]:
         try:
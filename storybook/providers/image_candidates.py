@@ -0,0 +1,205 @@
+# storybook/providers/image_candidates.py
+from __future__ import annotations
+import io
+import os
+import random
+import hashlib
+import time
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlparse, parse_qs
+
+from storybook.providers.image_provider import ImageProvider, fetch_image
+
+# Pillow 는 지각 해시(perceptual hash) 계산에만 쓰므로 없으면 바이트 비교로 대신합니다.
+_pil = None
+
+# 프로세스 전체에서 동시에 받고 있는 후보 이미지 수 제한 (요청 여러 개가 겹쳐도 이 수를 넘지 않음)
+_fetch_slots = threading.BoundedSemaphore(int(os.environ.get("IMAGE_FETCH_MAX_INFLIGHT", "16")))
+
+
+def _load_pil():
+    global _pil
+    if _pil is None:
+        try:
+            from PIL import Image, ImageStat
+        except ImportError:
+            logging.warning("Pillow 패키지가 없어 이미지 중복 판별을 바이트 비교로 대신합니다.")
+            _pil = False
+        else:
+            _pil = (Image, ImageStat)
+    return _pil or None
+
+
+class StubImageService:
+    """
+    테스트/오프라인용 로컬 이미지 서비스.
+    원격 서비스 대신 URL의 seed 로 결정적인 이미지를 만들어 줍니다.
+    (seed % variants 가 같으면 거의 같은 그림이 나오므로 중복 제거 동작도 확인할 수 있습니다)
+    """
+    BASE = "stub://image/"
+
+    def __init__(self, variants: int = 3):
+        self.variants = variants
+
+    def build_image_url(self, prompt: str, seed: int = None) -> str:
+        if seed is None:
+            seed = random.randint(0, 999999)
+        return f"{self.BASE}{quote(prompt)}?seed={seed}"
+
+    def fetch(self, url: str) -> Optional[bytes]:
+        seed = int(parse_qs(urlparse(url).query).get("seed", ["0"])[0])
+        variant = seed % self.variants
+        pil = _load_pil()
+        if pil is None:
+            return f"stub-image-{variant}".encode("utf-8")
+
+        Image, _ = pil
+        # 변형마다 다른 8x8 블록 무늬, seed 마다 아주 약간의 밝기 차이
+        rng = random.Random(variant)
+        blocks = [rng.randint(0, 240) for _ in range(64)]
+        jitter = seed % 8
+        img = Image.new("L", (64, 64))
+        img.putdata([blocks[(y // 8) * 8 + x // 8] + jitter for y in range(64) for x in range(64)])
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+        return buf.getvalue()
+
+
+def get_image_service() -> Tuple[Any, Callable[[str], Optional[bytes]]]:
+    """IMAGE_SERVICE=stub 이면 로컬 스텁을, 아니면 Pollinations 를 사용합니다."""
+    if os.environ.get("IMAGE_SERVICE", "").lower() == "stub":
+        stub = StubImageService()
+        return stub, stub.fetch
+    return ImageProvider(), fetch_image
+
+
+def _fingerprint(data: bytes) -> Tuple[Optional[int], float]:
+    """(dHash 64bit, 점수)를 반환합니다. Pillow 가 없거나 디코딩에 실패하면 해시는 None"""
+    pil = _load_pil()
+    if pil is None:
+        return None, float(len(data))
+    Image, ImageStat = pil
+    try:
+        img = Image.open(io.BytesIO(data)).convert("L")
+    except Exception:
+        return None, float(len(data))
+
+    # 점수: 명암 대비(표준편차)가 클수록 디테일이 살아 있는 그림으로 봅니다.
+    score = ImageStat.Stat(img).stddev[0]
+
+    small = img.resize((9, 8))
+    px = list(small.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    return bits, score
+
+
+def _is_duplicate(a: Dict[str, Any], b: Dict[str, Any], threshold: int) -> bool:
+    if a["_phash"] is not None and b["_phash"] is not None:
+        return bin(a["_phash"] ^ b["_phash"]).count("1") <= threshold
+    return a["_digest"] == b["_digest"]
+
+
+class CandidateGenerator:
+    """
+    페이지마다 seed 를 K개 뽑아 이미지를 동시에 받아 보고,
+    거의 같은 그림은 지각 해시로 걸러낸 뒤 점수 순으로 정렬한 후보 목록을 만듭니다.
+    받아 둔 URL은 이미 생성이 끝난 상태라 화면에서 후보를 바꿔도 다시 기다리지 않습니다.
+
+    전체 소요 시간은 budget 초를 넘지 않습니다. 그 안에 받지 못한 후보는 버리고 받은 것만으로 고릅니다.
+    (동시에 받는 수는 요청당 max_workers, 프로세스 전체 IMAGE_FETCH_MAX_INFLIGHT 로 제한)
+    """
+
+    def __init__(self, provider=None, fetch: Callable[[str], Optional[bytes]] = None,
+                 max_workers: int = 8, dup_threshold: int = 6, budget: float = None):
+        if provider is None or fetch is None:
+            default_provider, default_fetch = get_image_service()
+            provider = provider or default_provider
+            fetch = fetch or default_fetch
+        if budget is None:
+            budget = float(os.environ.get("IMAGE_CANDIDATE_BUDGET_SEC", "30"))
+        self.provider = provider
+        self.fetch = fetch
+        self.max_workers = max_workers
+        self.dup_threshold = dup_threshold
+        self.budget = budget
+
+    def generate(self, prompts: List[str], k: int) -> List[List[Dict[str, Any]]]:
+        """프롬프트마다 후보 목록([{"url", "seed", "score"}], 점수 내림차순)을 반환합니다."""
+        seeds = [random.sample(range(1000000), k) for _ in prompts]
+        # 시간 안에 다 받지 못해도 페이지마다 후보가 고루 남도록 페이지를 번갈아 가며 받습니다.
+        jobs = [(i, seeds[i][j], self.provider.build_image_url(prompt, seed=seeds[i][j]))
+                for j in range(k) for i, prompt in enumerate(prompts)]
+        if not jobs:
+            return [[] for _ in prompts]
+
+        images = self._fetch_all([url for _, _, url in jobs])
+
+        grouped: List[List[Dict[str, Any]]] = [[] for _ in prompts]
+        fallback: List[Optional[Dict[str, Any]]] = [None for _ in prompts]
+        for (i, seed, url), data in zip(jobs, images):
+            if fallback[i] is None:
+                fallback[i] = {"url": url, "seed": seed, "score": 0.0}
+            if not data:
+                continue
+            phash, score = _fingerprint(data)
+            grouped[i].append({"url": url, "seed": seed, "score": round(score, 2),
+                               "_phash": phash, "_digest": hashlib.sha256(data).hexdigest()})
+
+        results = []
+        for i, cands in enumerate(grouped):
+            cands.sort(key=lambda c: c["score"], reverse=True)
+            kept = []
+            for c in cands:
+                if not any(_is_duplicate(c, other, self.dup_threshold) for other in kept):
+                    kept.append(c)
+            kept = [{"url": c["url"], "seed": c["seed"], "score": c["score"]} for c in kept]
+            # 모두 실패했다면 받지 못한 URL이라도 하나 돌려줍니다. (브라우저에서 다시 시도)
+            results.append(kept or [fallback[i]])
+        return results
+
+    def _fetch_all(self, urls: List[str]) -> List[Optional[bytes]]:
+        """URL 순서대로 받은 바이트를 반환합니다. budget 안에 받지 못한 것은 None"""
+        deadline = time.monotonic() + self.budget
+
+        def fetch(url: str) -> Optional[bytes]:
+            if not _fetch_slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                return None
+            try:
+                if time.monotonic() >= deadline:
+                    return None
+                return self.fetch(url)
+            finally:
+                _fetch_slots.release()
+
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls)))
+        try:
+            futures = [pool.submit(fetch, url) for url in urls]
+            pending = set(futures)
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                _, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if pending:
+                logging.warning(f"Image candidates: {len(pending)}/{len(urls)} not fetched within {self.budget:.0f}s")
+        finally:
+            # 시간이 지나 아직 시작하지 않은 것은 취소하고, 받는 중인 것은 기다리지 않습니다.
+            pool.shutdown(wait=False, cancel_futures=True)
+        return [f.result() if f.done() and not f.cancelled() and f.exception() is None else None
+                for f in futures]
+
+
+def candidate_count(raw, default: int = 1) -> int:
+    """요청의 candidates 값을 1 ~ IMAGE_MAX_CANDIDATES 범위로 맞춥니다."""
+    limit = int(os.environ.get("IMAGE_MAX_CANDIDATES", "4"))
+    try:
+        k = int(raw)
+    except (TypeError, ValueError):
+        k = default
+    return max(1, min(k, limit))
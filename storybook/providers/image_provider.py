@@ -1,8 +1,92 @@
 # storybook/providers/image_provider.py
 from __future__ import annotations
-from typing import List
-from urllib.parse import quote
+from typing import List, Optional
+from urllib.parse import quote, urljoin, urlparse
+import ipaddress
+import logging
+import os
 import random
+import socket
+
+import requests
+
+_http = requests.Session()
+_http.headers.update({"User-Agent": "storybook-dev/0.1"})
+
+_MAX_REDIRECTS = 3
+
+
+def allowed_image_hosts() -> set:
+    """서버가 내려받아도 되는 이미지 호스트 (IMAGE_FETCH_ALLOWED_HOSTS, 쉼표 구분)"""
+    raw = os.environ.get("IMAGE_FETCH_ALLOWED_HOSTS") or "image.pollinations.ai"
+    return {h.strip().lower() for h in raw.split(",") if h.strip()}
+
+
+def _refuse_reason(url: str) -> Optional[str]:
+    """
+    내려받으면 안 되는 URL 이면 이유를, 괜찮으면 None 을 반환합니다.
+    페이지/표지 URL 은 클라이언트가 저장한 값이므로, https + 허용 호스트 + 공인 주소로 풀리는 경우만 받습니다.
+    (내부 주소로 요청을 보내게 만드는 SSRF 방지)
+    """
+    try:
+        parsed = urlparse(url)
+        host, port = (parsed.hostname or "").lower(), parsed.port or 443
+    except ValueError:
+        return "잘못된 URL"
+    if parsed.scheme != "https":
+        return "https 가 아님"
+    if host not in allowed_image_hosts():
+        return f"허용되지 않은 호스트 {host}"
+    try:
+        infos = socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+    except OSError as e:
+        return f"주소를 찾을 수 없음 ({e})"
+    for info in infos:
+        addr = ipaddress.ip_address(info[4][0].split("%")[0])
+        if addr.version == 6 and addr.ipv4_mapped:
+            addr = addr.ipv4_mapped
+        if not addr.is_global:
+            # 사설/루프백/링크 로컬 등 (허용 호스트라도 내부 주소로 풀리면 거절)
+            return f"내부 주소 {addr}"
+    return None
+
+
+def fetch_image(url: str, timeout: float = 60, max_bytes: int = None) -> Optional[bytes]:
+    """
+    이미지 URL을 실제로 내려받습니다. (Pollinations 는 이 요청 시점에 그림을 생성합니다)
+    리다이렉트도 한 단계씩 같은 검사를 거치고, 최대 크기(IMAGE_FETCH_MAX_BYTES, 기본 10MB)를 넘으면 버립니다.
+    실패하거나 받을 수 없는 URL 이면 None 을 반환합니다.
+    """
+    if not url:
+        return None
+    if max_bytes is None:
+        max_bytes = int(os.environ.get("IMAGE_FETCH_MAX_BYTES", str(10 * 1024 * 1024)))
+    try:
+        for _ in range(_MAX_REDIRECTS + 1):
+            reason = _refuse_reason(url)
+            if reason:
+                logging.warning(f"Image fetch refused: {reason}")
+                return None
+            with _http.get(url, timeout=timeout, stream=True, allow_redirects=False) as res:
+                if res.is_redirect:
+                    url = urljoin(url, res.headers.get("Location", ""))
+                    continue
+                res.raise_for_status()
+                if int(res.headers.get("Content-Length") or 0) > max_bytes:
+                    logging.warning(f"Image fetch refused: {max_bytes} 바이트 초과")
+                    return None
+                data = bytearray()
+                for chunk in res.iter_content(64 * 1024):
+                    data += chunk
+                    if len(data) > max_bytes:
+                        logging.warning(f"Image fetch refused: {max_bytes} 바이트 초과")
+                        return None
+                return bytes(data)
+        logging.warning("Image fetch refused: 리다이렉트가 너무 많음")
+        return None
+    except Exception as e:
+        logging.warning(f"Image fetch failed: {e}")
+        return None
 
 
 class ImageProvider:
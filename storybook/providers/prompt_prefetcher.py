@@ -0,0 +1,145 @@
+# storybook/providers/prompt_prefetcher.py
+from __future__ import annotations
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Optional
+
+from storybook.providers.translation_batcher import TranslationBatcher, get_translation_batcher
+
+
+class PromptPrefetcher:
+    """
+    에디터 초안이 저장(/editor/cache)될 때 삽화용 영어 프롬프트를 미리 번역해 두는 선번역기입니다.
+
+    - 결과는 본문 텍스트의 해시로 저장되므로, images_generate 에서 같은 문장을 찾으면 바로 사용합니다.
+    - 초안(draft)별로 페이지마다 어떤 해시를 기다리는지 기억하고,
+      문장이 다시 바뀌면 아직 시작되지 않은 이전 번역 요청은 취소합니다.
+    """
+
+    def __init__(
+            self,
+            batcher_factory: Callable[[], TranslationBatcher] = get_translation_batcher,
+            max_entries: int = 1024,
+            max_drafts: int = 256,
+    ):
+        self._batcher_factory = batcher_factory
+        self.max_entries = max_entries
+        self.max_drafts = max_drafts
+
+        self._lock = threading.Lock()
+        self._by_hash: "OrderedDict[str, Future]" = OrderedDict()
+        self._drafts: "OrderedDict[str, Dict[int, str]]" = OrderedDict()
+
+    @staticmethod
+    def text_key(text: str) -> str:
+        return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+    def schedule(self, draft_id: str, page_texts: Dict[int, str]) -> int:
+        """
+        초안의 페이지 텍스트 중 바뀐 것만 선번역 대기열에 넣습니다.
+        새로 예약한 페이지 수를 반환합니다.
+        """
+        scheduled = 0
+        with self._lock:
+            previous = self._drafts.pop(draft_id, {})
+            current: Dict[int, str] = {}
+
+            for idx, text in page_texts.items():
+                text = (text or "").strip()
+                if not text:
+                    continue
+                key = self.text_key(text)
+                current[idx] = key
+                if key in self._by_hash:
+                    self._by_hash.move_to_end(key)
+                    continue
+                self._by_hash[key] = self._batcher_factory().submit(text)
+                scheduled += 1
+
+            self._drafts[draft_id] = current
+            while len(self._drafts) > self.max_drafts:
+                self._drafts.popitem(last=False)
+
+            # 바뀌었거나 사라진 페이지의 이전 작업 중 더 이상 아무도 기다리지 않는 것은 취소합니다.
+            stale = set(previous.values()) - set(current.values())
+            if stale:
+                referenced = {k for pages in self._drafts.values() for k in pages.values()}
+                for key in stale - referenced:
+                    fut = self._by_hash.get(key)
+                    if fut is not None and fut.cancel():
+                        del self._by_hash[key]
+
+            self._evict()
+        return scheduled
+
+    def count_new(self, page_texts: Dict[int, str]) -> int:
+        """schedule 하면 새로 번역을 예약하게 될 문장 수 (이미 번역했거나 진행 중인 문장은 제외)"""
+        with self._lock:
+            keys = {self.text_key(t) for t in page_texts.values() if (t or "").strip()}
+            return len(keys - self._by_hash.keys())
+
+    def lookup(self, text: str, timeout: float = 0) -> Optional[str]:
+        """
+        선번역 결과를 찾습니다. 진행 중이면 timeout(초)까지 기다리고,
+        없거나 실패했으면 None을 반환합니다.
+        """
+        key = self.text_key(text)
+        with self._lock:
+            fut = self._by_hash.get(key)
+        if fut is None or fut.cancelled():
+            return None
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeout:
+            return None
+        except Exception:
+            # 실패한 작업은 지워서 다음 요청에서 다시 번역되도록 합니다.
+            with self._lock:
+                if self._by_hash.get(key) is fut:
+                    del self._by_hash[key]
+            return None
+
+    def _evict(self):
+        # 오래된 완료 결과부터 정리합니다. (진행 중인 작업은 유지)
+        if len(self._by_hash) <= self.max_entries:
+            return
+        for key in list(self._by_hash):
+            if len(self._by_hash) <= self.max_entries:
+                break
+            if self._by_hash[key].done():
+                del self._by_hash[key]
+
+
+_prefetcher: Optional[PromptPrefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prompt_prefetcher() -> PromptPrefetcher:
+    """프로세스 전역에서 공유하는 선번역기를 반환합니다."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = PromptPrefetcher()
+        return _prefetcher
+
+
+def prefetch_editor_pages(draft_id: str, pages: list, charge: Callable[[], bool] = None) -> int:
+    """
+    /editor/cache 로 받은 페이지 목록(문자열 또는 {"text": ...})을 선번역 대기열에 넣습니다.
+    이미지 화면과 같은 규칙으로 페이지 번호는 1부터 매깁니다.
+    charge 를 주면 새로 번역할 문장이 있을 때 호출하고, False 면 (요청 한도 초과) 선번역을 건너뜁니다.
+    """
+    if not os.environ.get("GEMINI_API_KEY"):
+        return 0
+
+    page_texts = {}
+    for i, p in enumerate(pages or []):
+        txt = p if isinstance(p, str) else (p or {}).get("text", "")
+        page_texts[i + 1] = txt if isinstance(txt, str) else ""
+    prefetcher = get_prompt_prefetcher()
+    if charge is not None and prefetcher.count_new(page_texts) and not charge():
+        return 0
+    return prefetcher.schedule(draft_id, page_texts)
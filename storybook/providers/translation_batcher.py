@@ -0,0 +1,156 @@
+# storybook/providers/translation_batcher.py
+from __future__ import annotations
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+
+class TranslationBatcher:
+    """
+    여러 사용자의 이미지 프롬프트 번역 요청을 짧은 시간 동안 모아서
+    Gemini 일괄 번역(bulk JSON) 한 번으로 처리하는 마이크로 배처입니다.
+
+    - window_ms 동안, 또는 max_items 개가 모일 때까지 요청을 모읍니다.
+    - 결과는 각 요청자의 Future로 나누어 돌려줍니다.
+    - 일괄 번역 결과 개수가 맞지 않으면 항목별 번역으로 대체합니다.
+      (호출 자체가 실패하면 배치 전체를 실패로 돌려줍니다. 항목별로 다시 부르면 업스트림 호출만 늘어나므로)
+    - 모은 배치는 작은 스레드 풀(workers 개)에서 호출하므로, 느린 호출 하나가 다음 배치를 막지 않습니다.
+    """
+
+    def __init__(
+            self,
+            provider_factory: Callable[[], object],
+            window_ms: Optional[float] = None,
+            max_items: Optional[int] = None,
+            workers: Optional[int] = None,
+            timeout: Optional[float] = None,
+    ):
+        if window_ms is None:
+            window_ms = float(os.environ.get("TRANSLATE_BATCH_WINDOW_MS", "30"))
+        if max_items is None:
+            max_items = int(os.environ.get("TRANSLATE_BATCH_MAX_ITEMS", "16"))
+        if workers is None:
+            workers = int(os.environ.get("TRANSLATE_BATCH_WORKERS", "4"))
+        if timeout is None:
+            timeout = float(os.environ.get("TRANSLATE_TIMEOUT_SEC", "60"))
+
+        self._provider_factory = provider_factory
+        self.window = max(0.0, window_ms) / 1000
+        self.max_items = max(1, max_items)
+        self.timeout = timeout
+
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[str, Future]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="translation-dispatch")
+
+        # 통계 (업스트림 호출 절감 효과 확인용). 여러 디스패치 스레드가 갱신하므로 _stats_lock 으로 보호합니다.
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.upstream_calls = 0
+
+    def submit(self, korean_text: str) -> Future:
+        """번역 요청을 대기열에 넣고 결과를 받을 Future를 반환합니다."""
+        fut: Future = Future()
+        with self._stats_lock:
+            self.requests += 1
+        with self._cond:
+            self._pending.append((korean_text, fut))
+            self._ensure_worker()
+            self._cond.notify()
+        return fut
+
+    def translate(self, korean_text: str, timeout: Optional[float] = None) -> str:
+        """
+        번역 결과가 나올 때까지 기다렸다가 반환합니다.
+        timeout(기본 self.timeout) 안에 끝나지 않으면 concurrent.futures.TimeoutError 를 발생시킵니다.
+        """
+        if not korean_text:
+            return korean_text
+        fut = self.submit(korean_text)
+        try:
+            return fut.result(self.timeout if timeout is None else timeout)
+        except Exception:
+            # 아직 배치에 들어가지 않았다면 업스트림 호출에서 빠지도록 취소합니다.
+            fut.cancel()
+            raise
+
+    def _count_call(self):
+        with self._stats_lock:
+            self.upstream_calls += 1
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="translation-batcher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+
+                # 첫 요청이 들어온 시점부터 window 동안 더 모읍니다.
+                deadline = time.monotonic() + self.window
+                while len(self._pending) < self.max_items:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = self._pending[:self.max_items]
+                del self._pending[:self.max_items]
+
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: List[Tuple[str, Future]]):
+        # 이미 취소된 요청(예: 선번역 후 문장이 바뀐 경우)은 건너뜁니다.
+        batch = [(text, fut) for text, fut in batch if fut.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        # 같은 문장은 한 번만 번역합니다.
+        unique = list(dict.fromkeys(text for text, _ in batch))
+
+        try:
+            provider = self._provider_factory()
+            results = None
+            if not provider.is_available():
+                # API 키가 없으면 번역하지 않고 원문을 그대로 돌려줍니다. (업스트림 호출 없음)
+                results = unique
+            elif len(unique) > 1:
+                self._count_call()
+                results = provider.request_bulk_translation(unique)
+                if results is None:
+                    logging.warning(f"Bulk translation mismatch, fallback to per-item ({len(unique)} items)")
+
+            if results is None:
+                results = []
+                for text in unique:
+                    self._count_call()
+                    results.append(provider.translate_prompt_for_image(text))
+
+            translated = dict(zip(unique, results))
+            for text, fut in batch:
+                fut.set_result(translated[text])
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+
+
+_batcher: Optional[TranslationBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_translation_batcher() -> TranslationBatcher:
+    """프로세스 전역에서 공유하는 번역 배처를 반환합니다."""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            from storybook.providers.gemini_provider import GeminiProvider
+            _batcher = TranslationBatcher(GeminiProvider)
+        return _batcher
@@ -0,0 +1,366 @@
+# storybook/ratelimit.py
+from __future__ import annotations
+import os
+import math
+import time
+import heapq
+import sqlite3
+import threading
+import itertools
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+from flask import g, request, session, jsonify
+
+
+class RateLimited(Exception):
+    """한도를 넘은 요청입니다. retry_after(초) 후 다시 시도해야 합니다."""
+
+    def __init__(self, retry_after: float, reason: str):
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+# --- 토큰 버킷 백엔드 ---
+
+class MemoryBucketBackend:
+    """프로세스 내부 메모리에 클라이언트별 토큰 버킷을 저장합니다."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1) -> Tuple[bool, float]:
+        """토큰을 cost 만큼 꺼냅니다. (허용 여부, 재시도까지 남은 초)를 반환합니다."""
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            allowed, tokens, retry_after = _refill_and_take(tokens, updated, now, rate, burst, cost)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                # 이미 가득 찬 버킷은 지워도 처음 상태와 같으므로 정리합니다.
+                for k, (t, u) in list(self._buckets.items()):
+                    if t + (now - u) * rate >= burst:
+                        del self._buckets[k]
+        return allowed, retry_after
+
+
+class SQLiteBucketBackend:
+    """
+    SQLite 파일에 토큰 버킷을 저장합니다.
+    같은 노드의 여러 워커 프로세스가 하나의 한도를 공유할 수 있습니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        conn = self._connect()
+        conn.execute('''
+                     CREATE TABLE IF NOT EXISTS rate_buckets
+                     (
+                         bucket_key TEXT PRIMARY KEY,
+                         tokens     REAL NOT NULL,
+                         updated_at REAL NOT NULL
+                     )
+                     ''')
+        conn.execute('''
+                     CREATE TABLE IF NOT EXISTS upstream_slots
+                     (
+                         holder     TEXT PRIMARY KEY,
+                         expires_at REAL NOT NULL
+                     )
+                     ''')
+        conn.commit()
+        conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1) -> Tuple[bool, float]:
+        now = time.time()
+        conn = self._connect()
+        try:
+            # 다른 프로세스와 동시에 갱신하지 않도록 쓰기 잠금을 먼저 잡습니다.
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE bucket_key = ?",
+                               (key,)).fetchone()
+            tokens, updated = row if row else (burst, now)
+            allowed, tokens, retry_after = _refill_and_take(tokens, updated, now, rate, burst, cost)
+            conn.execute("INSERT OR REPLACE INTO rate_buckets (bucket_key, tokens, updated_at) VALUES (?, ?, ?)",
+                         (key, tokens, now))
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return allowed, retry_after
+
+    def try_acquire_slot(self, holder: str, limit: int, lease: float) -> bool:
+        """노드 전체 동시 호출 슬롯을 하나 잡습니다. 만료된 슬롯(죽은 워커)은 회수합니다."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM upstream_slots WHERE expires_at < ?", (now,))
+            (used,) = conn.execute("SELECT COUNT(*) FROM upstream_slots").fetchone()
+            ok = used < limit
+            if ok:
+                conn.execute("INSERT INTO upstream_slots (holder, expires_at) VALUES (?, ?)",
+                             (holder, now + lease))
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return ok
+
+    def release_slot(self, holder: str):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM upstream_slots WHERE holder = ?", (holder,))
+        finally:
+            conn.close()
+
+
+def _refill_and_take(tokens, updated, now, rate, burst, cost):
+    tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    retry_after = (cost - tokens) / rate if rate > 0 else 60.0
+    return False, tokens, retry_after
+
+
+# --- 업스트림 동시 호출 예산 + 가중 공정 큐 ---
+
+class FairScheduler:
+    """
+    Gemini 등 업스트림 호출의 전체 동시 실행 수를 제한하고,
+    대기 중인 클라이언트에게 가중 공정 큐(WFQ) 순서로 슬롯을 나눠줍니다.
+
+    - 클라이언트마다 가상 종료 시각(finish tag)을 누적하므로,
+      요청을 많이 보내는 클라이언트는 뒤로 밀리고 다른 클라이언트가 먼저 처리됩니다.
+    - 한 클라이언트가 max_queued 개 이상 대기 중이거나 queue_timeout 을 넘기면 RateLimited 를 발생시킵니다.
+    - slot_backend(SQLiteBucketBackend)를 주면 여러 프로세스가 같은 동시 호출 한도를 공유합니다.
+    """
+
+    def __init__(self, max_concurrent: int, max_queued: int = 2, queue_timeout: float = 10.0,
+                 slot_backend: Optional[SQLiteBucketBackend] = None, slot_lease: float = 120.0):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queued = max(0, max_queued)
+        self.queue_timeout = queue_timeout
+        self.slot_backend = slot_backend
+        self.slot_lease = slot_lease
+
+        self._cond = threading.Condition()
+        self._running = 0
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._queued: Dict[str, int] = {}
+        self._waiters = []  # (finish_tag, seq, client)
+        self._seq = itertools.count()
+
+    @contextmanager
+    def slot(self, client: str, weight: float = 1.0, cost: float = 1.0):
+        holder = self._acquire(client, weight, cost)
+        try:
+            yield
+        finally:
+            self._release(holder)
+
+    def _acquire(self, client: str, weight: float, cost: float) -> Optional[str]:
+        deadline = time.monotonic() + self.queue_timeout
+        with self._cond:
+            if self._queued.get(client, 0) >= self.max_queued and self._running >= self.max_concurrent:
+                raise RateLimited(1.0, "too many queued requests")
+
+            tag = max(self._virtual_time, self._last_finish.get(client, 0.0)) + cost / max(weight, 0.01)
+            self._last_finish[client] = tag
+            entry = (tag, next(self._seq), client)
+            heapq.heappush(self._waiters, entry)
+            self._queued[client] = self._queued.get(client, 0) + 1
+
+            try:
+                while True:
+                    if self._waiters[0] is entry and self._running < self.max_concurrent:
+                        holder = self._try_global_slot()
+                        if holder is not False:
+                            break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._waiters.remove(entry)
+                        heapq.heapify(self._waiters)
+                        self._cond.notify_all()
+                        raise RateLimited(1.0, "upstream busy")
+                    # 노드 공유 슬롯을 기다리는 경우에는 주기적으로 다시 확인합니다.
+                    self._cond.wait(min(remaining, 0.05) if self.slot_backend else remaining)
+
+                heapq.heappop(self._waiters)
+                self._virtual_time = tag
+                self._running += 1
+                self._cond.notify_all()
+                return holder
+            finally:
+                self._queued[client] -= 1
+                if not self._queued[client]:
+                    del self._queued[client]
+                    if not self._waiters:
+                        self._last_finish.clear()
+
+    def _try_global_slot(self):
+        if self.slot_backend is None:
+            return None
+        holder = f"{os.getpid()}-{threading.get_ident()}-{next(self._seq)}"
+        if self.slot_backend.try_acquire_slot(holder, self.max_concurrent, self.slot_lease):
+            return holder
+        return False
+
+    def _release(self, holder: Optional[str]):
+        if holder is not None:
+            self.slot_backend.release_slot(holder)
+        with self._cond:
+            self._running -= 1
+            self._cond.notify_all()
+
+
+# --- Flask 연동 ---
+
+class UpstreamLimiter:
+    """클라이언트별 토큰 버킷 + 전체 동시 호출 예산을 묶은 라우트용 한도 관리자입니다."""
+
+    def __init__(self, backend, scheduler: FairScheduler, rate: float, burst: float,
+                 weights: Optional[Dict[str, float]] = None):
+        self.backend = backend
+        self.scheduler = scheduler
+        self.rate = rate
+        self.burst = burst
+        self.weights = weights or {}
+
+    @contextmanager
+    def admit(self, client: str, cost: float = 1.0, ip: Optional[str] = None):
+        self.charge(client, cost, ip)
+        with self.scheduler.slot(client, self.weights.get(client, 1.0), cost):
+            yield
+
+    def charge(self, client: str, cost: float = 1.0, ip: Optional[str] = None):
+        """
+        클라이언트 버킷에서 토큰을 꺼냅니다. (부족하면 RateLimited)
+        ip 를 주면 그 IP 의 버킷에서도 꺼내므로, 세션 쿠키를 새로 받아도 같은 IP 의 한도는 이어집니다.
+        """
+        for key in ([client] if ip in (None, client) else [client, ip]):
+            allowed, retry_after = self.backend.take(key, self.rate, self.burst, cost)
+            if not allowed:
+                raise RateLimited(retry_after, "rate limit exceeded")
+
+
+def client_key() -> str:
+    """
+    API 키 > 세션 > IP 순서로 요청한 클라이언트를 식별합니다.
+    - X-API-Key 는 RATE_LIMIT_API_KEYS 에 등록된 키만 인정합니다. (아무 값이나 보내 한도를 새로 받는 것 방지)
+    - X-Forwarded-For 는 직접 연결한 주소가 RATE_LIMIT_TRUSTED_PROXIES 에 있을 때만 읽습니다.
+    요청마다 한 번만 정하므로, 요청 도중 세션 ID가 발급되어도 한도 계산과 작업 주인(owner)은 같은 값을 씁니다.
+    """
+    if "client_key" not in g:
+        api_key = request.headers.get("X-API-Key")
+        if api_key and api_key in _env_set("RATE_LIMIT_API_KEYS"):
+            g.client_key = f"key:{api_key}"
+        elif session.get("client_id"):
+            g.client_key = f"session:{session['client_id']}"
+        else:
+            g.client_key = f"ip:{_client_ip()}"
+    return g.client_key
+
+
+def _client_ip() -> str:
+    remote = request.remote_addr or "unknown"
+    proxies = _env_set("RATE_LIMIT_TRUSTED_PROXIES")
+    if remote not in proxies:
+        return remote
+    # 오른쪽(가까운 쪽)부터 신뢰하는 프록시를 건너뛰고, 처음 나오는 주소가 실제 클라이언트입니다.
+    hops = [h.strip() for h in request.headers.get("X-Forwarded-For", "").split(",") if h.strip()]
+    for hop in reversed(hops):
+        if hop not in proxies:
+            return hop
+    return hops[0] if hops else remote
+
+
+def _env_set(name: str) -> frozenset:
+    # 예: RATE_LIMIT_API_KEYS="partner-a,partner-b"
+    return frozenset(item.strip() for item in os.environ.get(name, "").split(",") if item.strip())
+
+
+def _parse_weights(raw: str) -> Dict[str, float]:
+    # 예: "key:partner-a=3,key:partner-b=2"
+    weights = {}
+    for item in raw.split(","):
+        if "=" in item:
+            name, value = item.rsplit("=", 1)
+            weights[name.strip()] = float(value)
+    return weights
+
+
+_limiter: Optional[UpstreamLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> UpstreamLimiter:
+    """환경변수 설정으로 프로세스 전역 한도 관리자를 만들어 반환합니다."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            backend_name = os.environ.get("RATE_LIMIT_BACKEND", "memory").lower()
+            if backend_name == "sqlite":
+                from storybook.database.db import DATA_DIR
+                os.makedirs(DATA_DIR, exist_ok=True)
+                path = os.environ.get("RATE_LIMIT_DB_PATH") or os.path.join(DATA_DIR, "ratelimit.db")
+                backend = SQLiteBucketBackend(path)
+                slot_backend = backend
+            else:
+                backend = MemoryBucketBackend()
+                slot_backend = None
+
+            scheduler = FairScheduler(
+                max_concurrent=int(os.environ.get("UPSTREAM_MAX_CONCURRENCY", "8")),
+                max_queued=int(os.environ.get("UPSTREAM_MAX_QUEUED_PER_CLIENT", "2")),
+                queue_timeout=float(os.environ.get("UPSTREAM_QUEUE_TIMEOUT", "10")),
+                slot_backend=slot_backend,
+            )
+            _limiter = UpstreamLimiter(
+                backend,
+                scheduler,
+                rate=float(os.environ.get("RATE_LIMIT_PER_SEC", "0.2")),
+                burst=float(os.environ.get("RATE_LIMIT_BURST", "10")),
+                weights=_parse_weights(os.environ.get("RATE_LIMIT_WEIGHTS", "")),
+            )
+        return _limiter
+
+
+def limit_upstream(view):
+    """업스트림(Gemini 등)을 호출하는 라우트에 한도를 적용합니다. 초과 시 429 + Retry-After."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        client = client_key()
+        try:
+            with get_limiter().admit(client, ip=client_ip_key(client)):
+                # 받아들인 요청에만 세션 ID를 발급합니다. (429 응답의 새 쿠키로 한도를 새로 받는 것 방지)
+                session.setdefault("client_id", uuid.uuid4().hex)
+                return view(*args, **kwargs)
+        except RateLimited as e:
+            return _rate_limited_response(e)
+
+    return wrapper
+
+
+def client_ip_key(client: str) -> Optional[str]:
+    """등록된 API 키가 아니면 IP 단위 버킷도 함께 씁니다. (같은 IP 의 세션들은 IP 한도를 나눠 씀)"""
+    return None if client.startswith("key:") else f"ip:{_client_ip()}"
+
+
+def _rate_limited_response(e: RateLimited):
+    retry_after = max(1, math.ceil(e.retry_after))
+    resp = jsonify({"ok": False, "error": "요청이 너무 많습니다. 잠시 후 다시 시도해주세요.",
+                    "reason": e.reason, "retry_after": retry_after})
+    resp.status_code = 429
+    resp.headers["Retry-After"] = str(retry_after)
+    return resp
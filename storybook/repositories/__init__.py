@@ -0,0 +1,49 @@
+# storybook/repositories/__init__.py
+import os
+import threading
+
+from storybook.repositories.base import StoryNotFound, StoryRepository
+
+_repo = None
+_repo_lock = threading.Lock()
+
+
+def _read_cache():
+    # 스토리/표지 읽기 캐시 (0 으로 설정하면 비활성화)
+    # 다른 프로세스의 쓰기는 STORY_CACHE_TTL_SEC 안에 반영됩니다.
+    from storybook.database.cache import ReadCache
+    return ReadCache(
+        max_entries=int(os.environ.get("STORY_CACHE_MAX_ENTRIES", "512")),
+        max_bytes=int(os.environ.get("STORY_CACHE_MAX_BYTES", str(8 * 1024 * 1024))),
+        ttl=float(os.environ.get("STORY_CACHE_TTL_SEC", "5")),
+    )
+
+
+def create_story_repository(backend: str = None) -> StoryRepository:
+    """
+    STORAGE_BACKEND 설정으로 저장소를 만듭니다.
+    - sqlite (기본): data/storybook.db 파일 하나 (STORAGE_DB_PATH 로 변경 가능)
+    - memory: 프로세스 메모리 (테스트용)
+    - sharded: STORAGE_SHARDS 에 적은 SQLite 파일들에 ID 해시로 분산
+    """
+    backend = (backend or os.environ.get("STORAGE_BACKEND") or "sqlite").lower()
+    if backend == "memory":
+        from storybook.repositories.story_repo_memory import StoryMemoryRepository
+        return StoryMemoryRepository()
+    if backend == "sharded":
+        from storybook.repositories.story_repo_sharded import StoryShardedRepository, parse_shards
+        return StoryShardedRepository(parse_shards(os.environ.get("STORAGE_SHARDS", "")), cache=_read_cache())
+    if backend == "sqlite":
+        from storybook.repositories.story_repo_sqlite import StorySQLiteRepository
+        return StorySQLiteRepository(os.environ.get("STORAGE_DB_PATH") or None, cache=_read_cache())
+    raise ValueError(f"알 수 없는 STORAGE_BACKEND 입니다: {backend}")
+
+
+def get_story_repository() -> StoryRepository:
+    """프로세스 공용 저장소 (처음 호출할 때 만듭니다)"""
+    global _repo
+    if _repo is None:
+        with _repo_lock:
+            if _repo is None:
+                _repo = create_story_repository()
+    return _repo
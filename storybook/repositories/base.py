@@ -0,0 +1,82 @@
+# storybook/repositories/base.py
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from storybook.database.models import Cover, Story, StorySummary
+
+# 라우트는 이 인터페이스에만 의존합니다.
+# 구현체: 메모리(테스트용) / 단일 SQLite 파일(기본) / 샤딩된 SQLite 파일들
+# (어떤 구현을 쓸지는 storybook.repositories.get_story_repository() 가 환경변수로 정합니다)
+
+
+class StoryNotFound(LookupError):
+    """쓰려는 스토리가 없습니다. (삭제되었거나, 샤드 재배치로 다른 파일로 옮겨졌음)"""
+
+
+class StoryRepository(ABC):
+    """스토리/페이지/표지/저장 이력(리비전) 저장소"""
+
+    def init(self):
+        """테이블 등 저장소를 준비합니다. (필요 없는 구현은 그대로 둡니다)"""
+
+    # --- 스토리 ---
+
+    @abstractmethod
+    def create_story(self, title: str, genre: str, theme: str, hero: str = "") -> int:
+        ...
+
+    @abstractmethod
+    def save_pages(self, story_id: int, pages: List[Dict[str, Any]], title: Optional[str] = None):
+        """
+        페이지 전체를 덮어씁니다. pages: [{"index", "text", "url"}]
+        title 을 주면 제목도 함께 바꾸고, 저장 이력(리비전)은 한 번만 남깁니다.
+        """
+
+    @abstractmethod
+    def update_story_title(self, story_id: int, new_title: str):
+        """없는 스토리면 StoryNotFound (save_pages / save_cover 도 같음)"""
+
+    @abstractmethod
+    def delete_story(self, story_id: int):
+        ...
+
+    @abstractmethod
+    def get_all_stories(self) -> List[StorySummary]:
+        """대시보드 목록 (최신순)"""
+
+    @abstractmethod
+    def get_story_detail(self, story_id: int, with_pages: bool = True) -> Optional[Story]:
+        """with_pages=False 이면 페이지 본문을 읽지 않습니다."""
+
+    # --- 표지 ---
+
+    @abstractmethod
+    def save_cover(self, story_id: int, image_url: str, title: str, author: str, position: str, color: str):
+        ...
+
+    @abstractmethod
+    def get_cover(self, story_id: int) -> Optional[Cover]:
+        ...
+
+    # --- 저장 이력(리비전) ---
+
+    @abstractmethod
+    def list_revisions(self, story_id: int) -> List[Dict[str, Any]]:
+        """최신순 리비전 목록 [{"rev", "kind", "bytes", "created_at"}]"""
+
+    @abstractmethod
+    def get_revision(self, story_id: int, rev_no: int) -> Optional[Dict[str, Any]]:
+        """{"rev", "title", "pages": [Page]} (없는 리비전이면 None)"""
+
+    @abstractmethod
+    def restore_revision(self, story_id: int, rev_no: int) -> Optional[int]:
+        """rev_no 시점으로 되돌리고 새 리비전 번호를 반환합니다. (없는 리비전이면 None)"""
+
+    def maintenance_targets(self) -> List[Any]:
+        """DB 정리(storybook/maintenance.py) 대상 SQLite 저장소 목록 (파일이 없는 구현은 빈 목록)"""
+        return []
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """읽기 캐시 통계 (캐시가 없는 구현은 빈 dict)"""
+        return {}
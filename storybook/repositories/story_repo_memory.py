@@ -0,0 +1,138 @@
+# storybook/repositories/story_repo_memory.py
+from __future__ import annotations
+import itertools
+import json
+import threading
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from storybook.database import revisions
+from storybook.database.models import Cover, Page, Story, StorySummary
+from storybook.repositories.base import StoryNotFound, StoryRepository
+
+
+def _now() -> str:
+    # SQLite 의 CURRENT_TIMESTAMP 와 같은 형식 (UTC)
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class StoryMemoryRepository(StoryRepository):
+    """
+    프로세스 메모리에만 저장하는 저장소 (테스트/데모용, 재시작하면 사라집니다).
+    저장 이력은 압축 없이 리비전마다 전체 내용을 보관합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._stories: Dict[int, Story] = {}
+        self._covers: Dict[int, Cover] = {}
+        self._history: Dict[int, List[Dict[str, Any]]] = {}
+
+    def __repr__(self):
+        return "StoryMemoryRepository()"
+
+    # --- 스토리 ---
+
+    def create_story(self, title: str, genre: str, theme: str, hero: str = "") -> int:
+        with self._lock:
+            story_id = next(self._ids)
+            self._stories[story_id] = Story(story_id, title, genre, theme, hero, _now(), ())
+        return story_id
+
+    def save_pages(self, story_id: int, pages: List[Dict[str, Any]], title: Optional[str] = None):
+        rows = sorted((int(p.get("index", 0)), p.get("text", ""), p.get("url", "")) for p in pages)
+        with self._lock:
+            story = self._stories.get(story_id)
+            if story is None:
+                raise StoryNotFound(story_id)
+            story = replace(story, pages=tuple(Page(*r) for r in rows))
+            if title is not None:
+                story = replace(story, title=title)
+            self._write(story)
+
+    def update_story_title(self, story_id: int, new_title: str):
+        with self._lock:
+            story = self._stories.get(story_id)
+            if story is None:
+                raise StoryNotFound(story_id)
+            self._write(replace(story, title=new_title))
+
+    def delete_story(self, story_id: int):
+        with self._lock:
+            self._stories.pop(story_id, None)
+            self._covers.pop(story_id, None)
+            self._history.pop(story_id, None)
+
+    def _write(self, story: Story) -> Optional[int]:
+        # 잠금을 잡은 상태에서 호출합니다. 바뀐 내용이 있을 때만 리비전을 남깁니다.
+        prev = _state(self._stories[story.id])
+        new = _state(story)
+        self._stories[story.id] = story
+        history = self._history.setdefault(story.id, [])
+        if not history and prev["pages"]:
+            # 이력이 없던 스토리는 덮어쓰기 전 내용을 첫 리비전으로 보존합니다.
+            history.append(_revision(1, prev))
+        if history and history[-1]["state"] == new:
+            return None
+        history.append(_revision(len(history) + 1, new))
+        return len(history)
+
+    def get_all_stories(self) -> List[StorySummary]:
+        with self._lock:
+            stories = list(self._stories.values())
+        stories.sort(key=lambda s: (s.created_at, s.id), reverse=True)
+        return [StorySummary(s.id, s.title, s.genre, s.created_at, next((p.url for p in s.pages if p.url), None))
+                for s in stories]
+
+    def get_story_detail(self, story_id: int, with_pages: bool = True) -> Optional[Story]:
+        story = self._stories.get(story_id)
+        if story is None or with_pages:
+            return story
+        return replace(story, pages=())
+
+    # --- 표지 ---
+
+    def save_cover(self, story_id: int, image_url: str, title: str, author: str, position: str, color: str):
+        with self._lock:
+            if story_id not in self._stories:
+                raise StoryNotFound(story_id)
+            self._covers[story_id] = Cover(story_id, image_url, position, author, color)
+
+    def get_cover(self, story_id: int) -> Optional[Cover]:
+        return self._covers.get(story_id)
+
+    # --- 저장 이력(리비전) ---
+
+    def list_revisions(self, story_id: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            history = list(self._history.get(story_id, []))
+        return [{k: v for k, v in rev.items() if k != "state"} for rev in reversed(history)]
+
+    def get_revision(self, story_id: int, rev_no: int) -> Optional[Dict[str, Any]]:
+        history = self._history.get(story_id, [])
+        if not 1 <= rev_no <= len(history):
+            return None
+        state = history[rev_no - 1]["state"]
+        pages = [Page(idx, text, url) for idx, (text, url) in sorted(state["pages"].items())]
+        return {"rev": rev_no, "title": state["title"], "pages": pages}
+
+    def restore_revision(self, story_id: int, rev_no: int) -> Optional[int]:
+        with self._lock:
+            story = self._stories.get(story_id)
+            history = self._history.get(story_id, [])
+            if story is None or not 1 <= rev_no <= len(history):
+                return None
+            state = history[rev_no - 1]["state"]
+            pages = tuple(Page(idx, text, url) for idx, (text, url) in sorted(state["pages"].items()))
+            return self._write(replace(story, title=state["title"], pages=pages)) or len(self._history[story_id])
+
+
+def _state(story: Story) -> revisions.State:
+    return revisions.make_state(story.title, [(p.index, p.text, p.url) for p in story.pages])
+
+
+def _revision(rev_no: int, state: revisions.State) -> Dict[str, Any]:
+    size = len(json.dumps(state, ensure_ascii=False).encode("utf-8"))
+    return {"rev": rev_no, "kind": "full", "bytes": size, "created_at": _now(), "state": state}
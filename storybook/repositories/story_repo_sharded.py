@@ -0,0 +1,200 @@
+# storybook/repositories/story_repo_sharded.py
+from __future__ import annotations
+import hashlib
+import os
+import secrets
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+from storybook.database import db
+from storybook.database.cache import ReadCache
+from storybook.database.models import Cover, Story, StorySummary
+from storybook.repositories.base import StoryNotFound, StoryRepository
+from storybook.repositories.story_repo_sqlite import StorySQLiteRepository
+
+# 스토리를 ID 해시로 여러 SQLite 파일(샤드)에 나눠 저장합니다.
+# - 샤드 선택은 rendezvous(HRW) 해싱: 샤드 이름과 ID를 함께 해시해 점수가 가장 큰 샤드가 주인.
+#   샤드를 하나 추가하면 전체의 약 1/N 만 새 샤드로 옮기면 되고, 나머지는 그대로입니다.
+# - 샤드 이름이 같으면 파일 위치(디스크/노드 마운트)를 바꿔도 배치는 달라지지 않습니다.
+# - 새 스토리 ID는 노드끼리 조율하지 않아도 겹치지 않도록 무작위(53bit, JS 정수 범위)로 정합니다.
+# - 샤드 구성을 바꾼 직후처럼 스토리가 아직 옛 샤드에 있으면 다른 샤드에서 찾아 읽고/씁니다.
+#   (rebalance_shards.py 로 주인 샤드로 옮겨 정리)
+
+MAX_STORY_ID = 2 ** 53 - 1
+
+
+def parse_shards(spec: str, base_dir: str = None) -> Dict[str, str]:
+    """
+    "a=/mnt/d1/a.db,b=/mnt/d2/b.db" 또는 "shard_0.db,shard_1.db" 형식을 {이름: 경로} 로 바꿉니다.
+    이름을 생략하면 파일 이름(확장자 제외)을 씁니다. 상대 경로는 base_dir(기본: data 폴더) 기준입니다.
+    """
+    base_dir = base_dir or db.DATA_DIR
+    shards: Dict[str, str] = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, path = item.partition("=")
+        if not sep:
+            name, path = os.path.splitext(os.path.basename(item))[0], item
+        name, path = name.strip(), os.path.join(base_dir, os.path.expanduser(path.strip()))
+        if name in shards:
+            raise ValueError(f"샤드 이름이 중복되었습니다: {name}")
+        shards[name] = path
+    return shards
+
+
+def _score(shard_name: str, story_id: int) -> int:
+    digest = hashlib.sha256(f"{shard_name}:{story_id}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class StoryShardedRepository(StoryRepository):
+
+    def __init__(self, shards: Dict[str, str], cache: ReadCache = None):
+        if not shards:
+            raise ValueError("샤드가 하나도 설정되지 않았습니다. (STORAGE_SHARDS)")
+        # 샤드끼리 ID가 겹치지 않으므로 읽기 캐시 하나를 함께 씁니다.
+        cache = cache if cache is not None else ReadCache(max_entries=0)
+        self._cache = cache
+        self.shards: Dict[str, StorySQLiteRepository] = {
+            name: StorySQLiteRepository(path, cache=cache) for name, path in shards.items()
+        }
+
+    def __repr__(self):
+        return f"StoryShardedRepository({ {name: repo.db_path for name, repo in self.shards.items()} })"
+
+    def shard_name_for(self, story_id: int) -> str:
+        return max(self.shards, key=lambda name: _score(name, story_id))
+
+    def shard_for(self, story_id: int) -> StorySQLiteRepository:
+        return self.shards[self.shard_name_for(story_id)]
+
+    def _others(self, owner: StorySQLiteRepository) -> Iterable[StorySQLiteRepository]:
+        return (repo for repo in self.shards.values() if repo is not owner)
+
+    def _locate(self, story_id: int) -> StorySQLiteRepository:
+        # 주인 샤드에 있으면 주인, 아직 옮겨지지 않았다면 가지고 있는 샤드 (어디에도 없으면 주인)
+        owner = self.shard_for(story_id)
+        if owner.has_story(story_id):
+            return owner
+        for repo in self._others(owner):
+            if repo.has_story(story_id):
+                return repo
+        return owner
+
+    def _write(self, story_id: int, fn):
+        # 쓰는 사이 재배치(move_story)로 다른 샤드로 옮겨졌다면 다시 찾아서 씁니다.
+        for _ in range(3):
+            try:
+                return fn(self._locate(story_id))
+            except StoryNotFound:
+                continue
+        raise StoryNotFound(story_id)
+
+    def init(self):
+        for repo in self.shards.values():
+            repo.init()
+
+    def maintenance_targets(self) -> List[StorySQLiteRepository]:
+        return list(self.shards.values())
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+    # --- 스토리 ---
+
+    def create_story(self, title: str, genre: str, theme: str, hero: str = "") -> int:
+        for _ in range(5):
+            story_id = secrets.randbelow(MAX_STORY_ID) + 1
+            try:
+                return self.shard_for(story_id).create_story(title, genre, theme, hero, story_id=story_id)
+            except sqlite3.IntegrityError:
+                continue  # 같은 ID가 이미 있으면 다시 뽑습니다. (거의 일어나지 않음)
+        raise RuntimeError("스토리 ID를 정하지 못했습니다.")
+
+    def save_pages(self, story_id: int, pages: List[Dict[str, Any]], title: Optional[str] = None):
+        self._write(story_id, lambda repo: repo.save_pages(story_id, pages, title=title))
+
+    def update_story_title(self, story_id: int, new_title: str):
+        self._write(story_id, lambda repo: repo.update_story_title(story_id, new_title))
+
+    def delete_story(self, story_id: int):
+        # 옮기다 멈춘 사본이 남아 있을 수 있으므로 모든 샤드에서 지웁니다.
+        for repo in self.shards.values():
+            repo.delete_story(story_id)
+
+    def get_all_stories(self) -> List[StorySummary]:
+        seen: Dict[int, StorySummary] = {}
+        for name, repo in self.shards.items():
+            for summary in repo.get_all_stories():
+                if summary.id not in seen or self.shard_name_for(summary.id) == name:
+                    seen[summary.id] = summary
+        # 최신순 정렬 (샤드별 결과를 합친 뒤 다시 정렬)
+        return sorted(seen.values(), key=lambda s: (s.created_at or "", s.id), reverse=True)
+
+    def get_story_detail(self, story_id: int, with_pages: bool = True) -> Optional[Story]:
+        owner = self.shard_for(story_id)
+        story = owner.get_story_detail(story_id, with_pages)
+        if story is None:
+            for repo in self._others(owner):
+                story = repo.get_story_detail(story_id, with_pages)
+                if story is not None:
+                    break
+        return story
+
+    # --- 표지 ---
+
+    def save_cover(self, story_id: int, image_url: str, title: str, author: str, position: str, color: str):
+        self._write(story_id, lambda repo: repo.save_cover(story_id, image_url, title, author, position, color))
+
+    def get_cover(self, story_id: int) -> Optional[Cover]:
+        return self._locate(story_id).get_cover(story_id)
+
+    # --- 저장 이력(리비전) ---
+
+    def list_revisions(self, story_id: int) -> List[Dict[str, Any]]:
+        return self._locate(story_id).list_revisions(story_id)
+
+    def get_revision(self, story_id: int, rev_no: int) -> Optional[Dict[str, Any]]:
+        return self._locate(story_id).get_revision(story_id, rev_no)
+
+    def restore_revision(self, story_id: int, rev_no: int) -> Optional[int]:
+        return self._write(story_id, lambda repo: repo.restore_revision(story_id, rev_no))
+
+    # --- 재배치 ---
+
+    def plan_rebalance(self, sources: Iterable[StorySQLiteRepository] = ()) -> List[Dict[str, Any]]:
+        """
+        주인 샤드가 아닌 곳에 있는 스토리 목록 [{"story_id", "from", "to", "archived"}]
+        sources 로 샤드 밖의 SQLite 파일(예: 예전 단일 storybook.db)을 주면 그 안의 스토리도 모두 포함합니다.
+        각 파일의 보관함(<이름>_archive.db)에 있는 스토리도 포함합니다. (archived=True, 주인 샤드의 보관함으로 이동)
+        """
+        moves = []
+        holders = [(name, repo) for name, repo in self.shards.items()]
+        holders += [(repo.db_path, repo) for repo in sources]
+        for name, repo in holders:
+            for archived, ids in ((False, repo.iter_story_ids()), (True, repo.iter_archived_ids())):
+                for story_id in ids:
+                    owner = self.shard_name_for(story_id)
+                    if owner != name:
+                        moves.append({"story_id": story_id, "from": name, "to": owner, "archived": archived,
+                                      "_repo": repo})
+        return moves
+
+    def rebalance(self, sources: Iterable[StorySQLiteRepository] = (), dry_run: bool = False,
+                  progress=None) -> Dict[str, int]:
+        """
+        잘못된 샤드에 있는 스토리를 한 권씩 주인 샤드로 옮깁니다. 서비스 중에도 실행할 수 있습니다.
+        (한 권을 옮기는 동안만 원래 파일의 쓰기가 잠시 기다립니다)
+        """
+        moves = self.plan_rebalance(sources)
+        moved = 0
+        for move in moves:
+            source = move["_repo"]
+            mover = source.move_archived_story if move["archived"] else source.move_story
+            if not dry_run and mover(move["story_id"], self.shards[move["to"]]):
+                moved += 1
+            if progress:
+                progress(move)
+        return {"planned": len(moves), "moved": moved}
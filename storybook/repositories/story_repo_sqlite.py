@@ -0,0 +1,596 @@
+# storybook/repositories/story_repo_sqlite.py
+from __future__ import annotations
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+from storybook.database import archive, db, revisions
+from storybook.database.cache import ReadCache
+from storybook.database.models import Cover, Page, Story, StorySummary
+from storybook.repositories.base import StoryNotFound, StoryRepository
+
+
+class StorySQLiteRepository(StoryRepository):
+    """
+    SQLite 파일 하나에 저장하는 기본 저장소.
+    샤딩 저장소(story_repo_sharded.py)도 샤드마다 이 클래스를 하나씩 사용합니다.
+
+    오래된 스토리는 옆의 보관함 파일(<이름>_archive.db)로 옮겨질 수 있으며 (storybook/maintenance.py),
+    조회는 보관함까지 찾아 그대로 돌려주고, 저장/수정하면 먼저 원래 파일로 되돌린 뒤 처리합니다.
+
+    쓰기는 모두 _begin_write 로 시작합니다. 쓰기 잠금(BEGIN IMMEDIATE)을 잡은 같은 트랜잭션 안에서
+    stories 행이 있는지 확인하므로, 보관/샤드 이동과 겹쳐도 없는 스토리에 페이지나 리비전을 쓰지 않습니다.
+    """
+
+    def __init__(self, db_path: str = None, cache: ReadCache = None, archive_path: str = None):
+        self.db_path = db_path or db.DB_PATH
+        self.archive_path = archive_path or os.path.splitext(self.db_path)[0] + "_archive.db"
+        # 미리보기/표지 화면에서 매번 반복되는 스토리·표지 조회를 줄이기 위한 읽기 캐시
+        # (쓰기 함수에서 해당 스토리 키만 정확히 무효화합니다)
+        self._cache = cache if cache is not None else ReadCache(max_entries=0)
+        self._cover_columns_checked = False
+
+    def __repr__(self):
+        return f"StorySQLiteRepository({self.db_path!r})"
+
+    def connect(self):
+        return db.get_connection(self.db_path)
+
+    def connect_archive(self, create: bool = False):
+        """보관함 연결 (아직 보관한 스토리가 없어 파일이 없으면 None, create=True 면 만듭니다)"""
+        if not create and not os.path.exists(self.archive_path):
+            return None
+        conn = db.get_connection(self.archive_path)
+        if create:
+            # 새 파일일 때만 적용됩니다. (테이블 생성 전에 지정해야 함)
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            archive.ensure_schema(conn.cursor())
+            conn.commit()
+        return conn
+
+    def _from_archive(self, fn, *args):
+        # 보관함에서 fn(cur, *args) 를 실행합니다. (보관함이 없으면 None)
+        conn = self.connect_archive()
+        if conn is None:
+            return None
+        try:
+            archive.ensure_schema(conn.cursor())
+            return fn(conn.cursor(), *args)
+        finally:
+            conn.close()
+
+    def init(self):
+        conn = self.connect()
+        db.create_schema(conn.cursor())
+        conn.commit()
+        conn.close()
+
+    def maintenance_targets(self) -> List["StorySQLiteRepository"]:
+        return [self]
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+    def _ensure_cover_columns(self, cur):
+        # init() 을 거치지 않은 예전 파일도 covers.updated_at 을 쓸 수 있게 처음 한 번만 확인합니다.
+        if not self._cover_columns_checked:
+            db.ensure_cover_columns(cur)
+            self._cover_columns_checked = True
+
+    def _invalidate(self, story_id: int, *kinds: str):
+        for kind in kinds:
+            self._cache.invalidate((kind, story_id))
+
+    # --- 스토리 ---
+
+    def create_story(self, title: str, genre: str, theme: str, hero: str = "", story_id: int = None) -> int:
+        # story_id 를 주면 그 번호로 만듭니다. (샤딩 저장소에서 전역 ID를 직접 정할 때)
+        conn = self.connect()
+        cur = conn.cursor()
+        try:
+            if story_id is None:
+                cur.execute("INSERT INTO stories (title, genre, theme, hero) VALUES (?, ?, ?, ?)",
+                            (title, genre, theme, hero))
+                story_id = cur.lastrowid
+            else:
+                cur.execute("INSERT INTO stories (id, title, genre, theme, hero) VALUES (?, ?, ?, ?, ?)",
+                            (story_id, title, genre, theme, hero))
+            conn.commit()
+        finally:
+            conn.close()
+        return story_id
+
+    def save_pages(self, story_id: int, pages: List[Dict[str, Any]], title: Optional[str] = None):
+        rows = []
+        for p in pages:
+            # 인덱스, 텍스트, 이미지 URL 저장
+            idx = int(p.get('index', 0))
+            txt = p.get('text', '')
+            url = p.get('url', '')  # 이미지 URL이 있으면 저장
+            rows.append((idx, txt, url))
+
+        conn = self._begin_write(story_id)
+        try:
+            cur = conn.cursor()
+            prev = self._current_state(cur, story_id)
+            self._replace_pages(cur, story_id, rows)
+            if title is not None:
+                cur.execute("UPDATE stories SET title = ? WHERE id = ?", (title, story_id))
+
+            # 바뀐 내용만 저장 이력(리비전) 하나로 남깁니다. (제목과 페이지를 함께 바꿔도 한 번)
+            new_title = prev["title"] if title is None else title
+            revisions.record(cur, story_id, revisions.make_state(new_title, rows), prev)
+            cur.execute("COMMIT")
+        finally:
+            self._end_write(conn)
+        self._invalidate(story_id, "story", "story_meta")
+
+    def update_story_title(self, story_id: int, new_title: str):
+        conn = self._begin_write(story_id)
+        try:
+            cur = conn.cursor()
+            prev = self._current_state(cur, story_id)
+            cur.execute("UPDATE stories SET title = ? WHERE id = ?", (new_title, story_id))
+            revisions.record(cur, story_id, dict(prev, title=new_title), prev)
+            cur.execute("COMMIT")
+        finally:
+            self._end_write(conn)
+        self._invalidate(story_id, "story", "story_meta")
+
+    def delete_story(self, story_id: int):
+        conn = self.connect()
+        cur = conn.cursor()
+        # 1. 페이지/표지/본문(스토리)/저장 이력 삭제 (메모리 저장소와 같이 표지도 함께 지웁니다)
+        self.delete_rows(cur, story_id)
+        conn.commit()
+        conn.close()
+        # 2. 보관함에 있던 것도 삭제
+        conn = self.connect_archive()
+        if conn is not None:
+            archive.ensure_schema(conn.cursor())
+            archive.delete(conn.cursor(), story_id)
+            conn.commit()
+            conn.close()
+        self._invalidate(story_id, "story", "story_meta", "cover")
+
+    @staticmethod
+    def _replace_pages(cur, story_id: int, rows):
+        # 기존 페이지 삭제 후 다시 저장 (덮어쓰기)
+        cur.execute("DELETE FROM pages WHERE story_id = ?", (story_id,))
+        cur.executemany("INSERT INTO pages (story_id, page_index, text, image_url) VALUES (?, ?, ?, ?)",
+                        [(story_id, idx, txt, url) for idx, txt, url in rows])
+
+    @staticmethod
+    def _current_state(cur, story_id: int) -> Optional[revisions.State]:
+        # 덮어쓰기 직전의 스토리 내용 (리비전 비교용)
+        cur.execute("SELECT title FROM stories WHERE id = ?", (story_id,))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        cur.execute("SELECT page_index, text, image_url FROM pages WHERE story_id = ? ORDER BY page_index",
+                    (story_id,))
+        return revisions.make_state(row[0], [tuple(r) for r in cur.fetchall()])
+
+    def get_all_stories(self) -> List[StorySummary]:
+        """대시보드 목록: 본문 텍스트 없이 필요한 컬럼과 첫 삽화 URL만 한 번에 조회합니다."""
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.row_factory = None
+        # 최신순 정렬
+        cur.execute("""
+                    SELECT s.id,
+                           s.title,
+                           s.genre,
+                           s.created_at,
+                           (SELECT p.image_url
+                            FROM pages p
+                            WHERE p.story_id = s.id
+                              AND p.image_url IS NOT NULL
+                              AND p.image_url != ''
+                            ORDER BY p.page_index
+                            LIMIT 1) AS thumb_url
+                    FROM stories s
+                    ORDER BY s.created_at DESC
+                    """)
+        rows = cur.fetchall()
+        conn.close()
+        archived = self._from_archive(archive.summaries)
+        if archived:
+            # 보관한 스토리도 목록에는 그대로 보입니다.
+            rows = sorted(rows + archived, key=lambda r: (r[3] or "", r[0]), reverse=True)
+        return [StorySummary(*row) for row in rows]
+
+    def get_story_detail(self, story_id: int, with_pages: bool = True) -> Optional[Story]:
+        key = ("story" if with_pages else "story_meta", story_id)
+        hit, story, version = self._cache.get(key)
+        if hit:
+            return story
+        story = self._load_story_detail(story_id, with_pages)
+        self._cache.put(key, story, version)
+        return story
+
+    def _load_story_detail(self, story_id: int, with_pages: bool) -> Optional[Story]:
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.row_factory = None
+
+        # 스토리 정보
+        cur.execute("SELECT id, title, genre, theme, hero, created_at FROM stories WHERE id = ?", (story_id,))
+        story = cur.fetchone()
+
+        if not story:
+            conn.close()
+            return self._load_archived_story(story_id, with_pages)
+
+        # 페이지 정보
+        pages = ()
+        if with_pages:
+            cur.execute("SELECT page_index, text, image_url FROM pages WHERE story_id = ? ORDER BY page_index",
+                        (story_id,))
+            pages = tuple(Page(*p) for p in cur.fetchall())
+
+        conn.close()
+
+        return Story(*story, pages=pages)
+
+    def _load_archived_story(self, story_id: int, with_pages: bool) -> Optional[Story]:
+        rows = self._from_archive(archive.load, story_id)
+        if rows is None:
+            return None
+        pages = tuple(Page(*p) for p in rows["pages"]) if with_pages else ()
+        return Story(*rows["story"][:6], pages=pages)
+
+    def has_live_story(self, story_id: int) -> bool:
+        conn = self.connect()
+        row = conn.execute("SELECT 1 FROM stories WHERE id = ?", (story_id,)).fetchone()
+        conn.close()
+        return row is not None
+
+    def has_story(self, story_id: int) -> bool:
+        return self.has_live_story(story_id) or bool(self._from_archive(archive.contains, story_id))
+
+    # --- 표지 ---
+
+    def save_cover(self, story_id: int, image_url: str, title: str, author: str, position: str, color: str):
+        conn = self._begin_write(story_id)
+        try:
+            cur = conn.cursor()
+            self._ensure_cover_columns(cur)
+            # 기존 표지 있는지 확인
+            cur.execute("SELECT id FROM covers WHERE story_id = ?", (story_id,))
+            row = cur.fetchone()
+
+            if row:
+                # 업데이트
+                cur.execute('''
+                            UPDATE covers
+                            SET front_image_url=?,
+                                title_position=?,
+                                author_name=?,
+                                back_color=?,
+                                updated_at=CURRENT_TIMESTAMP
+                            WHERE story_id = ?
+                            ''', (image_url, position, author, color, story_id))
+            else:
+                # 신규 생성
+                cur.execute('''
+                            INSERT INTO covers (story_id, front_image_url, title_position, author_name, back_color,
+                                                updated_at)
+                            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                            ''', (story_id, image_url, position, author, color))
+            cur.execute("COMMIT")
+        finally:
+            self._end_write(conn)
+        self._invalidate(story_id, "cover")
+
+    def get_cover(self, story_id: int) -> Optional[Cover]:
+        hit, cover, version = self._cache.get(("cover", story_id))
+        if hit:
+            return cover
+        cover = self._load_cover(story_id)
+        self._cache.put(("cover", story_id), cover, version)
+        return cover
+
+    def _load_cover(self, story_id: int) -> Optional[Cover]:
+        conn = self.connect()
+        cur = conn.cursor()
+        cur.row_factory = None  # 컬럼을 직접 지정하므로 튜플로 받습니다.
+        cur.execute("""
+                    SELECT story_id, front_image_url, title_position, author_name, back_color
+                    FROM covers
+                    WHERE story_id = ?
+                    """, (story_id,))
+        row = cur.fetchone()
+        conn.close()
+        if row:
+            return Cover(*row)
+        rows = self._from_archive(archive.load, story_id)
+        if rows and rows["covers"]:
+            return Cover(story_id, *rows["covers"][0])
+        return None
+
+    # --- 저장 이력(리비전) ---
+
+    def _revision_connection(self, story_id: int):
+        # 보관한 스토리의 이력은 보관함에서 그대로 읽습니다.
+        if not self.has_live_story(story_id):
+            conn = self.connect_archive()
+            if conn is not None:
+                return conn
+        return self.connect()
+
+    def list_revisions(self, story_id: int) -> List[Dict[str, Any]]:
+        conn = self._revision_connection(story_id)
+        result = revisions.list_revisions(conn.cursor(), story_id)
+        conn.close()
+        return result
+
+    def get_revision(self, story_id: int, rev_no: int) -> Optional[Dict[str, Any]]:
+        conn = self._revision_connection(story_id)
+        cur = conn.cursor()
+        revisions.ensure_schema(cur)
+        state = revisions.load_state(cur, story_id, rev_no)
+        conn.close()
+        if state is None:
+            return None
+        pages = [Page(idx, text, url) for idx, (text, url) in sorted(state["pages"].items())]
+        return {"rev": rev_no, "title": state["title"], "pages": pages}
+
+    def restore_revision(self, story_id: int, rev_no: int) -> Optional[int]:
+        # 이력은 지우지 않고, 되돌린 내용을 새 리비전으로 기록합니다.
+        conn = self._begin_write(story_id)
+        try:
+            cur = conn.cursor()
+            revisions.ensure_schema(cur)
+            state = revisions.load_state(cur, story_id, rev_no)
+            if state is None:
+                return None
+            prev = self._current_state(cur, story_id)
+            cur.execute("UPDATE stories SET title = ? WHERE id = ?", (state["title"], story_id))
+            self._replace_pages(cur, story_id,
+                                [(idx, text, url) for idx, (text, url) in sorted(state["pages"].items())])
+            new_rev = revisions.record(cur, story_id, state, prev) or revisions.latest_rev_no(cur, story_id)
+            cur.execute("COMMIT")
+        finally:
+            self._end_write(conn)
+        self._invalidate(story_id, "story", "story_meta")
+        return new_rev
+
+    # --- 샤드 이동(rebalance)용 ---
+    # 스토리 한 권의 원본 행(스토리/페이지/표지/리비전)을 그대로 옮깁니다. (ID, 작성 시각 유지)
+
+    def iter_story_ids(self) -> Iterator[int]:
+        conn = self.connect()
+        ids = [row[0] for row in conn.execute("SELECT id FROM stories ORDER BY id")]
+        conn.close()
+        return iter(ids)
+
+    @staticmethod
+    def export_rows(cur, story_id: int) -> Optional[Dict[str, list]]:
+        cur.execute("SELECT id, title, genre, theme, hero, created_at, is_finished FROM stories WHERE id = ?",
+                    (story_id,))
+        story = cur.fetchone()
+        if story is None:
+            return None
+        revisions.ensure_schema(cur)
+        return {
+            "story": tuple(story),
+            "pages": [tuple(r) for r in cur.execute(
+                "SELECT page_index, text, image_url FROM pages WHERE story_id = ? ORDER BY page_index", (story_id,))],
+            "covers": [tuple(r) for r in cur.execute(
+                "SELECT front_image_url, title_position, author_name, back_color FROM covers WHERE story_id = ?",
+                (story_id,))],
+            "revisions": [tuple(r) for r in cur.execute(
+                "SELECT rev_no, kind, payload, created_at FROM story_revisions WHERE story_id = ? ORDER BY rev_no",
+                (story_id,))],
+        }
+
+    def import_rows(self, rows: Dict[str, list]) -> bool:
+        """옮겨 온 행을 한 트랜잭션으로 넣습니다. 이미 같은 ID가 있으면 넣지 않고 False"""
+        story_id = rows["story"][0]
+        conn = self.connect()
+        cur = conn.cursor()
+        try:
+            if not self._insert_rows(cur, rows):
+                return False
+            conn.commit()
+        finally:
+            conn.close()
+        self._invalidate(story_id, "story", "story_meta", "cover")
+        return True
+
+    @staticmethod
+    def _insert_rows(cur, rows: Dict[str, list]) -> bool:
+        story_id = rows["story"][0]
+        if cur.execute("SELECT 1 FROM stories WHERE id = ?", (story_id,)).fetchone():
+            return False
+        revisions.ensure_schema(cur)
+        cur.execute("INSERT INTO stories (id, title, genre, theme, hero, created_at, is_finished) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", rows["story"])
+        cur.executemany("INSERT INTO pages (story_id, page_index, text, image_url) VALUES (?, ?, ?, ?)",
+                        [(story_id, *r) for r in rows["pages"]])
+        cur.executemany("INSERT INTO covers (story_id, front_image_url, title_position, author_name, back_color) "
+                        "VALUES (?, ?, ?, ?, ?)", [(story_id, *r) for r in rows["covers"]])
+        cur.executemany("INSERT INTO story_revisions (story_id, rev_no, kind, payload, created_at) "
+                        "VALUES (?, ?, ?, ?, ?)", [(story_id, *r) for r in rows["revisions"]])
+        return True
+
+    @staticmethod
+    def delete_rows(cur, story_id: int):
+        cur.execute("DELETE FROM pages WHERE story_id = ?", (story_id,))
+        cur.execute("DELETE FROM covers WHERE story_id = ?", (story_id,))
+        cur.execute("DELETE FROM stories WHERE id = ?", (story_id,))
+        revisions.delete_all(cur, story_id)
+
+    def move_story(self, story_id: int, target: "StorySQLiteRepository") -> bool:
+        """
+        스토리를 target 으로 옮깁니다. 옮기는 동안 이 파일에 쓰기 잠금을 잡아 두므로
+        그 사이 들어온 저장은 잠금을 기다린 뒤 스토리가 없어진 것을 확인하고 StoryNotFound 로 끝납니다.
+        (이 파일에는 아무것도 쓰지 않음. 샤딩 저장소는 옮겨 간 샤드를 다시 찾아 그곳에 저장합니다)
+        읽기는 계속 가능하며, 복사 후 삭제 전에 멈추면 양쪽에 남지만 다시 실행하면 정리됩니다.
+        """
+        conn = self.connect()
+        conn.isolation_level = None
+        cur = conn.cursor()
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            rows = self.export_rows(cur, story_id)
+            if rows is None:
+                cur.execute("ROLLBACK")
+                return False
+            target.import_rows(rows)
+            self.delete_rows(cur, story_id)
+            cur.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                cur.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        self._invalidate(story_id, "story", "story_meta", "cover")
+        return True
+
+    # --- 보관(archive) ---
+    # 잠금 순서는 항상 원래 파일 → 보관함입니다. (보관/되돌리기가 겹쳐도 교착 상태나 유실이 없도록)
+
+    # 마지막 활동(리비전, 표지 수정, 없으면 작성 시각)이 기준보다 오래된 스토리
+    _STALE = """
+        MAX(COALESCE((SELECT MAX(r.created_at) FROM story_revisions r WHERE r.story_id = s.id), s.created_at),
+            COALESCE((SELECT MAX(c.updated_at) FROM covers c WHERE c.story_id = s.id), s.created_at))
+        < datetime('now', ?)
+    """
+
+    def archive_candidates(self, older_than_days: int) -> List[int]:
+        """마지막 저장(리비전/표지 수정, 없으면 작성 시각)이 older_than_days 일보다 오래된 스토리 ID"""
+        conn = self.connect()
+        cur = conn.cursor()
+        revisions.ensure_schema(cur)
+        self._ensure_cover_columns(cur)
+        conn.commit()
+        cur.execute(f"SELECT s.id FROM stories s WHERE {self._STALE} ORDER BY s.id",
+                    (f"-{int(older_than_days)} days",))
+        ids = [row[0] for row in cur.fetchall()]
+        conn.close()
+        return ids
+
+    def archive_story(self, story_id: int, older_than_days: int = None) -> bool:
+        """
+        스토리 한 권을 보관함으로 옮깁니다. 보관함에 먼저 기록한 뒤 원래 파일에서 지우므로
+        옮기는 도중에도 조회는 어느 한쪽에서 항상 찾을 수 있습니다.
+        older_than_days 를 주면 쓰기 잠금을 잡은 뒤 다시 확인해서, 그 사이 수정된 스토리는 보관하지 않습니다.
+        """
+        conn = self.connect()
+        conn.isolation_level = None
+        cur = conn.cursor()
+        target = None
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            if older_than_days is not None:
+                self._ensure_cover_columns(cur)
+                still_stale = cur.execute(f"SELECT 1 FROM stories s WHERE s.id = ? AND {self._STALE}",
+                                          (story_id, f"-{int(older_than_days)} days")).fetchone()
+                if still_stale is None:
+                    return False
+            rows = self.export_rows(cur, story_id)
+            if rows is None:
+                return False
+            target = self.connect_archive(create=True)
+            archive.put(target.cursor(), rows)
+            target.commit()
+            self.delete_rows(cur, story_id)
+            cur.execute("COMMIT")
+        finally:
+            self._end_write(conn)
+            if target is not None:
+                target.close()
+        self._invalidate(story_id, "story", "story_meta", "cover")
+        return True
+
+    def unarchive_story(self, story_id: int) -> bool:
+        """보관한 스토리를 원래 파일로 되돌립니다. (보관함에 없으면 False)"""
+        if not os.path.exists(self.archive_path):
+            return False
+        conn = self.connect()
+        conn.isolation_level = None
+        source = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            source = self.connect_archive()
+            source.isolation_level = None
+            source.execute("BEGIN IMMEDIATE")
+            archive.ensure_schema(source.cursor())
+            rows = archive.load(source.cursor(), story_id, with_revisions=True)
+            if rows is None:
+                return False
+            self._insert_rows(conn.cursor(), rows)  # 이미 되돌려져 있으면 그대로 둡니다.
+            archive.delete(source.cursor(), story_id)
+            # 원래 파일을 먼저 확정합니다. 그 사이 멈추면 양쪽에 남지만 조회는 원래 파일을 먼저 봅니다.
+            conn.execute("COMMIT")
+            source.execute("COMMIT")
+        finally:
+            self._end_write(conn)
+            if source is not None:
+                self._end_write(source)
+        self._invalidate(story_id, "story", "story_meta", "cover")
+        return True
+
+    def iter_archived_ids(self) -> Iterator[int]:
+        ids = self._from_archive(lambda cur: [row[0] for row in cur.execute(
+            "SELECT id FROM archived_stories ORDER BY id")]) or []
+        return iter(ids)
+
+    def move_archived_story(self, story_id: int, target: "StorySQLiteRepository") -> bool:
+        """보관한 스토리를 target 의 보관함으로 옮깁니다. (샤드 재배치용, 보관 상태 유지)"""
+        if not os.path.exists(self.archive_path):
+            return False
+        source = self.connect_archive()
+        source.isolation_level = None
+        dest = None
+        try:
+            source.execute("BEGIN IMMEDIATE")
+            archive.ensure_schema(source.cursor())
+            rows = archive.load(source.cursor(), story_id, with_revisions=True)
+            if rows is None:
+                return False
+            if not target.has_live_story(story_id):
+                # target 에 이미 되돌려진 사본이 있으면 그쪽이 최신이므로 보관본은 버립니다.
+                dest = target.connect_archive(create=True)
+                archive.put(dest.cursor(), rows)
+                dest.commit()
+            archive.delete(source.cursor(), story_id)
+            source.execute("COMMIT")
+        finally:
+            self._end_write(source)
+            if dest is not None:
+                dest.close()
+        self._invalidate(story_id, "story", "story_meta", "cover")
+        return True
+
+    # --- 쓰기 트랜잭션 ---
+
+    def _begin_write(self, story_id: int):
+        """
+        쓰기 잠금을 잡고 stories 행이 있는 것을 확인한 연결을 반환합니다. (트랜잭션 진행 중)
+        보관함에 있으면 원래 파일로 되돌린 뒤 다시 시도하고, 어디에도 없으면 StoryNotFound
+        사용 후에는 COMMIT 하고 _end_write(conn) 으로 닫습니다.
+        """
+        for _ in range(3):
+            conn = self.connect()
+            conn.isolation_level = None
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                if conn.execute("SELECT 1 FROM stories WHERE id = ?", (story_id,)).fetchone():
+                    return conn
+            except Exception:
+                self._end_write(conn)
+                raise
+            self._end_write(conn)
+            # 보관 중인 스토리: 되돌리고 다시 확인합니다. (그 사이 다시 보관될 수도 있으므로 반복)
+            if not self.unarchive_story(story_id):
+                break
+        raise StoryNotFound(story_id)
+
+    @staticmethod
+    def _end_write(conn):
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        conn.close()
@@ -1,15 +1,22 @@
 # storybook/routes/api.py
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, Response, current_app, request, jsonify, session, send_file
+from urllib.parse import quote
 from typing import Any, Dict, List
 
 import requests
+import hashlib
+import hmac
 import random
 import time
+import uuid
 import os
 
-from storybook.providers.gemini_provider import GeminiProvider
-from storybook.providers.image_provider import ImageProvider
 import storybook.database.db as db
+# 생성 작업(tasks)은 Gemini SDK 등 공급자 모듈을 실제로 실행할 때 처음 import 합니다.
+# (대시보드만 띄우는 프로세스가 grpc 등을 불러오지 않도록)
+from storybook.jobs import get_job_queue, jobs_enabled, tasks
+from storybook.ratelimit import RateLimited, client_ip_key, client_key, get_limiter, limit_upstream
+from storybook.repositories import StoryNotFound, get_story_repository
 
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 
@@ -17,6 +24,62 @@ _http = requests.Session()
 _http.headers.update({"User-Agent": "storybook-dev/0.1"})
 
 
+def _stories():
+    # 저장소 구현(단일 SQLite / 샤딩 / 메모리)은 STORAGE_BACKEND 설정으로 정해집니다.
+    return get_story_repository()
+
+
+def _enqueue_job(kind, job_payload):
+    """
+    생성 작업을 작업 큐에 넣고 202 로 응답합니다. 결과는 /api/jobs/<id> 로 확인합니다.
+    같은 클라이언트가 같은 Idempotency-Key 헤더로 다시 요청하면 새 작업 대신 기존 작업을 돌려줍니다.
+    status_url / cancel_url 에는 작업 토큰이 붙어 있어, 이후 요청의 클라이언트 식별(세션/IP)이 바뀌어도 쓸 수 있습니다.
+    """
+    job = get_job_queue().enqueue(kind, job_payload, priority=tasks.PRIORITIES[kind], owner=client_key(),
+                               idempotency_key=request.headers.get("Idempotency-Key") or None)
+    token = _job_token(job["id"])
+    status_url = f"/api/jobs/{job['id']}?token={token}"
+    resp = jsonify({"ok": True, "job_id": job["id"], "status": job["status"], "job_token": token,
+                    "status_url": status_url, "cancel_url": f"/api/jobs/{job['id']}/cancel?token={token}"})
+    resp.status_code = 202
+    resp.headers["Location"] = status_url
+    return resp
+
+
+def _pdf_cache():
+    from storybook.exporters.pdf_exporter import PdfExportCache
+    return PdfExportCache(os.path.join(db.DATA_DIR, "exports"))
+
+
+def _prompt_prefetcher():
+    from storybook.providers.prompt_prefetcher import get_prompt_prefetcher
+    return get_prompt_prefetcher()
+
+
+def prefetch_editor_pages_for_client(pages):
+    """
+    에디터 초안 저장(/api/editor/cache, /editor/cache) 때 삽화용 번역을 미리 시작합니다.
+    선번역도 업스트림 호출이므로, 새로 번역할 문장이 있으면 클라이언트 한도에서 토큰을 하나 쓰고
+    한도를 넘었으면 선번역만 건너뜁니다. (초안 저장은 그대로 성공, 번역은 이미지 생성 때 함께 처리)
+    """
+    from storybook.providers.prompt_prefetcher import prefetch_editor_pages
+    # 초안마다 고유 ID를 두어, 같은 사용자가 문장을 고치면 이전 선번역을 취소할 수 있게 합니다.
+    draft_id = session.setdefault("draft_id", uuid.uuid4().hex)
+    client = client_key()
+
+    def charge():
+        try:
+            get_limiter().charge(client, ip=client_ip_key(client))
+            return True
+        except RateLimited:
+            return False
+
+    try:
+        prefetch_editor_pages(draft_id, pages, charge=charge)
+    except Exception as e:
+        print(f"⚠️ 선번역 예약 실패: {e}")
+
+
 # --- 에디터 데이터 임시 저장 ---
 @api_bp.post("/editor/cache")
 def editor_cache():
@@ -26,12 +89,17 @@ def editor_cache():
     session["editor_cache"] = payload
     # 새 스토리 작성을 위해 기존 미리보기 세션 초기화
     session.pop("preview", None)
+    session.pop("saved_story_id", None)
+
+    # 이미지 생성 버튼을 누르기 전에 삽화용 번역을 미리 시작합니다.
+    prefetch_editor_pages_for_client(pages)
 
     return jsonify({"ok": True, "count": len(pages)}), 200
 
 
 # --- AI 플롯(줄거리) 생성 ---
 @api_bp.post("/plot/generate")
+@limit_upstream
 def plot_generate():
     payload = request.get_json(silent=True) or {}
     meta = payload.get("meta") or {}
@@ -40,66 +108,55 @@ def plot_generate():
     if not isinstance(pages, list) or not pages:
         return jsonify({"error": "페이지 정보가 없습니다."}), 400
 
-    provider = GeminiProvider()
-    if provider.is_available():
-        try:
-            print("✨ Gemini API를 이용한 플롯 생성 시작...")
-            result_pages = provider.generate_story(meta, pages)
-            return jsonify({"pages": result_pages}), 200
-        except Exception as e:
-            print(f"⚠️ 생성 실패: {e}")
-            return jsonify({"error": str(e)}), 500
+    job_payload = {"meta": meta, "pages": pages}
+    if jobs_enabled():
+        return _enqueue_job("plot", job_payload)
 
-    return jsonify({"error": "API 키를 찾을 수 없습니다."}), 500
+    try:
+        return jsonify(tasks.generate_plot(job_payload)), 200
+    except tasks.PermanentJobError as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        print(f"⚠️ 생성 실패: {e}")
+        return jsonify({"error": str(e)}), 500
 
 
 # --- 본문 이미지 생성 ---
 @api_bp.post("/images/generate")
+@limit_upstream
 def images_generate():
     payload = request.get_json(silent=True) or {}
     pages_in = payload.get("pages") or []
-    style = (payload.get("style") or "동화 일러스트").strip()
-
-    img_provider = ImageProvider()
-    gemini_provider = GeminiProvider()
-
-    out = []
 
-    # 번역을 위한 텍스트 추출
-    korean_texts = []
-    valid_pages = []
-    for p in pages_in:
-        try:
-            idx = int(p.get("index"))
-            txt = (p.get("text") or "").strip()
-            korean_texts.append(txt)
-            valid_pages.append({"index": idx, "original_text": txt})
-        except:
-            continue
-
-    # 일괄 번역 실행 (한글 -> 영어 프롬프트)
-    english_prompts = gemini_provider.translate_prompts_bulk(korean_texts)
-
-    for i, page_data in enumerate(valid_pages):
-        idx = page_data["index"]
-
-        if i < len(english_prompts):
-            visual_prompt = english_prompts[i]
-        else:
-            visual_prompt = "storybook scene"
+    # 에디터 저장 시 미리 번역해 둔 결과가 있으면 사용합니다.
+    # (요청 안에서 실행할 때는 진행 중인 선번역을 잠시 기다리고, 작업 큐에 넣을 때는 끝난 것만 넘깁니다)
+    prefetcher = _prompt_prefetcher()
+    deadline = time.monotonic() + (0 if jobs_enabled() else 5)
+    prompts = [prefetcher.lookup(p["original_text"], timeout=max(0.0, deadline - time.monotonic()))
+               for p in tasks.page_texts(pages_in)]
+
+    job_payload = {
+        "pages": pages_in,
+        "style": payload.get("style"),
+        # 후보 수(K): 2 이상이면 페이지마다 K개를 동시에 생성해 보고 후보 목록을 함께 돌려줍니다.
+        "candidates": payload.get("candidates"),
+        "prompts": prompts,
+    }
+    if jobs_enabled():
+        return _enqueue_job("images", job_payload)
 
-        full_prompt = f"({style}), {visual_prompt}"
-        url = img_provider.build_image_url(full_prompt)
-        out.append({"index": idx, "url": url})
+    result = tasks.generate_images(job_payload)
+    _update_preview_images(result["images"])
+    return jsonify(result), 200
 
-        time.sleep(0.1)
 
+def _update_preview_images(images):
     # 세션 업데이트 (미리보기용)
     current_preview = session.get("preview") or {}
     prev_pages = current_preview.get("pages") or []
     page_map = {p["index"]: p for p in prev_pages}
 
-    for new_img in out:
+    for new_img in images:
         idx = new_img["index"]
         if idx in page_map:
             page_map[idx]["url"] = new_img["url"]
@@ -114,8 +171,6 @@ def images_generate():
     }
     session.modified = True
 
-    return jsonify({"images": out}), 200
-
 
 # --- 스토리 최종 저장 ---
 @api_bp.post("/story/save")
@@ -126,7 +181,14 @@ def story_save():
         pages = payload.get("pages", [])
 
         # 1. 스토리 정보 생성
-        story_id = db.create_story(title=title, genre="동화", theme="자유")
+        # 같은 초안을 다시 저장하면(story_id 전달) 새 스토리를 만들지 않고 이력(리비전)으로 남깁니다.
+        story_id = payload.get("story_id")
+        new_title = None
+        if story_id and _stories().get_story_detail(int(story_id), with_pages=False):
+            story_id = int(story_id)
+            new_title = title  # 제목 변경은 페이지 저장과 함께 리비전 하나로 기록합니다.
+        else:
+            story_id = _stories().create_story(title=title, genre="동화", theme="자유")
 
         # 2. 페이지별 내용 저장
         db_pages = []
@@ -136,50 +198,164 @@ def story_save():
                 "text": p.get("text", ""),
                 "url": p.get("url", "")
             })
-        db.save_pages(story_id, db_pages)
+        _stories().save_pages(story_id, db_pages, title=new_title)
+        session["saved_story_id"] = story_id
 
         return jsonify({"ok": True, "story_id": story_id}), 200
 
+    except StoryNotFound:
+        # 확인한 뒤 저장하기 전에 다른 요청이 지운 경우
+        return jsonify({"ok": False, "error": "스토리를 찾을 수 없습니다."}), 404
     except Exception as e:
         print(f"❌ 저장 중 오류 발생: {e}")
         return jsonify({"ok": False, "error": str(e)}), 500
 
 
+# --- 저장 이력(리비전) ---
+@api_bp.get("/story/<int:story_id>/revisions")
+def story_revisions(story_id):
+    return jsonify({"ok": True, "revisions": _stories().list_revisions(story_id)}), 200
+
+
+@api_bp.get("/story/<int:story_id>/revisions/<int:rev_no>")
+def story_revision_detail(story_id, rev_no):
+    revision = _stories().get_revision(story_id, rev_no)
+    if revision is None:
+        return jsonify({"ok": False, "error": "해당 리비전을 찾을 수 없습니다."}), 404
+    return jsonify({"ok": True, **revision}), 200
+
+
+@api_bp.post("/story/<int:story_id>/revisions/<int:rev_no>/restore")
+def story_revision_restore(story_id, rev_no):
+    try:
+        new_rev = _stories().restore_revision(story_id, rev_no)
+        if new_rev is None:
+            return jsonify({"ok": False, "error": "해당 리비전을 찾을 수 없습니다."}), 404
+        return jsonify({"ok": True, "rev": new_rev}), 200
+    except StoryNotFound:
+        return jsonify({"ok": False, "error": "스토리를 찾을 수 없습니다."}), 404
+    except Exception as e:
+        print(f"❌ 복원 중 오류 발생: {e}")
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+
 # --- 스토리 삭제 ---
 @api_bp.delete("/story/<int:story_id>")
 def story_delete(story_id):
     try:
-        db.delete_story(story_id)
+        _stories().delete_story(story_id)
+        _pdf_cache().invalidate(story_id)
         return jsonify({"ok": True}), 200
     except Exception as e:
         print(f"❌ 삭제 중 오류 발생: {e}")
         return jsonify({"ok": False, "error": str(e)}), 500
 
 
+# --- 읽기 캐시 통계 ---
+@api_bp.get("/stats/cache")
+def cache_stats():
+    return jsonify(_stories().cache_stats()), 200
+
+
+# --- DB 정리 실행 기록 ---
+@api_bp.get("/stats/maintenance")
+def maintenance_stats():
+    from storybook.maintenance import recent_reports
+    return jsonify({"ok": True, "runs": recent_reports()}), 200
+
+
+# --- 전자책(PDF) 내보내기 ---
+@api_bp.get("/story/<int:story_id>/export.pdf")
+def story_export_pdf(story_id):
+    from storybook.exporters.pdf_exporter import content_hash, render_story_pdf
+
+    story = _stories().get_story_detail(story_id)
+    if not story:
+        return jsonify({"ok": False, "error": "동화를 찾을 수 없습니다."}), 404
+    cover = _stories().get_cover(story_id)
+
+    download_name = f"{story.title or 'storybook'}.pdf"
+    cache = _pdf_cache()
+    key = content_hash(story, cover)
+
+    # 내용이 바뀌지 않았다면 이전에 만든 파일을 그대로 보냅니다.
+    cached = cache.get(story_id, key)
+    if cached:
+        return send_file(cached, mimetype="application/pdf", as_attachment=True, download_name=download_name)
+
+    # 한 페이지씩 만들어 바로 내려보내면서 캐시 파일에도 기록합니다.
+    chunks = cache.stream_and_store(story_id, key, render_story_pdf(story, cover))
+    resp = Response(chunks, mimetype="application/pdf")
+    resp.headers["Content-Disposition"] = (
+        f"attachment; filename=\"storybook_{story_id}.pdf\"; filename*=UTF-8''{quote(download_name)}"
+    )
+    return resp
+
+
 # --- 표지 이미지 생성 ---
 @api_bp.post("/cover/generate_image")
+@limit_upstream
 def cover_generate_image():
     payload = request.get_json(silent=True) or {}
+    job_payload = {
+        "prompt": payload.get("prompt", ""),
+        "title": payload.get("title", ""),
+        "candidates": payload.get("candidates"),
+    }
+    if jobs_enabled():
+        return _enqueue_job("cover_image", job_payload)
+    return jsonify(tasks.generate_cover_image(job_payload))
+
+
+# --- 생성 작업(작업 큐) 상태 ---
+# 작업 ID는 추측할 수 없는 무작위 값이라, ID를 아는 클라이언트만 조회할 수 있습니다.
+def _job_token(job_id):
+    # 작업 ID를 앱 시크릿 키로 서명한 값 (202 응답을 받은 클라이언트만 알 수 있음)
+    return hmac.new(current_app.secret_key.encode("utf-8"), f"job:{job_id}".encode("utf-8"),
+                    hashlib.sha256).hexdigest()[:32]
+
+
+def _own_job(job_id):
+    # 작업은 넣은 클라이언트(또는 작업 토큰을 가진 클라이언트)만 보고 취소할 수 있습니다. (남의 작업은 없는 것처럼 404)
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return None
+    token = request.args.get("token") or request.headers.get("X-Job-Token") or ""
+    if job["owner"] != client_key() and not hmac.compare_digest(token, _job_token(job_id)):
+        return None
+    return job
+
+
+@api_bp.get("/jobs/<job_id>")
+def job_status(job_id):
+    job = _own_job(job_id)
+    if job is None:
+        return jsonify({"ok": False, "error": "작업을 찾을 수 없습니다."}), 404
+
+    body = {key: job[key] for key in ("id", "kind", "status", "attempts", "max_attempts",
+                                      "created_at", "started_at", "finished_at")}
+    body["ok"] = True
+    if job["status"] == "succeeded":
+        body["result"] = job["result"]
+        if job["kind"] == "images":
+            _update_preview_images(job["result"]["images"])
+    if job["error"]:
+        body["error"] = job["error"]
+    return jsonify(body), 200
+
+
+@api_bp.post("/jobs/<job_id>/cancel")
+def job_cancel(job_id):
+    if _own_job(job_id) is None:
+        return jsonify({"ok": False, "error": "작업을 찾을 수 없습니다."}), 404
+    if get_job_queue().cancel(job_id):
+        return jsonify({"ok": True}), 200
+    return jsonify({"ok": False, "error": "대기 중인 작업만 취소할 수 있습니다."}), 409
 
-    custom_prompt = payload.get("prompt", "").strip()
-    title = payload.get("title", "")
-
-    gemini_provider = GeminiProvider()
-
-    # 프롬프트 번역 및 생성
-    if custom_prompt:
-        print(f" 프롬프트 번역 시도: {custom_prompt}")
-        translated_text = gemini_provider.translate_prompt_for_image(custom_prompt)
-        prompt = f"(cover art style), {translated_text}, flat 2d illustration, full page design, no text, vivid colors"
-    else:
-        print(f" 제목 번역 시도: {title}")
-        translated_title = gemini_provider.translate_prompt_for_image(title)
-        prompt = f"(cover art style), flat 2d illustration for a story titled '{translated_title}', full page design, no text, vivid colors"
-
-    img_provider = ImageProvider()
-    url = img_provider.build_image_url(prompt)
 
-    return jsonify({"url": url, "ok": True})
+@api_bp.get("/stats/jobs")
+def job_stats():
+    return jsonify({"ok": True, "jobs": get_job_queue().stats()}), 200
 
 
 # --- 표지 정보 저장 ---
@@ -199,15 +375,19 @@ def cover_save():
     try:
         # 제목 업데이트 (변경된 경우)
         if new_title:
-            db.update_story_title(story_id, new_title)
+            _stories().update_story_title(story_id, new_title)
             final_title = new_title
         else:
-            story = db.get_story_detail(story_id)
-            final_title = story['title']
+            story = _stories().get_story_detail(story_id, with_pages=False)
+            if story is None:
+                raise StoryNotFound(story_id)
+            final_title = story.title
 
         # 표지 데이터 저장
-        db.save_cover(story_id, image_url, final_title, author, title_pos, color)
+        _stories().save_cover(story_id, image_url, final_title, author, title_pos, color)
         return jsonify({"ok": True})
+    except StoryNotFound:
+        return jsonify({"ok": False, "error": "스토리를 찾을 수 없습니다."}), 404
     except Exception as e:
         print(f"표지 저장 실패: {e}")
         return jsonify({"ok": False, "error": str(e)}), 500
\ No newline at end of file
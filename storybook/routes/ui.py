@@ -1,6 +1,7 @@
 # storybook/routes/ui.py
 from flask import Blueprint, render_template, request, redirect, url_for, session, jsonify
-import storybook.database.db as db
+from storybook.repositories import get_story_repository
+from storybook.routes.api import prefetch_editor_pages_for_client
 
 ui_bp = Blueprint("ui", __name__)
 
@@ -8,23 +9,8 @@ ui_bp = Blueprint("ui", __name__)
 @ui_bp.get("/dashboard")
 @ui_bp.get("/")
 def dashboard():
-    raw_stories = db.get_all_stories()
-    stories = []
-    for s in raw_stories:
-        detail = db.get_story_detail(s['id'])
-        thumb = None
-        if detail and detail['pages']:
-            for p in detail['pages']:
-                if p.get('image_url'):
-                    thumb = p['image_url']
-                    break
-        stories.append({
-            "id": s['id'],
-            "title": s['title'],
-            "genre": s['genre'],
-            "created_at": s['created_at'],
-            "thumb_url": thumb
-        })
+    # 목록 조회 한 번으로 썸네일까지 가져옵니다. (페이지 본문은 읽지 않음)
+    stories = get_story_repository().get_all_stories()
     return render_template("dashboard.html", stories=stories)
 
 
@@ -41,6 +27,9 @@ def editor_cache():
     session["editor_cache"] = data
     # 새 작성 시 기존 미리보기 세션 초기화
     session.pop("preview", None)
+    session.pop("saved_story_id", None)
+    # 삽화용 번역 미리 시작 (api.editor_cache 와 같은 함수, 같은 요청 한도)
+    prefetch_editor_pages_for_client(data.get("pages") or [])
     return jsonify({"ok": True})
 
 
@@ -70,41 +59,35 @@ def images():
             "url": img_url
         })
 
-    return render_template("images.html", title=title, pages=page_items, style="동화 일러스트 (기본)")
+    # 이미 한 번 저장한 초안이면 같은 스토리에 이어서 저장합니다. (저장 이력으로 남음)
+    return render_template("images.html", title=title, pages=page_items, style="동화 일러스트 (기본)",
+                           story_id=session.get("saved_story_id"))
 
 
 @ui_bp.get("/preview/<int:story_id>")
 def preview_saved(story_id):
-    story = db.get_story_detail(story_id)
+    story = get_story_repository().get_story_detail(story_id)
     if not story:
         return "동화를 찾을 수 없습니다.", 404
 
     # [수정] 표지 정보 조회 추가
-    cover = db.get_cover(story_id)
-
-    pages = []
-    for p in story['pages']:
-        pages.append({
-            "index": p['page_index'],
-            "text": p['text'],
-            "url": p['image_url']
-        })
+    cover = get_story_repository().get_cover(story_id)
 
-    # 템플릿에 cover 데이터 전달
+    # 템플릿에 cover 데이터 전달 (Page 객체는 index/text/url 을 그대로 가지고 있습니다)
     return render_template("preview.html",
-                           title=story['title'],
-                           pages=pages,
-                           story_id=story['id'],
+                           title=story.title,
+                           pages=story.pages,
+                           story_id=story.id,
                            cover=cover)
 
 
 # 표지 만들기 화면
 @ui_bp.get("/cover/<int:story_id>")
 def cover_editor(story_id):
-    story = db.get_story_detail(story_id)
+    story = get_story_repository().get_story_detail(story_id, with_pages=False)
     if not story:
         return "동화를 찾을 수 없습니다.", 404
 
-    cover = db.get_cover(story_id)
+    cover = get_story_repository().get_cover(story_id)
 
     return render_template("cover.html", story=story, cover=cover)
\ No newline at end of file
@@ -0,0 +1,56 @@
+// storybook/static/js/jobs.js
+// 생성 요청(플롯 / 본문 이미지 / 표지) 공통 함수
+// - 사용자 동작 한 번마다 Idempotency-Key 를 하나 만들고, 응답을 못 받아 다시 보낼 때도 같은 키를 씁니다.
+//   (서버는 같은 키로 들어온 요청에 새 작업을 만들지 않고 기존 작업을 돌려줍니다)
+// - 작업 큐 모드(JOBS_MODE=queue)에서는 202 + job_id 로 응답하므로, 끝날 때까지 상태를 확인해 결과를 돌려줍니다.
+
+function sleep(ms) {
+  return new Promise(r => setTimeout(r, ms));
+}
+
+function newIdempotencyKey() {
+  if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+  return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2);
+}
+
+// body 를 JSON 으로 POST 하고 최종 결과(JSON)를 돌려줍니다. 네트워크 오류면 retries 번까지 같은 키로 다시 보냅니다.
+async function postJob(url, body, {retries = 2, timeoutSec = 600} = {}) {
+  const key = newIdempotencyKey();
+  for (let attempt = 0; ; attempt++) {
+    let res;
+    try {
+      res = await fetch(url, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json', 'Idempotency-Key': key},
+        body: JSON.stringify(body)
+      });
+    } catch (e) {
+      if (attempt >= retries) throw e;
+      await sleep(1000 * (attempt + 1));
+      continue;
+    }
+    return jobResult(res, {timeoutSec});
+  }
+}
+
+async function jobResult(res, {timeoutSec = 600} = {}) {
+  const data = await res.json();
+  if (res.status !== 202 || !data.job_id) return data;
+
+  const deadline = Date.now() + timeoutSec * 1000;
+  while (Date.now() < deadline) {
+    await sleep(1000);
+    let job;
+    try {
+      job = await (await fetch(data.status_url)).json();
+    } catch (e) {
+      continue;  // 잠깐 끊긴 경우 다음 확인 때 다시 봅니다.
+    }
+    if (job.status === 'succeeded') return job.result;
+    if (job.status === 'failed' || job.status === 'cancelled') throw new Error(job.error || '작업 실패');
+    if (job.ok === false) throw new Error(job.error || '작업을 찾을 수 없습니다.');
+  }
+  // 더 기다리지 않으므로 아직 시작하지 않은 작업은 취소해 둡니다. (이미 실행 중이면 서버가 거절)
+  fetch(data.cancel_url, {method: 'POST'}).catch(() => {});
+  throw new Error('작업 시간 초과');
+}
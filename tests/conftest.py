@@ -0,0 +1,19 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# 저장소 루트에서 `python -m pytest` 로 실행하지 않아도 storybook 패키지를 찾을 수 있게 합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def sqlite_repo(tmp_path):
+    """임시 폴더의 SQLite 저장소 (읽기 캐시 사용)"""
+    from storybook.database.cache import ReadCache
+    from storybook.repositories.story_repo_sqlite import StorySQLiteRepository
+
+    repo = StorySQLiteRepository(str(tmp_path / "storybook.db"), cache=ReadCache(ttl=60))
+    repo.init()
+    return repo
@@ -0,0 +1,89 @@
+# tests/test_archive.py
+# 보관(archive)과 저장/표지 수정/샤드 재배치가 겹칠 때 스토리가 사라지지 않는지 확인합니다.
+import pytest
+
+from storybook.repositories.story_repo_sharded import StoryShardedRepository
+from storybook.repositories.story_repo_sqlite import StorySQLiteRepository
+
+
+def _age(repo, story_id, days=400):
+    # 작성/저장 시각을 과거로 돌려 보관 대상으로 만듭니다.
+    conn = repo.connect()
+    conn.execute("UPDATE stories SET created_at = datetime('now', ?) WHERE id = ?", (f"-{days} days", story_id))
+    conn.execute("UPDATE story_revisions SET created_at = datetime('now', ?) WHERE story_id = ?",
+                 (f"-{days} days", story_id))
+    conn.execute("UPDATE covers SET updated_at = datetime('now', ?) WHERE story_id = ?", (f"-{days} days", story_id))
+    conn.commit()
+    conn.close()
+
+
+def _story(repo):
+    story_id = repo.create_story("제목", "동화", "자유")
+    repo.save_pages(story_id, [{"index": 1, "text": "하나", "url": "a.jpg"}])
+    repo.save_cover(story_id, "cover.jpg", "제목", "작가", "top", "#ffffff")
+    return story_id
+
+
+def test_cover_update_counts_as_activity(sqlite_repo):
+    story_id = _story(sqlite_repo)
+    _age(sqlite_repo, story_id)
+    assert sqlite_repo.archive_candidates(180) == [story_id]
+
+    sqlite_repo.save_cover(story_id, "new.jpg", "제목", "작가", "top", "#000000")
+    assert sqlite_repo.archive_candidates(180) == []
+
+
+def test_archive_rechecks_activity_under_lock(sqlite_repo):
+    story_id = _story(sqlite_repo)
+    _age(sqlite_repo, story_id)
+    assert sqlite_repo.archive_candidates(180) == [story_id]
+
+    # 후보를 고른 뒤 보관하기 전에 수정된 스토리는 보관하지 않습니다.
+    sqlite_repo.save_pages(story_id, [{"index": 1, "text": "방금 수정", "url": ""}])
+    assert not sqlite_repo.archive_story(story_id, older_than_days=180)
+    assert sqlite_repo.has_live_story(story_id)
+
+
+def test_unarchive_then_archive_keeps_story(sqlite_repo):
+    story_id = _story(sqlite_repo)
+    assert sqlite_repo.archive_story(story_id)
+    assert sqlite_repo.unarchive_story(story_id)
+    assert sqlite_repo.archive_story(story_id)
+    assert sqlite_repo.get_story_detail(story_id).pages[0].text == "하나"
+    assert sqlite_repo.get_cover(story_id).front_image_url == "cover.jpg"
+
+
+def test_rebalance_moves_archived_stories(tmp_path):
+    source = StorySQLiteRepository(str(tmp_path / "old.db"))
+    source.init()
+    ids = [_story(source) for _ in range(6)]
+    for story_id in ids[:3]:
+        assert source.archive_story(story_id)
+
+    sharded = StoryShardedRepository({name: str(tmp_path / f"{name}.db") for name in ("a", "b")})
+    sharded.init()
+    result = sharded.rebalance([source])
+    assert result == {"planned": 6, "moved": 6}
+
+    assert list(source.iter_story_ids()) == [] and list(source.iter_archived_ids()) == []
+    for story_id in ids:
+        owner = sharded.shard_for(story_id)
+        assert owner.has_story(story_id)
+        assert owner.has_live_story(story_id) == (story_id not in ids[:3])
+        assert sharded.get_story_detail(story_id).pages[0].text == "하나"
+    assert sharded.plan_rebalance([source]) == []
+
+
+@pytest.mark.parametrize("archived", [False, True])
+def test_save_after_rebalance_reaches_new_shard(tmp_path, archived):
+    source = StorySQLiteRepository(str(tmp_path / "old.db"))
+    source.init()
+    story_id = _story(source)
+    if archived:
+        source.archive_story(story_id)
+    sharded = StoryShardedRepository({"a": str(tmp_path / "a.db")})
+    sharded.init()
+    sharded.rebalance([source])
+
+    sharded.save_pages(story_id, [{"index": 1, "text": "새 샤드에 저장", "url": ""}])
+    assert sharded.shards["a"].get_story_detail(story_id).pages[0].text == "새 샤드에 저장"
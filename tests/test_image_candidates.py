@@ -0,0 +1,78 @@
+# tests/test_image_candidates.py
+# 후보 이미지 순위(명암 대비 점수)와 dHash 중복 제거, 시간 제한을 StubImageService 로 확인합니다.
+import io
+import time
+
+import pytest
+
+from storybook.providers.image_candidates import CandidateGenerator, StubImageService, _fingerprint
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _flat(level: int, contrast: int) -> bytes:
+    # 왼쪽/오른쪽 절반의 밝기 차이(contrast)가 클수록 점수가 높습니다.
+    img = Image.new("L", (64, 64))
+    img.putdata([(level + contrast if x >= 32 else level) for y in range(64) for x in range(64)])
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_near_duplicates_are_dropped():
+    stub = StubImageService(variants=2)
+    gen = CandidateGenerator(provider=stub, fetch=stub.fetch)
+    [cands] = gen.generate(["a castle"], 4)
+
+    # seed % 2 가 같은 그림은 밝기만 살짝 다르므로 하나만 남습니다.
+    variants = [c["seed"] % 2 for c in cands]
+    assert len(variants) == len(set(variants))
+    assert 1 <= len(cands) <= 2
+
+
+def test_stub_variants_have_distinct_hashes():
+    stub = StubImageService(variants=3)
+    hashes = {_fingerprint(stub.fetch(stub.build_image_url("p", seed=s)))[0] for s in range(3)}
+    assert len(hashes) == 3
+
+
+def test_candidates_are_ranked_by_score():
+    stub = StubImageService()
+    contrast = {}
+
+    def fetch(url):
+        seed = int(url.rsplit("=", 1)[1])
+        contrast[url] = seed % 200
+        return _flat(20, contrast[url])
+
+    gen = CandidateGenerator(provider=stub, fetch=fetch, dup_threshold=-1)
+    results = gen.generate(["one", "two"], 4)
+
+    assert len(results) == 2
+    for cands in results:
+        scores = [c["score"] for c in cands]
+        assert scores == sorted(scores, reverse=True)
+        assert all(set(c) == {"url", "seed", "score"} for c in cands)
+
+
+def test_all_failed_returns_fallback_url():
+    stub = StubImageService()
+    gen = CandidateGenerator(provider=stub, fetch=lambda url: None)
+    [cands] = gen.generate(["p"], 3)
+    assert len(cands) == 1 and cands[0]["url"].startswith(StubImageService.BASE)
+
+
+def test_slow_fetches_are_cut_off_at_budget():
+    stub = StubImageService(variants=8)
+
+    def fetch(url):
+        seed = int(url.rsplit("=", 1)[1])
+        if seed % 2:
+            time.sleep(2)
+        return stub.fetch(url)
+
+    gen = CandidateGenerator(provider=stub, fetch=fetch, budget=0.5)
+    started = time.monotonic()
+    results = gen.generate(["a", "b"], 4)
+    assert time.monotonic() - started < 1.5
+    assert all(cands for cands in results)
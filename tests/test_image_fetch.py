@@ -0,0 +1,117 @@
+# tests/test_image_fetch.py
+# 서버가 이미지를 내려받을 때(PDF 내보내기, 후보 이미지) 허용되지 않은 URL 은 요청조차 하지 않는지 확인합니다.
+import socket
+
+import pytest
+
+from storybook.database.models import Cover, Page, Story
+from storybook.exporters.pdf_exporter import render_story_pdf
+from storybook.providers import image_provider
+from storybook.providers.image_provider import fetch_image
+
+ALLOWED = "https://image.pollinations.ai/prompt/cat"
+
+
+def _addr(ip):
+    return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (ip, 443))]
+
+
+class _Response:
+    def __init__(self, status=200, body=b"\xff\xd8data", headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+        self.body = body
+        self.is_redirect = status in (301, 302, 303, 307, 308)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, size):
+        for i in range(0, len(self.body), size):
+            yield self.body[i:i + size]
+
+
+class _Http:
+    """_http.get 대신 요청한 URL 을 기록하고, responses 에 넣어 둔 응답을 순서대로 돌려줍니다."""
+
+    def __init__(self):
+        self.calls = []
+        self.responses = []
+
+    def get(self, url, **kwargs):
+        self.calls.append(url)
+        return self.responses.pop(0) if self.responses else _Response()
+
+
+@pytest.fixture
+def http(monkeypatch):
+    fake = _Http()
+    monkeypatch.setattr(image_provider._http, "get", fake.get)
+    monkeypatch.setattr(image_provider.socket, "getaddrinfo", lambda *a, **k: _addr("151.101.1.1"))
+    monkeypatch.delenv("IMAGE_FETCH_ALLOWED_HOSTS", raising=False)
+    monkeypatch.delenv("IMAGE_FETCH_MAX_BYTES", raising=False)
+    return fake
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1:5000/internal-admin",
+    "http://image.pollinations.ai/prompt/cat",
+    "https://evil.example.com/x.jpg",
+    "https://169.254.169.254/latest/meta-data",
+    "file:///etc/passwd",
+])
+def test_disallowed_urls_are_never_requested(http, url):
+    assert fetch_image(url) is None
+    assert http.calls == []
+
+
+def test_allowed_host_is_fetched(http):
+    assert fetch_image(ALLOWED) == b"\xff\xd8data"
+    assert http.calls == [ALLOWED]
+
+
+@pytest.mark.parametrize("ip", ["127.0.0.1", "10.0.0.5", "169.254.169.254", "::1"])
+def test_allowed_host_resolving_to_internal_address_is_refused(http, monkeypatch, ip):
+    monkeypatch.setattr(image_provider.socket, "getaddrinfo", lambda *a, **k: _addr(ip))
+    assert fetch_image(ALLOWED) is None
+    assert http.calls == []
+
+
+def test_allowed_hosts_are_configurable(http, monkeypatch):
+    monkeypatch.setenv("IMAGE_FETCH_ALLOWED_HOSTS", "cdn.example.com")
+    assert fetch_image(ALLOWED) is None
+    assert fetch_image("https://cdn.example.com/a.jpg") is not None
+    assert http.calls == ["https://cdn.example.com/a.jpg"]
+
+
+def test_redirect_to_internal_address_is_not_followed(http):
+    http.responses.append(_Response(302, headers={"Location": "http://127.0.0.1/internal-admin"}))
+    assert fetch_image(ALLOWED) is None
+    assert http.calls == [ALLOWED]
+
+
+def test_redirect_within_allowed_hosts_is_followed(http):
+    http.responses.append(_Response(302, headers={"Location": "/image/1.jpg"}))
+    assert fetch_image(ALLOWED) == b"\xff\xd8data"
+    assert http.calls == [ALLOWED, "https://image.pollinations.ai/image/1.jpg"]
+
+
+def test_body_over_cap_is_dropped(http):
+    http.responses.append(_Response(body=b"x" * 100))
+    assert fetch_image(ALLOWED, max_bytes=64) is None
+    http.responses.append(_Response(headers={"Content-Length": "1000"}))
+    assert fetch_image(ALLOWED, max_bytes=64) is None
+
+
+def test_pdf_export_does_not_request_stored_internal_urls(http):
+    story = Story(1, "제목", None, None, None, "", (Page(1, "본문", "http://127.0.0.1:8080/internal-admin"),))
+    cover = Cover(1, "https://10.0.0.1/cover.jpg", "middle", "", "#ffffff")
+    pdf = b"".join(render_story_pdf(story, cover))
+    assert pdf.startswith(b"%PDF")
+    assert http.calls == []
@@ -0,0 +1,161 @@
+# tests/test_job_queue.py
+# 작업 큐(JobQueue)의 임대/재임대, 백오프 재시도, 멱등 키를 임시 DB 로 확인합니다.
+# 시간은 가짜 시계로 움직이므로 실제로 기다리지 않습니다.
+import pytest
+
+from storybook.jobs import job_queue
+from storybook.jobs.job_queue import JobQueue
+from storybook.jobs.worker import Worker
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(job_queue, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return JobQueue(str(tmp_path / "jobs.db"))
+
+
+# --- 임대 ---
+
+def test_claim_leases_job_to_one_worker(queue, clock):
+    job = queue.enqueue("plot", {"meta": {}})
+    claimed = queue.claim("w1", visibility_timeout=30)
+    assert claimed["id"] == job["id"]
+    assert claimed["status"] == "running"
+    assert claimed["attempts"] == 1
+    assert claimed["lease_owner"] == "w1"
+    assert claimed["lease_expires_at"] == clock.now + 30
+    assert queue.claim("w2", visibility_timeout=30) is None
+
+
+def test_expired_lease_is_reclaimed_and_stale_result_rejected(queue, clock):
+    job = queue.enqueue("plot", {})
+    queue.claim("w1", visibility_timeout=30)
+    clock.now += 31
+    reclaimed = queue.claim("w2", visibility_timeout=30)
+    assert reclaimed["id"] == job["id"]
+    assert reclaimed["attempts"] == 2
+
+    assert queue.complete(job["id"], "w1", {"pages": []}) is False
+    assert queue.heartbeat([job["id"]], "w1", 30) == []
+    assert queue.complete(job["id"], "w2", {"pages": [1]}) is True
+    done = queue.get(job["id"])
+    assert done["status"] == "succeeded"
+    assert done["result"] == {"pages": [1]}
+
+
+def test_heartbeat_keeps_lease(queue, clock):
+    job = queue.enqueue("plot", {})
+    queue.claim("w1", visibility_timeout=30)
+    clock.now += 20
+    assert queue.heartbeat([job["id"]], "w1", 30) == [job["id"]]
+    clock.now += 20
+    assert queue.claim("w2", visibility_timeout=30) is None
+
+
+def test_expired_lease_after_last_attempt_fails(queue, clock):
+    job = queue.enqueue("plot", {}, max_attempts=1)
+    queue.claim("w1", visibility_timeout=30)
+    clock.now += 31
+    assert queue.claim("w2", visibility_timeout=30) is None
+    assert queue.get(job["id"])["status"] == "failed"
+
+
+# --- 재시도 ---
+
+def test_fail_backs_off_then_retries_until_max_attempts(queue, clock):
+    job = queue.enqueue("plot", {}, max_attempts=2)
+    queue.claim("w1", visibility_timeout=30)
+    assert queue.fail(job["id"], "w1", "boom", backoff=2.0) == "queued"
+    assert queue.get(job["id"])["available_at"] == clock.now + 2.0
+
+    assert queue.claim("w1", visibility_timeout=30) is None
+    clock.now += 2.0
+    assert queue.claim("w1", visibility_timeout=30)["attempts"] == 2
+    assert queue.fail(job["id"], "w1", "boom again") == "failed"
+    failed = queue.get(job["id"])
+    assert failed["status"] == "failed"
+    assert failed["error"] == "boom again"
+
+
+def test_fail_without_retry_is_permanent(queue):
+    job = queue.enqueue("plot", {})
+    queue.claim("w1", visibility_timeout=30)
+    assert queue.fail(job["id"], "w1", "API 키 없음", retry=False) == "failed"
+
+
+def test_release_does_not_use_an_attempt(queue, clock):
+    job = queue.enqueue("images", {})
+    queue.claim("w1", visibility_timeout=30)
+    assert queue.release(job["id"], "w1", delay=5) is True
+    assert queue.claim("w1", visibility_timeout=30) is None
+    clock.now += 5
+    assert queue.claim("w1", visibility_timeout=30)["attempts"] == 1
+
+
+def test_claim_order_and_kind_filter(queue, clock):
+    images = queue.enqueue("images", {}, priority=0)
+    clock.now += 1
+    plot = queue.enqueue("plot", {}, priority=20)
+    assert queue.claim("w1", 30)["id"] == plot["id"]
+    assert queue.claim("w1", 30, kinds=["plot"]) is None
+    assert queue.claim("w1", 30, kinds=["images"])["id"] == images["id"]
+
+
+def test_cancel_only_queued(queue):
+    job = queue.enqueue("plot", {})
+    queue.claim("w1", visibility_timeout=30)
+    assert queue.cancel(job["id"]) is False
+    other = queue.enqueue("plot", {})
+    assert queue.cancel(other["id"]) is True
+    assert queue.get(other["id"])["status"] == "cancelled"
+
+
+# --- 멱등 키 ---
+
+def test_same_key_returns_existing_job(queue):
+    first = queue.enqueue("plot", {"n": 1}, owner="a", idempotency_key="k")
+    again = queue.enqueue("plot", {"n": 2}, owner="a", idempotency_key="k")
+    assert again["id"] == first["id"]
+    assert again["payload"] == {"n": 1}
+
+
+def test_same_key_is_scoped_per_owner(queue):
+    a = queue.enqueue("plot", {}, owner="a", idempotency_key="k")
+    b = queue.enqueue("plot", {}, owner="b", idempotency_key="k")
+    assert a["id"] != b["id"]
+
+
+def test_same_key_after_cancel_or_failure_makes_new_job(queue):
+    cancelled = queue.enqueue("plot", {}, owner="a", idempotency_key="k")
+    queue.cancel(cancelled["id"])
+    retried = queue.enqueue("plot", {}, owner="a", idempotency_key="k")
+    assert retried["id"] != cancelled["id"]
+    assert retried["status"] == "queued"
+    assert queue.get(cancelled["id"])["status"] == "cancelled"
+
+    queue.claim("w1", visibility_timeout=30)
+    queue.fail(retried["id"], "w1", "boom", retry=False)
+    third = queue.enqueue("plot", {}, owner="a", idempotency_key="k")
+    assert third["id"] not in (cancelled["id"], retried["id"])
+    assert queue.enqueue("plot", {}, owner="a", idempotency_key="k")["id"] == third["id"]
+
+
+def test_worker_rejects_unknown_kinds(queue):
+    with pytest.raises(ValueError):
+        Worker(queue, kinds=["imagse"])
+    with pytest.raises(ValueError):
+        Worker(queue, kind_limits={"cover": 1})
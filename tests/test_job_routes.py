@@ -0,0 +1,57 @@
+# tests/test_job_routes.py
+# 작업 큐 모드(JOBS_MODE=queue)에서 작업을 넣은 클라이언트가 쿠키 유무와 상관없이 자기 작업을 보고 취소할 수 있는지,
+# 다른 클라이언트는 볼 수 없는지 확인합니다.
+import pytest
+
+from storybook import jobs, ratelimit
+from storybook.jobs.job_queue import JobQueue
+
+PLOT = {"meta": {}, "pages": [{"index": 1, "text": "옛날 옛적에"}]}
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setenv("JOBS_MODE", "queue")
+    monkeypatch.setenv("RATE_LIMIT_BACKEND", "memory")
+    monkeypatch.setattr(ratelimit, "_limiter", None)
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(jobs, "_queue", queue)
+    return queue
+
+
+@pytest.fixture
+def client():
+    from storybook import create_app
+    return create_app().test_client()
+
+
+def test_cookieless_client_can_poll_and_cancel_its_job(queue, client):
+    res = client.post("/api/plot/generate", json=PLOT)
+    assert res.status_code == 202
+    body = res.get_json()
+    assert queue.get(body["job_id"])["owner"] == "ip:127.0.0.1"
+
+    client.delete_cookie("session")
+    assert client.get(f"/api/jobs/{body['job_id']}").status_code == 200
+    assert client.get(body["status_url"]).get_json()["status"] == "queued"
+    assert client.post(body["cancel_url"]).status_code == 200
+    assert queue.get(body["job_id"])["status"] == "cancelled"
+
+
+def test_status_url_works_after_session_cookie_is_issued(queue, client):
+    body = client.post("/api/plot/generate", json=PLOT).get_json()
+    # 첫 요청의 응답으로 세션 쿠키를 받았으므로 이후 요청은 세션으로 식별됩니다.
+    assert client.get(f"/api/jobs/{body['job_id']}").status_code == 404
+    assert client.get(body["status_url"]).status_code == 200
+    assert client.get(f"/api/jobs/{body['job_id']}",
+                      headers={"X-Job-Token": body["job_token"]}).status_code == 200
+
+
+def test_other_clients_cannot_see_or_cancel_the_job(queue, client):
+    body = client.post("/api/plot/generate", json=PLOT).get_json()
+    other = {"REMOTE_ADDR": "10.0.0.9"}
+    client.delete_cookie("session")
+    assert client.get(f"/api/jobs/{body['job_id']}", environ_base=other).status_code == 404
+    assert client.get(f"/api/jobs/{body['job_id']}?token=wrong", environ_base=other).status_code == 404
+    assert client.post(f"/api/jobs/{body['job_id']}/cancel", environ_base=other).status_code == 404
+    assert queue.get(body["job_id"])["status"] == "queued"
@@ -0,0 +1,43 @@
+# tests/test_maintenance.py
+# auto_vacuum 이 꺼진 예전 DB 파일은 정리해도 공간이 반환되지 않으므로, 결과에 전환이 필요하다고 드러나는지 확인합니다.
+import sqlite3
+
+from storybook.maintenance import compact, run_maintenance
+
+
+def _legacy_db(path):
+    # auto_vacuum 없이 만든 파일에 빈 페이지를 만들어 둡니다.
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (x BLOB)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(b"x" * 4000,) for _ in range(50)])
+    conn.commit()
+    conn.execute("DELETE FROM t")
+    conn.commit()
+    conn.close()
+
+
+def test_legacy_file_is_reported_not_silently_skipped(tmp_path):
+    path = str(tmp_path / "old.db")
+    _legacy_db(path)
+    report = compact(path, pause=0)
+    assert report["incremental"] is False
+    assert report["vacuum_skipped"] is True
+    assert report["reclaimed_bytes"] == 0
+
+
+def test_convert_switches_to_incremental_and_reclaims(tmp_path):
+    path = str(tmp_path / "old.db")
+    _legacy_db(path)
+    report = compact(path, pause=0, convert=True)
+    assert report["converted"] is True
+    assert report["reclaimed_bytes"] > 0
+    assert compact(path, pause=0)["incremental"] is True
+
+
+def test_run_lists_files_needing_convert(sqlite_repo):
+    report = run_maintenance(sqlite_repo, archive_after_days=0, pause=0)
+    assert report["needs_convert"] == []
+
+    _legacy_db(sqlite_repo.archive_path)
+    report = run_maintenance(sqlite_repo, archive_after_days=0, pause=0)
+    assert report["needs_convert"] == [sqlite_repo.archive_path]
@@ -0,0 +1,58 @@
+# tests/test_prompt_prefetch.py
+# 에디터 초안 저장 때의 선번역이 클라이언트 요청 한도를 쓰고, 한도를 넘으면 건너뛰는지 확인합니다.
+from concurrent.futures import Future
+
+import pytest
+
+from storybook import ratelimit
+from storybook.providers import prompt_prefetcher
+from storybook.providers.prompt_prefetcher import PromptPrefetcher
+
+
+class _Batcher:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, text):
+        self.submitted.append(text)
+        return Future()
+
+
+@pytest.fixture
+def batcher(monkeypatch):
+    fake = _Batcher()
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.setenv("RATE_LIMIT_BACKEND", "memory")
+    monkeypatch.setenv("RATE_LIMIT_PER_SEC", "0.01")
+    monkeypatch.setenv("RATE_LIMIT_BURST", "2")
+    monkeypatch.setattr(ratelimit, "_limiter", None)
+    monkeypatch.setattr(prompt_prefetcher, "_prefetcher", PromptPrefetcher(batcher_factory=lambda: fake))
+    return fake
+
+
+@pytest.fixture
+def client():
+    from storybook import create_app
+    return create_app().test_client()
+
+
+@pytest.mark.parametrize("url", ["/api/editor/cache", "/editor/cache"])
+def test_draft_saves_are_charged_and_skipped_over_limit(batcher, client, url):
+    for i in range(4):
+        res = client.post(url, json={"title": "t", "pages": [f"문장 {i}"]})
+        assert res.status_code == 200
+    assert batcher.submitted == ["문장 0", "문장 1"]
+
+
+def test_unchanged_draft_is_not_charged(batcher, client):
+    for _ in range(4):
+        client.post("/api/editor/cache", json={"pages": ["같은 문장"]})
+    client.post("/api/editor/cache", json={"pages": ["새 문장"]})
+    assert batcher.submitted == ["같은 문장", "새 문장"]
+
+
+def test_prefetch_shares_the_generate_routes_limit(batcher, client):
+    client.post("/api/editor/cache", json={"pages": ["문장"]})
+    client.post("/api/editor/cache", json={"pages": ["다른 문장"]})
+    res = client.post("/api/plot/generate", json={"meta": {}, "pages": [{"index": 1, "text": "x"}]})
+    assert res.status_code == 429
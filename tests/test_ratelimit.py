@@ -0,0 +1,110 @@
+# tests/test_ratelimit.py
+# 토큰 버킷, 429 + Retry-After 응답, 세션 쿠키를 바꿔 한도를 새로 받는 우회를 확인합니다.
+import pytest
+from flask import Flask, jsonify
+
+from storybook import ratelimit
+from storybook.ratelimit import (FairScheduler, MemoryBucketBackend, RateLimited, SQLiteBucketBackend,
+                                 UpstreamLimiter, limit_upstream)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(ratelimit.time, "time", clock.time)
+    return clock
+
+
+# --- 토큰 버킷 ---
+
+@pytest.mark.parametrize("make", [lambda tmp: MemoryBucketBackend(),
+                                  lambda tmp: SQLiteBucketBackend(str(tmp / "ratelimit.db"))])
+def test_bucket_allows_burst_then_refills(tmp_path, clock, make):
+    backend = make(tmp_path)
+    assert backend.take("a", rate=0.5, burst=2) == (True, 0.0)
+    assert backend.take("a", rate=0.5, burst=2) == (True, 0.0)
+    allowed, retry_after = backend.take("a", rate=0.5, burst=2)
+    assert not allowed
+    assert retry_after == pytest.approx(2.0)
+
+    # 다른 클라이언트는 따로 셉니다.
+    assert backend.take("b", rate=0.5, burst=2)[0]
+
+    clock.now += 2.0
+    assert backend.take("a", rate=0.5, burst=2)[0]
+    assert not backend.take("a", rate=0.5, burst=2)[0]
+
+
+def test_charge_uses_ip_bucket_too(clock):
+    limiter = UpstreamLimiter(MemoryBucketBackend(), FairScheduler(2), rate=0.1, burst=2)
+    limiter.charge("session:a", ip="ip:1.2.3.4")
+    limiter.charge("session:b", ip="ip:1.2.3.4")
+    with pytest.raises(RateLimited):
+        limiter.charge("session:c", ip="ip:1.2.3.4")
+    limiter.charge("session:d", ip="ip:5.6.7.8")
+
+
+# --- 라우트 ---
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_BACKEND", "memory")
+    monkeypatch.setenv("RATE_LIMIT_PER_SEC", "0.01")
+    monkeypatch.setenv("RATE_LIMIT_BURST", "2")
+    monkeypatch.setenv("RATE_LIMIT_API_KEYS", "partner")
+    monkeypatch.setattr(ratelimit, "_limiter", None)
+
+    app = Flask(__name__)
+    app.secret_key = "test"
+
+    @app.post("/generate")
+    @limit_upstream
+    def generate():
+        return jsonify({"ok": True})
+
+    return app.test_client()
+
+
+def test_over_limit_returns_429_with_retry_after(client):
+    assert client.post("/generate").status_code == 200
+    assert client.post("/generate").status_code == 200
+    res = client.post("/generate")
+    assert res.status_code == 429
+    assert int(res.headers["Retry-After"]) >= 1
+    assert res.get_json()["retry_after"] == int(res.headers["Retry-After"])
+
+
+def test_rejected_request_gets_no_new_session_cookie(client):
+    client.post("/generate")
+    client.post("/generate")
+    client.delete_cookie("session")
+    res = client.post("/generate")
+    assert res.status_code == 429
+    assert "Set-Cookie" not in res.headers
+
+
+def test_new_session_cookies_do_not_reset_the_limit(client):
+    # 쿠키를 버리고 다시 보내 새 세션을 받아도, 그 세션으로 보낸 요청은 같은 IP 의 한도에 걸립니다.
+    assert client.post("/generate").status_code == 200
+    assert client.post("/generate").status_code == 200
+    for _ in range(3):
+        client.delete_cookie("session")
+        assert client.post("/generate").status_code == 429
+        assert client.post("/generate").status_code == 429
+
+
+def test_registered_api_key_has_its_own_bucket(client):
+    client.post("/generate")
+    client.post("/generate")
+    assert client.post("/generate").status_code == 429
+    assert client.post("/generate", headers={"X-API-Key": "partner"}).status_code == 200
+    # 등록되지 않은 키는 IP 로 셉니다.
+    assert client.post("/generate", headers={"X-API-Key": "other"}).status_code == 429
@@ -0,0 +1,137 @@
+# tests/test_read_cache.py
+# 읽기 캐시(ReadCache)와, 저장소의 쓰기 경로마다 캐시가 무효화되는지 확인합니다.
+# 각 쓰기 테스트는 먼저 조회해서 캐시를 채운 뒤 쓰고, 바로 다음 조회에 쓴 내용이 보이는지 봅니다.
+import time
+
+from storybook.database.cache import ReadCache
+from storybook.repositories.story_repo_sqlite import StorySQLiteRepository
+
+PAGES = [{"index": 1, "text": "옛날 옛적에", "url": "a.jpg"}, {"index": 2, "text": "끝", "url": ""}]
+
+
+def _story(repo, title="제목"):
+    story_id = repo.create_story(title, "모험", "우정", "토끼")
+    repo.save_pages(story_id, PAGES)
+    return story_id
+
+
+def _warm(repo, story_id):
+    repo.get_story_detail(story_id)
+    repo.get_story_detail(story_id, with_pages=False)
+    repo.get_cover(story_id)
+
+
+# --- ReadCache ---
+
+def test_put_after_invalidate_is_dropped():
+    cache = ReadCache()
+    hit, _, version = cache.get("k")
+    assert not hit
+    cache.invalidate("k")  # 조회 도중 쓰기
+    cache.put("k", "old", version)
+    assert cache.get("k")[0] is False
+
+
+def test_entries_expire_after_ttl():
+    cache = ReadCache(ttl=0.05)
+    cache.put("k", "v", cache.get("k")[2])
+    assert cache.get("k")[:2] == (True, "v")
+    time.sleep(0.06)
+    assert cache.get("k")[0] is False
+
+
+def test_invalidation_markers_are_bounded():
+    cache = ReadCache(max_entries=4)
+    for i in range(10000):
+        cache.invalidate(("story", i))
+    assert len(cache._invalidated) <= 1024
+
+    # 정리 전에 시작한 조회는 저장하지 않고, 정리 후 조회는 정상적으로 저장합니다.
+    version = cache.get("k")[2]
+    for i in range(2000):
+        cache.invalidate(("story", i))
+    cache.put("k", "old", version)
+    assert cache.get("k")[0] is False
+    cache.put("k", "new", cache.get("k")[2])
+    assert cache.get("k")[1] == "new"
+
+
+# --- 저장소 쓰기 경로 ---
+
+def test_save_pages(sqlite_repo):
+    story_id = _story(sqlite_repo)
+    _warm(sqlite_repo, story_id)
+    sqlite_repo.save_pages(story_id, [{"index": 1, "text": "바뀐 글", "url": "b.jpg"}])
+    pages = sqlite_repo.get_story_detail(story_id).pages
+    assert [(p.text, p.url) for p in pages] == [("바뀐 글", "b.jpg")]
+
+
+def test_update_story_title(sqlite_repo):
+    story_id = _story(sqlite_repo)
+    _warm(sqlite_repo, story_id)
+    sqlite_repo.update_story_title(story_id, "새 제목")
+    assert sqlite_repo.get_story_detail(story_id).title == "새 제목"
+    assert sqlite_repo.get_story_detail(story_id, with_pages=False).title == "새 제목"
+
+
+def test_save_cover(sqlite_repo):
+    story_id = _story(sqlite_repo)
+    _warm(sqlite_repo, story_id)
+    sqlite_repo.save_cover(story_id, "cover1.jpg", "제목", "작가", "top", "#ffffff")
+    assert sqlite_repo.get_cover(story_id).front_image_url == "cover1.jpg"
+    sqlite_repo.save_cover(story_id, "cover2.jpg", "제목", "작가", "top", "#000000")
+    assert sqlite_repo.get_cover(story_id).front_image_url == "cover2.jpg"
+
+
+def test_restore_revision(sqlite_repo):
+    story_id = _story(sqlite_repo, "처음")
+    sqlite_repo.update_story_title(story_id, "두 번째")
+    first = sqlite_repo.list_revisions(story_id)[-1]["rev"]
+    _warm(sqlite_repo, story_id)
+    sqlite_repo.restore_revision(story_id, first)
+    assert sqlite_repo.get_story_detail(story_id).title == "처음"
+    assert sqlite_repo.get_story_detail(story_id, with_pages=False).title == "처음"
+
+
+def test_delete_story(sqlite_repo):
+    story_id = _story(sqlite_repo)
+    sqlite_repo.save_cover(story_id, "cover.jpg", "제목", "작가", "top", "#ffffff")
+    _warm(sqlite_repo, story_id)
+    sqlite_repo.delete_story(story_id)
+    assert sqlite_repo.get_story_detail(story_id) is None
+    assert sqlite_repo.get_story_detail(story_id, with_pages=False) is None
+    assert sqlite_repo.get_cover(story_id) is None
+
+
+def test_archive_and_unarchive(sqlite_repo):
+    story_id = _story(sqlite_repo)
+    _warm(sqlite_repo, story_id)
+    assert sqlite_repo.archive_story(story_id)
+    assert not sqlite_repo.has_live_story(story_id)
+    assert sqlite_repo.get_story_detail(story_id).title == "제목"
+
+    # 보관한 스토리에 저장하면 원래 파일로 되돌린 뒤 저장합니다.
+    sqlite_repo.save_pages(story_id, [{"index": 1, "text": "다시 씀", "url": ""}])
+    assert sqlite_repo.has_live_story(story_id)
+    assert [p.text for p in sqlite_repo.get_story_detail(story_id).pages] == ["다시 씀"]
+
+
+def test_move_story(sqlite_repo, tmp_path):
+    target = StorySQLiteRepository(str(tmp_path / "other.db"), cache=sqlite_repo._cache)
+    target.init()
+    story_id = _story(sqlite_repo)
+    _warm(sqlite_repo, story_id)
+    assert sqlite_repo.move_story(story_id, target)
+    assert sqlite_repo.get_story_detail(story_id) is None
+    assert target.get_story_detail(story_id).title == "제목"
+
+
+def test_write_from_another_process_is_seen_after_ttl(sqlite_repo):
+    # 다른 프로세스 = 캐시를 공유하지 않는 다른 저장소 객체
+    sqlite_repo._cache.ttl = 0.05
+    other = StorySQLiteRepository(sqlite_repo.db_path)
+    story_id = _story(sqlite_repo)
+    _warm(sqlite_repo, story_id)
+    other.update_story_title(story_id, "다른 프로세스")
+    time.sleep(0.06)
+    assert sqlite_repo.get_story_detail(story_id).title == "다른 프로세스"
@@ -0,0 +1,45 @@
+# tests/test_story_save.py
+# 제목과 페이지를 함께 저장하면 세 저장소 모두 리비전을 하나만 남기는지 확인합니다.
+import pytest
+
+from storybook.repositories.story_repo_memory import StoryMemoryRepository
+from storybook.repositories.story_repo_sharded import StoryShardedRepository
+from storybook.repositories.story_repo_sqlite import StorySQLiteRepository
+
+
+@pytest.fixture(params=["memory", "sqlite", "sharded"])
+def repo(request, tmp_path):
+    if request.param == "memory":
+        return StoryMemoryRepository()
+    if request.param == "sqlite":
+        repo = StorySQLiteRepository(str(tmp_path / "storybook.db"))
+    else:
+        repo = StoryShardedRepository({name: str(tmp_path / f"{name}.db") for name in ("a", "b", "c")})
+    repo.init()
+    return repo
+
+
+def test_title_and_pages_are_one_revision(repo):
+    story_id = repo.create_story("처음", "동화", "자유")
+    repo.save_pages(story_id, [{"index": 1, "text": "하나", "url": ""}])
+    repo.save_pages(story_id, [{"index": 1, "text": "둘", "url": ""}])
+    before = len(repo.list_revisions(story_id))
+
+    repo.save_pages(story_id, [{"index": 1, "text": "셋", "url": ""}], title="바뀐 제목")
+
+    revs = repo.list_revisions(story_id)
+    assert len(revs) == before + 1
+    latest = repo.get_revision(story_id, revs[0]["rev"])
+    assert latest["title"] == "바뀐 제목"
+    assert [p.text for p in latest["pages"]] == ["셋"]
+    assert repo.get_story_detail(story_id, with_pages=False).title == "바뀐 제목"
+
+
+def test_unchanged_save_records_nothing(repo):
+    story_id = repo.create_story("제목", "동화", "자유")
+    pages = [{"index": 1, "text": "하나", "url": ""}]
+    repo.save_pages(story_id, pages)
+    repo.save_pages(story_id, [{"index": 1, "text": "둘", "url": ""}])
+    before = len(repo.list_revisions(story_id))
+    repo.save_pages(story_id, [{"index": 1, "text": "둘", "url": ""}], title="제목")
+    assert len(repo.list_revisions(story_id)) == before
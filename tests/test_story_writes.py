@@ -0,0 +1,79 @@
+# tests/test_story_writes.py
+# 샤드 이동(move_story)과 저장이 겹칠 때 저장이 사라지거나, 없는 스토리에 페이지가 남지 않는지 확인합니다.
+import threading
+import time
+
+import pytest
+
+from storybook.repositories import StoryNotFound
+from storybook.repositories.story_repo_sharded import StoryShardedRepository
+from storybook.repositories.story_repo_sqlite import StorySQLiteRepository
+
+
+def _orphan_pages(repo, story_id):
+    conn = repo.connect()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM pages WHERE story_id = ?", (story_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    repo = StoryShardedRepository({name: str(tmp_path / f"{name}.db") for name in ("a", "b")})
+    repo.init()
+    return repo
+
+
+def _misplaced_story(sharded):
+    # 주인이 아닌 샤드에 스토리를 만들어 둡니다. (샤드 구성을 바꾼 직후와 같은 상태)
+    story_id = sharded.create_story("제목", "동화", "자유")
+    owner = sharded.shard_for(story_id)
+    other = next(repo for repo in sharded.shards.values() if repo is not owner)
+    assert owner.move_story(story_id, other)
+    return story_id, other, owner
+
+
+def test_write_to_missing_story_raises(sqlite_repo):
+    with pytest.raises(StoryNotFound):
+        sqlite_repo.save_pages(12345, [{"index": 1, "text": "x", "url": ""}])
+    with pytest.raises(StoryNotFound):
+        sqlite_repo.save_cover(12345, "c.jpg", "t", "a", "top", "#fff")
+    with pytest.raises(StoryNotFound):
+        sqlite_repo.update_story_title(12345, "t")
+    with pytest.raises(StoryNotFound):
+        sqlite_repo.restore_revision(12345, 1)
+    assert _orphan_pages(sqlite_repo, 12345) == 0
+
+
+def test_save_on_moved_shard_is_rejected(sharded):
+    story_id, source, owner = _misplaced_story(sharded)
+    source.move_story(story_id, owner)
+    with pytest.raises(StoryNotFound):
+        source.save_pages(story_id, [{"index": 1, "text": "늦은 저장", "url": ""}])
+    assert _orphan_pages(source, story_id) == 0
+
+
+def test_save_during_move_follows_the_story(sharded, monkeypatch):
+    story_id, source, owner = _misplaced_story(sharded)
+    sharded.save_pages(story_id, [{"index": 1, "text": "처음", "url": ""}])
+
+    # 옮기는 도중(원래 파일에 쓰기 잠금을 잡은 상태)에 저장이 들어오게 합니다.
+    copying = threading.Event()
+    original_import = owner.import_rows
+
+    def slow_import(rows):
+        copying.set()
+        time.sleep(0.3)
+        return original_import(rows)
+
+    monkeypatch.setattr(owner, "import_rows", slow_import)
+    mover = threading.Thread(target=source.move_story, args=(story_id, owner))
+    mover.start()
+    assert copying.wait(5)
+    sharded.save_pages(story_id, [{"index": 1, "text": "옮기는 중 저장", "url": ""}])
+    mover.join()
+
+    assert [p.text for p in owner.get_story_detail(story_id).pages] == ["옮기는 중 저장"]
+    assert not source.has_story(story_id)
+    assert _orphan_pages(source, story_id) == 0
@@ -0,0 +1,135 @@
+# tests/test_translation_batcher.py
+# 번역 마이크로 배처: 묶음 처리, 개수 불일치 때만 항목별 대체, 호출 실패 시 배치 전체 실패,
+# 그리고 번역이 실패/시간 초과되어도 표지는 기본 프롬프트로 만들어지는지 확인합니다.
+from concurrent.futures import TimeoutError as FutureTimeout
+from urllib.parse import quote
+
+import pytest
+
+from storybook import ratelimit
+from storybook.jobs import tasks
+from storybook.providers.gemini_provider import DEFAULT_IMAGE_PROMPT
+from storybook.providers.translation_batcher import TranslationBatcher
+
+
+class _Provider:
+    """bulk(texts) 로 일괄 번역 결과를 정하는 가짜 Gemini"""
+
+    def __init__(self, bulk=None):
+        self.bulk = bulk or (lambda texts: [f"en:{t}" for t in texts])
+        self.bulk_calls = []
+        self.single_calls = []
+
+    def is_available(self):
+        return True
+
+    def request_bulk_translation(self, texts):
+        self.bulk_calls.append(list(texts))
+        return self.bulk(texts)
+
+    def translate_prompt_for_image(self, text):
+        self.single_calls.append(text)
+        return f"one:{text}"
+
+
+def _batcher(provider, **kwargs):
+    kwargs.setdefault("window_ms", 50)
+    kwargs.setdefault("max_items", 16)
+    return TranslationBatcher(lambda: provider, **kwargs)
+
+
+def _submit_all(batcher, texts):
+    futures = [batcher.submit(t) for t in texts]
+    return [f.result(timeout=5) for f in futures]
+
+
+def test_bulk_call_error_fails_batch_without_per_item_calls():
+    def quota_exceeded(texts):
+        raise RuntimeError("429 quota")
+
+    provider = _Provider(quota_exceeded)
+    batcher = _batcher(provider)
+    futures = [batcher.submit(t) for t in ("가", "나", "다")]
+    for fut in futures:
+        with pytest.raises(RuntimeError):
+            fut.result(timeout=5)
+    assert provider.single_calls == []
+    assert batcher.upstream_calls == 1
+
+
+def test_count_mismatch_falls_back_per_item():
+    provider = _Provider(lambda texts: None)
+    batcher = _batcher(provider)
+    assert _submit_all(batcher, ["가", "나"]) == ["one:가", "one:나"]
+    assert provider.single_calls == ["가", "나"]
+    assert batcher.upstream_calls == 3
+
+
+def test_requests_within_window_share_one_call():
+    provider = _Provider()
+    batcher = _batcher(provider, window_ms=100)
+    assert _submit_all(batcher, ["가", "나", "가", "다"]) == ["en:가", "en:나", "en:가", "en:다"]
+    # 같은 문장은 한 번만 번역합니다.
+    assert provider.bulk_calls == [["가", "나", "다"]]
+    assert batcher.requests == 4
+    assert batcher.upstream_calls == 1
+
+
+def test_max_items_splits_batches():
+    provider = _Provider()
+    batcher = _batcher(provider, window_ms=200, max_items=2)
+    assert _submit_all(batcher, ["1", "2", "3", "4", "5"]) == ["en:1", "en:2", "en:3", "en:4", "one:5"]
+    assert sorted(map(len, provider.bulk_calls)) == [2, 2]
+    # 혼자 남은 마지막 한 문장은 일괄 번역 대신 개별 번역으로 처리합니다.
+    assert provider.single_calls == ["5"]
+
+
+def test_cancelled_request_is_left_out_of_batch():
+    provider = _Provider()
+    batcher = _batcher(provider, window_ms=200)
+    a, b, c = (batcher.submit(t) for t in ("가", "나", "다"))
+    assert b.cancel()
+    assert a.result(timeout=5) == "en:가"
+    assert c.result(timeout=5) == "en:다"
+    assert provider.bulk_calls == [["가", "다"]]
+
+
+def test_translate_timeout_raises_and_cancels():
+    provider = _Provider()
+    batcher = _batcher(provider, window_ms=500)
+    with pytest.raises(FutureTimeout):
+        batcher.translate("가", timeout=0.05)
+    # 배치에 들어가기 전에 취소되었으므로 업스트림을 부르지 않습니다.
+    batcher.translate("나", timeout=5)
+    assert provider.bulk_calls == []
+    assert provider.single_calls == ["나"]
+
+
+# --- 표지 생성 ---
+
+class _TimeoutBatcher:
+    def translate(self, text, timeout=None):
+        raise FutureTimeout()
+
+
+@pytest.fixture
+def timeout_batcher(monkeypatch):
+    from storybook.providers import translation_batcher
+    monkeypatch.setenv("IMAGE_SERVICE", "stub")
+    monkeypatch.setenv("RATE_LIMIT_BACKEND", "memory")
+    monkeypatch.delenv("JOBS_MODE", raising=False)
+    monkeypatch.setattr(ratelimit, "_limiter", None)
+    monkeypatch.setattr(translation_batcher, "get_translation_batcher", lambda: _TimeoutBatcher())
+
+
+def test_cover_falls_back_to_default_prompt_on_translation_timeout(timeout_batcher):
+    result = tasks.generate_cover_image({"prompt": "숲 속의 토끼", "title": "토끼"})
+    assert result["ok"]
+    assert quote(DEFAULT_IMAGE_PROMPT) in result["url"]
+
+
+def test_inline_cover_route_returns_json_on_translation_timeout(timeout_batcher):
+    from storybook import create_app
+    res = create_app().test_client().post("/api/cover/generate_image", json={"title": "토끼"})
+    assert res.status_code == 200
+    assert res.get_json()["ok"]
@@ -0,0 +1,12 @@
+# worker.py
+# 생성 작업(플롯/본문 이미지/표지) 워커를 실행합니다. 웹 서버를 JOBS_MODE=queue 로 띄웠을 때 함께 실행하세요.
+# 워커는 여러 개(여러 노드 포함, 같은 jobs.db 를 공유)를 띄워도 됩니다.
+#
+# 사용법:
+#   python worker.py                       # JOBS_WORKER_CONCURRENCY (기본 4) 개씩 동시에 실행
+#   python worker.py --concurrency 8
+#   python worker.py --kinds images        # 본문 이미지 작업만 처리
+from storybook.jobs.worker import main
+
+if __name__ == "__main__":
+    main()